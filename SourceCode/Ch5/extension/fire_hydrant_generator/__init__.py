@@ -24,8 +24,22 @@ if "bpy" in locals():
     import importlib
     importlib.reload(creating_and_editing_mesh_objs)
     importlib.reload(mesh_editing_ops)
+    importlib.reload(mesh_fingerprint)
+    importlib.reload(mesh_diff)
+    importlib.reload(lathe)
+    importlib.reload(fire_hydrant_data)
+    importlib.reload(parallel_catalog)
+    importlib.reload(fire_hydrant_nodes)
+    importlib.reload(stage_timing)
+    importlib.reload(lod_chain)
+    importlib.reload(benchmark)
+    importlib.reload(evaluated_cache)
+    importlib.reload(variant_factory)
+    importlib.reload(scatter)
 else:
-    from . import creating_and_editing_mesh_objs, mesh_editing_ops
+    from . import creating_and_editing_mesh_objs, mesh_editing_ops, mesh_fingerprint, mesh_diff, lathe, \
+        fire_hydrant_data, parallel_catalog, fire_hydrant_nodes, stage_timing, lod_chain, benchmark, evaluated_cache, \
+        variant_factory, scatter
 
 import bpy
 from bpy.props import BoolProperty, FloatProperty, IntProperty, StringProperty
@@ -33,11 +47,31 @@ from bpy.types import Operator
 import bmesh
 from math import asin, cos, pow, radians
 from mathutils import Vector
+from functools import partial
+import sys
+import time
 
 #=========== Putting It Altogether ===========================================
 def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segments=16, pole_radius=3, num_pole_levels=3, num_dome_levels=3, \
-    stylize=False, pole_bent_factor=1, dome_bent_factor=1, subsurf=False, subsurf_level=2, add_geo_for_sharp_loops=True):
+    stylize=False, pole_bent_factor=1, dome_bent_factor=1, subsurf=False, subsurf_level=2, add_geo_for_sharp_loops=True, \
+    data_only=False, geometry_nodes=False, sharp_loop_mode='BEVEL', use_symmetry=False):
+    # Evaluated by a shared Geometry Nodes group on the object's modifier (see fire_hydrant_nodes.py).
+    if geometry_nodes:
+        return fire_hydrant_nodes.gen_fire_hydrant_geometry_nodes(context, name, location=location, \
+            num_cir_segments=num_cir_segments, pole_radius=pole_radius, num_pole_levels=num_pole_levels, \
+            num_dome_levels=num_dome_levels, stylize=stylize, pole_bent_factor=pole_bent_factor, \
+            dome_bent_factor=dome_bent_factor, subsurf=subsurf, subsurf_level=subsurf_level, \
+            add_geo_for_sharp_loops=add_geo_for_sharp_loops)
+    # Same shape built straight from arrays + bmesh ops (see fire_hydrant_data.py), usable without a 3D Viewport.
+    # use_symmetry builds one sector and spins it around when the hydrant is rotationally symmetric.
+    if data_only:
+        return fire_hydrant_data.gen_fire_hydrant_data_only(context, name, location=location, num_cir_segments=num_cir_segments, \
+            pole_radius=pole_radius, num_pole_levels=num_pole_levels, num_dome_levels=num_dome_levels, stylize=stylize, \
+            pole_bent_factor=pole_bent_factor, dome_bent_factor=dome_bent_factor, subsurf=subsurf, \
+            subsurf_level=subsurf_level, add_geo_for_sharp_loops=add_geo_for_sharp_loops, sharp_loop_mode=sharp_loop_mode, \
+            use_symmetry=use_symmetry)
     
+    run = stage_timing.start_stage_run("operators")
     bm, fh_obj = creating_and_editing_mesh_objs.get_placeholder_mesh_obj_and_bm(context, name=name, location=location)
     if subsurf:
         fh_subsurf_mod = fh_obj.modifiers.new("subsurf_mod", 'SUBSURF')
@@ -48,8 +82,17 @@ def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segment
     base_radius = pole_radius*ratio_base_to_pole
     base_height = pole_radius*0.5
     loops_to_add_geo = []
+    crease_edges = []
+
+    # Either cut 2 extra loops around the selected sharp loops, or remember their edges to crease them in one go at the end.
+    def add_geo_for_selected_sharp_loops():
+        if sharp_loop_mode == 'CREASE':
+            crease_edges.extend(e for e in bm.edges if e.select)
+        else:
+            bpy.ops.mesh.bevel(offset=0.1, segments=2, loop_slide=False)
     
     bmesh.ops.create_cone(bm, cap_ends=False, cap_tris=False, segments=num_cir_segments, radius1=base_radius, radius2=base_radius, depth=base_height)
+    stage_timing.mark_stage(run, "base cone", bm)
     
     bm.edges.ensure_lookup_table()
     bm.faces.ensure_lookup_table()
@@ -86,8 +129,9 @@ def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segment
                 break
         bpy.ops.mesh.select_all(action='DESELECT')
         mesh_editing_ops.select_edge_loops(bm, base_ridge_loop_ref_edges, select_rings=False)
-        bpy.ops.mesh.bevel(offset=0.1, segments=2, loop_slide=False)
+        add_geo_for_selected_sharp_loops()
         bpy.ops.mesh.select_all(action='DESELECT')
+    stage_timing.mark_stage(run, "base loop cut and ridge", bm)
 
     context.tool_settings.mesh_select_mode = [False, True, False]
     bm.edges.ensure_lookup_table()
@@ -144,6 +188,7 @@ def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segment
     for f in bm.faces:
         if f.select:
             face_loop_pole_top.append(f)
+    stage_timing.mark_stage(run, "pole extrusions", bm)
 
     face_loops_dome = []
     face_loops_dome_cap = []
@@ -187,6 +232,7 @@ def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segment
                 if f.select:
                     cur_loop.append(f)
             face_loops_dome_cap.append(cur_loop)
+    stage_timing.mark_stage(run, "dome extrusions", bm)
 
     new_face_loops_dome_cap = []
     dome_cap_scale_factors = {1:0.8, 2:1.3, 3:0.3}
@@ -208,10 +254,11 @@ def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segment
     bpy.ops.mesh.select_all(action='DESELECT')
     mesh_editing_ops.select_edge_loops(bm, [ref_edge], select_rings=False)
     bpy.ops.mesh.edge_collapse()
+    stage_timing.mark_stage(run, "dome cap", bm)
 
-    bmesh.ops.inset_region(bm, faces=face_loop_pole_top, thickness=0.3, depth=0.1)
-    bmesh.ops.inset_individual(bm, faces=face_loop_pole_bottom, thickness=0.1, depth=-0.15)
-    bmesh.ops.inset_region(bm, faces=face_loops_dome, thickness=0.1, depth=-0.15)
+    mesh_editing_ops.inset_batched_bmesh(bm, [(face_loop_pole_top, 0.3, 0.1, False), \
+        (face_loop_pole_bottom, 0.1, -0.15, True), (face_loops_dome, 0.1, -0.15, False)])
+    stage_timing.mark_stage(run, "insets", bm)
     
     bpy.ops.mesh.select_all(action='DESELECT')
     bot_base_loop = base_loops[0] if base_loops[0][0].verts[0].co[2] < base_loops[1][0].verts[0].co[2] else base_loops[1]
@@ -219,13 +266,14 @@ def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segment
         e.select = True
     bpy.ops.mesh.edge_face_add() # Fill with n-gon
     bpy.ops.mesh.select_all(action='DESELECT')
+    stage_timing.mark_stage(run, "bottom fill", bm)
     
     # Add extra geometry to keep certain edge loops sharp (i.e. not rounded by subsurf).
     if add_geo_for_sharp_loops:
         for l in loops_to_add_geo:
             for e in l:
                 e.select = True
-        bpy.ops.mesh.bevel(offset=0.1, segments=2, loop_slide=False)
+        add_geo_for_selected_sharp_loops()
         bpy.ops.mesh.select_all(action='DESELECT')
         
         for nfldc in new_face_loops_dome_cap:
@@ -236,32 +284,70 @@ def gen_stylized_fire_hydrant(context, name, location=(0, 0, 0), num_cir_segment
                 if e.verts[0].co[2] == e.verts[1].co[2]:
                     nfldc_loop_ref_edges.append(e)
             mesh_editing_ops.select_edge_loops(bm, nfldc_loop_ref_edges, select_rings=False)
-            bpy.ops.mesh.bevel(offset=0.1, segments=2, loop_slide=False)
+            add_geo_for_selected_sharp_loops()
 
         bpy.ops.mesh.select_all(action='DESELECT')
+    stage_timing.mark_stage(run, "sharp-loop bevels", bm)
             
     bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+    bm.verts.index_update()
+    crease_vert_pairs = [(e.verts[0].index, e.verts[1].index) for e in crease_edges if e.is_valid]
     bmesh.update_edit_mesh(fh_obj.data)
+    stage_timing.mark_stage(run, "normals", bm)
     bpy.ops.object.mode_set(mode='OBJECT')
+    if crease_vert_pairs:
+        mesh_editing_ops.set_edge_creases(fh_obj.data, crease_vert_pairs)
+    stage_timing.end_stage_run(run)
+    return fh_obj
 
 #========= Test Fire Hydrant Generation ======================================================
-def test_gen_fire_hydrant(context):
-    gen_stylized_fire_hydrant(context, "fh_default", location=(35, -14, 0))
-    gen_stylized_fire_hydrant(context, "fh_no_extra_loops_subsurf", location=(21, -14, 0), subsurf=True, subsurf_level=2, add_geo_for_sharp_loops=False)
-    gen_stylized_fire_hydrant(context, "fh_with_extra_loops_subsurf", location=(7, -14, 0), subsurf=True, subsurf_level=2)
-    gen_stylized_fire_hydrant(context, "fh_32seg_subsurf_lvl3", location=(-7, -14, 0), num_cir_segments=32, subsurf=True, subsurf_level=3)
-    gen_stylized_fire_hydrant(context, "fh_pole_lvl1", location=(-21, -14, 0), pole_radius=4, num_pole_levels=1)
-    gen_stylized_fire_hydrant(context, "fh_pole_r1.5_lvl12", location=(-35, -14, 0), pole_radius=1.5, num_pole_levels=12, num_dome_levels=5)
-
-    gen_stylized_fire_hydrant(context, "fh_stylize_defaults", location=(35, 0, 0), stylize=True)
-    gen_stylized_fire_hydrant(context, "fh_stylize_subsurf", location=(21, 0, 0), stylize=True, subsurf=True)
-    gen_stylized_fire_hydrant(context, "fh_stylize_no_extra_loops_pbf2.5", location=(7, 0, 0), pole_radius=5, stylize=True, subsurf=True, subsurf_level=3, \
-        pole_bent_factor=2.5, dome_bent_factor=2.5, add_geo_for_sharp_loops=False)
-    gen_stylized_fire_hydrant(context, "fh_stylize_pole_lvl1", location=(-7, 0, 0), pole_radius=3, num_pole_levels=1, stylize=True)
-    gen_stylized_fire_hydrant(context, "fh_stylize_pr1.5_plvl10_dlvl5", location=(-21, 0, 0), pole_radius=1.5, num_pole_levels=10, num_dome_levels=5, \
-        stylize=True, pole_bent_factor=1.5, dome_bent_factor=1.25)
-    gen_stylized_fire_hydrant(context, "fh_stylize_pr2_plvl8_dlvl5", location=(-35, 0, 0), pole_radius=2, num_pole_levels=8, num_dome_levels=5, \
-        stylize=True)
+# (name, location, generation params) for each preset, shared by test_gen_fire_hydrant and the regression diff.
+fire_hydrant_presets = [
+    ("fh_default", (35, -14, 0), {}),
+    ("fh_no_extra_loops_subsurf", (21, -14, 0), dict(subsurf=True, subsurf_level=2, add_geo_for_sharp_loops=False)),
+    ("fh_with_extra_loops_subsurf", (7, -14, 0), dict(subsurf=True, subsurf_level=2)),
+    ("fh_32seg_subsurf_lvl3", (-7, -14, 0), dict(num_cir_segments=32, subsurf=True, subsurf_level=3)),
+    ("fh_pole_lvl1", (-21, -14, 0), dict(pole_radius=4, num_pole_levels=1)),
+    ("fh_pole_r1.5_lvl12", (-35, -14, 0), dict(pole_radius=1.5, num_pole_levels=12, num_dome_levels=5)),
+
+    ("fh_stylize_defaults", (35, 0, 0), dict(stylize=True)),
+    ("fh_stylize_subsurf", (21, 0, 0), dict(stylize=True, subsurf=True)),
+    ("fh_stylize_no_extra_loops_pbf2.5", (7, 0, 0), dict(pole_radius=5, stylize=True, subsurf=True, subsurf_level=3, \
+        pole_bent_factor=2.5, dome_bent_factor=2.5, add_geo_for_sharp_loops=False)),
+    ("fh_stylize_pole_lvl1", (-7, 0, 0), dict(pole_radius=3, num_pole_levels=1, stylize=True)),
+    ("fh_stylize_pr1.5_plvl10_dlvl5", (-21, 0, 0), dict(pole_radius=1.5, num_pole_levels=10, num_dome_levels=5, \
+        stylize=True, pole_bent_factor=1.5, dome_bent_factor=1.25)),
+    ("fh_stylize_pr2_plvl8_dlvl5", (-35, 0, 0), dict(pole_radius=2, num_pole_levels=8, num_dome_levels=5, stylize=True)),
+]
+
+def test_gen_fire_hydrant(context, data_only=False):
+    for name, location, kwargs in fire_hydrant_presets:
+        gen_stylized_fire_hydrant(context, name, location=location, data_only=data_only, **kwargs)
+
+# Regenerate every preset and diff it against the golden meshes stored in golden_filepath (a .blend file), or
+# (re)write the golden meshes with update_golden=True. See run_preset_diff.py for running it from the command line.
+# The operator path needs a 3D Viewport, so only the data-only path can be diffed in background mode; golden
+# meshes should be written and diffed with the same path.
+def diff_fire_hydrant_presets(context, golden_filepath, update_golden=False, tolerance=1e-4, report_filepath=None, \
+    data_only=True):
+    return mesh_diff.diff_catalog(context, fire_hydrant_presets, partial(gen_stylized_fire_hydrant, data_only=data_only), \
+        golden_filepath, update_golden=update_golden, tolerance=tolerance, report_filepath=report_filepath)
+
+# Benchmark the generator over its param space (see benchmark.py and run_benchmark.py): mode is 'GRID' (a grid over
+# benchmark.benchmark_grid_params) or 'LHS' (num_samples Latin hypercube samples of all params). Subsurf is always on
+# so subsurf_level shows up in the evaluated counts. Returns the benchmark and, given a baseline, its comparison.
+def benchmark_fire_hydrant_params(context, mode='GRID', num_levels=4, num_samples=32, seed=0, num_repeats=1, \
+    data_only=True, baseline=None):
+    if mode == 'GRID':
+        samples = benchmark.get_grid_samples(num_levels=num_levels)
+    else:
+        samples = benchmark.get_latin_hypercube_samples(num_samples, seed=seed)
+    counted_modules = [sys.modules[__name__], creating_and_editing_mesh_objs, mesh_editing_ops, fire_hydrant_data]
+    result = benchmark.run_benchmark(context, partial(gen_stylized_fire_hydrant, subsurf=True, data_only=data_only), \
+        samples, counted_modules=counted_modules, num_repeats=num_repeats, \
+        label=("data only" if data_only else "operators") + f" {mode.lower()}")
+    comparison = benchmark.compare_benchmarks(baseline, result) if baseline is not None else None
+    return result, comparison
 
 def test_gen_fh_num_segments(context):
     pole_radius = 3
@@ -270,6 +356,87 @@ def test_gen_fh_num_segments(context):
     gen_stylized_fire_hydrant(context, location=(0, 0, 0), num_cir_segments=16, pole_radius=pole_radius)
     gen_stylized_fire_hydrant(context, location=(-spacing, 0, 0), num_cir_segments=32, pole_radius=pole_radius)
 
+#========= Live Preview =============================================
+# Every generation param schedules a preview update through bpy.app.timers instead of generating right away. A
+# burst of slider events only pushes the deadline further (the timer re-arms itself until no event came in for
+# fh_preview_debounce seconds), so one update runs per burst, and a queued update that got superseded, or whose
+# preview got committed/switched off, is simply dropped. Each update is a full data-only build, written into the
+# preview object's mesh.
+fh_preview_debounce = 0.15
+fh_live_preview = {"obj_name": None, "last_change": 0.0}
+
+def get_fh_scene_params(scene):
+    return dict(num_cir_segments=scene.num_cir_segments, pole_radius=scene.pole_radius, \
+        num_pole_levels=scene.num_pole_levels, num_dome_levels=scene.num_dome_levels, stylize=scene.stylize, \
+        pole_bent_factor=scene.pole_bent_factor, dome_bent_factor=scene.dome_bent_factor, subsurf=scene.subsurf, \
+        subsurf_level=scene.subsurf_level, add_geo_for_sharp_loops=scene.add_geo_for_sharp_loops, \
+        sharp_loop_mode=scene.fh_sharp_loop_mode)
+
+def get_fh_preview_obj(scene, create=True):
+    fh_obj = bpy.data.objects.get(fh_live_preview["obj_name"] or "")
+    if fh_obj is None and create:
+        fh_obj = bpy.data.objects.new(name="fh_preview", object_data=bpy.data.meshes.new(name="fh_preview"))
+        scene.collection.objects.link(fh_obj)
+        fh_live_preview["obj_name"] = fh_obj.name
+    return fh_obj
+
+def remove_fh_preview_obj():
+    fh_obj = get_fh_preview_obj(None, create=False)
+    if fh_obj is not None:
+        mesh = fh_obj.data
+        bpy.data.objects.remove(fh_obj)
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    fh_live_preview["obj_name"] = None
+
+def update_fh_preview(scene):
+    fh_obj = get_fh_preview_obj(scene)
+    fire_hydrant_data.update_fire_hydrant_mesh(bpy.context, fh_obj.name, location=scene.cursor.location.copy(), \
+        fh_obj=fh_obj, **get_fh_scene_params(scene))
+
+def run_fh_preview_update():
+    remaining = fh_live_preview["last_change"] + fh_preview_debounce - time.monotonic()
+    if remaining > 0:
+        return remaining
+    scene = bpy.context.scene
+    if scene is not None and scene.fh_live_preview:
+        update_fh_preview(scene)
+    return None
+
+def schedule_fh_preview_update(self, context):
+    if not context.scene.fh_live_preview:
+        return
+    fh_live_preview["last_change"] = time.monotonic()
+    if not bpy.app.timers.is_registered(run_fh_preview_update):
+        bpy.app.timers.register(run_fh_preview_update, first_interval=fh_preview_debounce)
+
+def cancel_fh_preview_update():
+    if bpy.app.timers.is_registered(run_fh_preview_update):
+        bpy.app.timers.unregister(run_fh_preview_update)
+
+def on_fh_live_preview_toggled(self, context):
+    if context.scene.fh_live_preview:
+        schedule_fh_preview_update(self, context)
+    else:
+        cancel_fh_preview_update()
+        remove_fh_preview_obj()
+
+# The preview becomes the final object: a pending update is applied (its verts already are the full build's), it
+# takes the object name from the panel, and the next preview goes into a new object.
+def commit_fh_preview(context):
+    cancel_fh_preview_update()
+    scene = context.scene
+    fh_obj = get_fh_preview_obj(scene)
+    update_fh_preview(scene)
+    fh_obj.name = scene.fh_object_name
+    fh_obj.data.name = scene.fh_object_name
+    fh_live_preview["obj_name"] = None
+    scene.fh_live_preview = False
+    return fh_obj
+
+def on_fh_stage_timing_toggled(self, context):
+    stage_timing.set_stage_timing_enabled(context.scene.fh_stage_timing)
+
 #========= Create Scean Variables for User Input =============================================
 def init_scene_vars():
     bpy.types.Scene.fh_object_name = StringProperty(
@@ -281,6 +448,7 @@ def init_scene_vars():
     bpy.types.Scene.num_cir_segments = bpy.props.IntProperty(
         name="Num Segments",
         description="Number of segments for the cross section",
+        update=schedule_fh_preview_update,
         default=16,
         max=64,
         min=8)
@@ -288,6 +456,7 @@ def init_scene_vars():
     bpy.types.Scene.pole_radius= bpy.props.FloatProperty(
         name="Pole Radius",
         description="Radius of fire hydrant pole",
+        update=schedule_fh_preview_update,
         default=3.0,
         max=50.0,
         min=1.0)
@@ -295,6 +464,7 @@ def init_scene_vars():
     bpy.types.Scene.num_pole_levels = bpy.props.IntProperty(
         name="Num Pole Levels",
         description="Number of pole levels",
+        update=schedule_fh_preview_update,
         default=3,
         max=20,
         min=1)
@@ -302,6 +472,7 @@ def init_scene_vars():
     bpy.types.Scene.num_dome_levels = bpy.props.IntProperty(
         name="Num Dome Levels",
         description="Number of dome levels",
+        update=schedule_fh_preview_update,
         default=3,
         max=20,
         min=1)
@@ -309,11 +480,13 @@ def init_scene_vars():
     bpy.types.Scene.subsurf = bpy.props.BoolProperty(
         name="Subsurf",
         description="Whether to add a subsurf modifier to the generated mesh",
+        update=schedule_fh_preview_update,
         default=True)
     
     bpy.types.Scene.subsurf_level = bpy.props.IntProperty(
         name="Subsurf Level",
         description="Number of subsurf levels for preview/render",
+        update=schedule_fh_preview_update,
         default=2,
         max=4,
         min=1)
@@ -321,16 +494,27 @@ def init_scene_vars():
     bpy.types.Scene.add_geo_for_sharp_loops = bpy.props.BoolProperty(
         name="Cut Extra Loops for Subsurf",
         description="Whether to cut extra edge loops to keep them sharp under subsurf",
+        update=schedule_fh_preview_update,
         default=True)
     
+    bpy.types.Scene.fh_sharp_loop_mode = bpy.props.EnumProperty(
+        name="Sharp Loops",
+        description="How the sharp loops are kept sharp under subsurf",
+        items=[('BEVEL', "Bevel", "Cut 2 extra loops around each sharp loop"),
+               ('CREASE', "Crease", "Set an edge crease of 1 on the sharp loops, without extra geometry")],
+        update=schedule_fh_preview_update,
+        default='BEVEL')
+    
     bpy.types.Scene.stylize = bpy.props.BoolProperty(
         name="Stylize?",
         description="Whether to stylize the object",
+        update=schedule_fh_preview_update,
         default=False)
     
     bpy.types.Scene.pole_bent_factor = bpy.props.FloatProperty(
         name="Pole Bent Factor",
         description="Factor of how much the pole is bent",
+        update=schedule_fh_preview_update,
         default=1.0,
         max=10.0,
         min=1.0)
@@ -338,9 +522,101 @@ def init_scene_vars():
     bpy.types.Scene.dome_bent_factor = bpy.props.FloatProperty(
         name="Dome Bent Factor",
         description="Factor of how much the dome is bent",
+        update=schedule_fh_preview_update,
         default=1.0,
         max=10.0,
         min=1.0)
+    
+    bpy.types.Scene.fh_data_only = bpy.props.BoolProperty(
+        name="Data Only (No Operators)",
+        description="Build the mesh from arrays and bmesh ops only, without bpy.ops or Edit Mode",
+        default=False)
+    
+    bpy.types.Scene.fh_use_symmetry = bpy.props.BoolProperty(
+        name="Build One Sector",
+        description="Data only: build one sector of a non-stylized hydrant and spin it around (same mesh, less work)",
+        default=False)
+    
+    bpy.types.Scene.fh_geometry_nodes = bpy.props.BoolProperty(
+        name="Geometry Nodes Backend",
+        description="Generate through a shared Geometry Nodes group on a modifier instead of building the mesh in Python",
+        default=False)
+    
+    bpy.types.Scene.fh_live_preview = bpy.props.BoolProperty(
+        name="Live Preview",
+        description="Update a single preview object in place while the generation params are being changed",
+        update=on_fh_live_preview_toggled,
+        default=False)
+    
+    bpy.types.Scene.fh_num_workers = bpy.props.IntProperty(
+        name="Num Workers",
+        description="Number of background Blender processes generating the presets (0 to generate them here, one by one; workers only pay off from about a hundred presets)",
+        default=0,
+        max=64,
+        min=0)
+    
+    bpy.types.Scene.fh_num_lods = bpy.props.IntProperty(
+        name="Num LODs",
+        description="Number of levels of detail (LOD0..LODn) in the LOD chain",
+        default=3,
+        max=8,
+        min=1)
+    
+    bpy.types.Scene.fh_stage_timing = bpy.props.BoolProperty(
+        name="Stage Timing",
+        description="Time each generation stage and count its elements (also on with the FH_STAGE_TIMING env var)",
+        update=on_fh_stage_timing_toggled,
+        default=stage_timing.is_stage_timing_enabled())
+    
+    bpy.types.Scene.fh_stage_timing_filepath = StringProperty(
+        name="Timings File",
+        description="JSON file to export the aggregated stage timings to",
+        default="//fh_stage_timings.json",
+        subtype="FILE_PATH")
+
+    bpy.types.Scene.fh_scatter_kind = bpy.props.EnumProperty(
+        name="Prop",
+        description="Kind of prop to scatter",
+        items=[('FIRE_HYDRANT', "Fire Hydrant", "Scatter fire hydrant variants"),
+               ('BARREL', "Barrel", "Scatter barrel variants")],
+        default='FIRE_HYDRANT')
+    
+    bpy.types.Scene.fh_scatter_guide = bpy.props.PointerProperty(
+        name="Guide Mesh",
+        description="Mesh object whose vertices are the scatter points (used when no CSV file is set)",
+        type=bpy.types.Object,
+        poll=lambda self, obj: obj.type == 'MESH')
+    
+    bpy.types.Scene.fh_scatter_csv_filepath = StringProperty(
+        name="Points CSV",
+        description="CSV file with x, y, z[, z rotation in degrees[, scale]] per scatter point",
+        default="",
+        subtype="FILE_PATH")
+    
+    bpy.types.Scene.fh_scatter_pool_size = bpy.props.IntProperty(
+        name="Pool Size",
+        description="Number of distinct variants generated and shared by all the scattered instances",
+        default=8,
+        max=256,
+        min=1)
+    
+    bpy.types.Scene.fh_scatter_seed = bpy.props.IntProperty(
+        name="Seed",
+        description="Seed of the variant params, variant assignment and random transforms",
+        default=0,
+        min=0)
+    
+    bpy.types.Scene.fh_scatter_scale_jitter = bpy.props.FloatProperty(
+        name="Scale Jitter",
+        description="Max random deviation from scale 1 (when the points have no scale)",
+        default=0.1,
+        max=0.9,
+        min=0.0)
+    
+    bpy.types.Scene.fh_scatter_bake = bpy.props.BoolProperty(
+        name="Bake Subsurf",
+        description="Bake the pool's evaluated meshes so the instances share them instead of each evaluating subsurf",
+        default=True)
 
 def del_scene_vars():
     del bpy.types.Scene.fh_object_name
@@ -352,6 +628,22 @@ def del_scene_vars():
     del bpy.types.Scene.add_geo_for_sharp_loops
     del bpy.types.Scene.pole_bent_factor
     del bpy.types.Scene.dome_bent_factor
+    del bpy.types.Scene.fh_data_only
+    del bpy.types.Scene.fh_use_symmetry
+    del bpy.types.Scene.fh_sharp_loop_mode
+    del bpy.types.Scene.fh_geometry_nodes
+    del bpy.types.Scene.fh_live_preview
+    del bpy.types.Scene.fh_num_workers
+    del bpy.types.Scene.fh_num_lods
+    del bpy.types.Scene.fh_stage_timing
+    del bpy.types.Scene.fh_stage_timing_filepath
+    del bpy.types.Scene.fh_scatter_kind
+    del bpy.types.Scene.fh_scatter_guide
+    del bpy.types.Scene.fh_scatter_csv_filepath
+    del bpy.types.Scene.fh_scatter_pool_size
+    del bpy.types.Scene.fh_scatter_seed
+    del bpy.types.Scene.fh_scatter_scale_jitter
+    del bpy.types.Scene.fh_scatter_bake
 
 #========= Operators for Running Test Functions ===========================================================
 class GenerateFireHydrantOperator(Operator):
@@ -365,7 +657,9 @@ class GenerateFireHydrantOperator(Operator):
             num_pole_levels=context.scene.num_pole_levels, num_dome_levels=context.scene.num_dome_levels, \
             stylize=context.scene.stylize, pole_bent_factor=context.scene.pole_bent_factor, \
             dome_bent_factor=context.scene.dome_bent_factor, subsurf=context.scene.subsurf, \
-            subsurf_level=context.scene.subsurf_level, add_geo_for_sharp_loops=context.scene.add_geo_for_sharp_loops)
+            subsurf_level=context.scene.subsurf_level, add_geo_for_sharp_loops=context.scene.add_geo_for_sharp_loops, \
+            data_only=context.scene.fh_data_only, geometry_nodes=context.scene.fh_geometry_nodes, \
+            sharp_loop_mode=context.scene.fh_sharp_loop_mode, use_symmetry=context.scene.fh_use_symmetry)
         self.report({'INFO'}, "Generate Fire Hydrant Meshes With User Input Values.")
         return {'FINISHED'}
 
@@ -375,9 +669,108 @@ class GenerateFireHydrantsWithPresetsOperator(Operator):
     """Generate Fire Hydrant Meshes With Presets"""
 
     def execute(self, context):
-        test_gen_fire_hydrant(context)
+        if context.scene.fh_num_workers > 0:
+            parallel_catalog.gen_fire_hydrant_catalog_parallel(context, fire_hydrant_presets, context.scene.fh_num_workers)
+        else:
+            test_gen_fire_hydrant(context, data_only=context.scene.fh_data_only)
         self.report({'INFO'}, "Generate Fire Hydrant Meshes With Presets.")
         return {'FINISHED'}
+
+class GenerateFireHydrantLODChainOperator(Operator):
+    bl_idname = "mesh.generate_fire_hydrant_lod_chain"
+    bl_label = "Generate LOD Chain"
+    """Generate LOD0..LODn of a Fire Hydrant With User Input Values"""
+
+    def execute(self, context):
+        _, report = lod_chain.gen_fire_hydrant_lod_chain(context, context.scene.fh_object_name, \
+            location=context.scene.cursor.location.copy(), num_lods=context.scene.fh_num_lods, \
+            **get_fh_scene_params(context.scene))
+        self.report({'INFO'}, lod_chain.format_lod_report(report))
+        return {'FINISHED'}
+
+class ExportFireHydrantStageTimingsOperator(Operator):
+    bl_idname = "mesh.export_fire_hydrant_stage_timings"
+    bl_label = "Export Timings"
+    """Export the Aggregated Stage Timings to JSON"""
+
+    def execute(self, context):
+        filepath = bpy.path.abspath(context.scene.fh_stage_timing_filepath)
+        stage_timing.export_stage_timings(filepath)
+        self.report({'INFO'}, "Exported stage timings to " + filepath + ".")
+        return {'FINISHED'}
+
+class ResetFireHydrantStageTimingsOperator(Operator):
+    bl_idname = "mesh.reset_fire_hydrant_stage_timings"
+    bl_label = "Reset Timings"
+    """Clear the Aggregated Stage Timings"""
+
+    def execute(self, context):
+        stage_timing.reset_stage_timings()
+        return {'FINISHED'}
+
+class ScatterFireHydrantVariantsOperator(Operator):
+    bl_idname = "mesh.scatter_fire_hydrant_variants"
+    bl_label = "Scatter"
+    """Scatter Linked Duplicates of a Pool of Variants Over a Guide Mesh's Vertices or CSV Points"""
+
+    def execute(self, context):
+        scene = context.scene
+        rot_z = scales = None
+        if scene.fh_scatter_csv_filepath:
+            points, rot_z, scales, skipped_lines = scatter.load_csv_points(bpy.path.abspath(scene.fh_scatter_csv_filepath))
+            if skipped_lines:
+                self.report({'WARNING'}, f"Skipped {len(skipped_lines)} malformed CSV rows (lines " + \
+                    ", ".join(str(line) for line in skipped_lines[:10]) + (", ..." if len(skipped_lines) > 10 else "") + ").")
+            if not len(points):
+                self.report({'ERROR'}, "The points CSV file has no valid x, y, z rows.")
+                return {'CANCELLED'}
+        elif scene.fh_scatter_guide is not None:
+            points = scatter.get_guide_mesh_points(scene.fh_scatter_guide)
+        else:
+            self.report({'ERROR'}, "Set a guide mesh or a points CSV file to scatter over.")
+            return {'CANCELLED'}
+        scatter_collection = scatter.scatter_variants(context, scene.fh_object_name + "_scatter", scene.fh_scatter_kind, \
+            points, pool_size=scene.fh_scatter_pool_size, seed=scene.fh_scatter_seed, rot_z=rot_z, scales=scales, \
+            scale_jitter=scene.fh_scatter_scale_jitter, bake=scene.fh_scatter_bake)
+        self.report({'INFO'}, f"Scattered {len(points)} instances into {scatter_collection.name}.")
+        return {'FINISHED'}
+
+class BakeFireHydrantEvaluatedMeshesOperator(Operator):
+    bl_idname = "mesh.bake_fire_hydrant_evaluated_meshes"
+    bl_label = "Bake Evaluated"
+    """Replace the Modifier Stack of the Selected Objects With Their Cached Evaluated Meshes"""
+
+    def execute(self, context):
+        # The live preview keeps rewriting its mesh in place, so it can't share a baked one.
+        preview_obj = get_fh_preview_obj(context.scene, create=False)
+        objs = [obj for obj in context.selected_objects if obj != preview_obj]
+        num_baked, num_cache_hits = evaluated_cache.set_evaluated_meshes_baked(context, objs)
+        self.report({'INFO'}, f"Baked {num_baked} objects ({num_cache_hits} from the cache).")
+        return {'FINISHED'}
+
+class RestoreFireHydrantModifiersOperator(Operator):
+    bl_idname = "mesh.restore_fire_hydrant_modifiers"
+    bl_label = "Restore Modifiers"
+    """Switch the Selected Baked Objects Back to Their Base Meshes and Live Modifiers"""
+
+    def execute(self, context):
+        num_restored, _ = evaluated_cache.set_evaluated_meshes_baked(context, context.selected_objects, baked=False)
+        self.report({'INFO'}, f"Restored the live modifiers of {num_restored} objects.")
+        return {'FINISHED'}
+
+class CommitFireHydrantPreviewOperator(Operator):
+    bl_idname = "mesh.commit_fire_hydrant_preview"
+    bl_label = "Commit Preview"
+    """Turn the Live Preview Into the Final Fire Hydrant Object"""
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.fh_live_preview
+
+    def execute(self, context):
+        fh_obj = commit_fh_preview(context)
+        self.report({'INFO'}, "Committed fire hydrant preview as " + fh_obj.name + ".")
+        return {'FINISHED'}
     
 #========= Fire Hydrant Generator Properties shelf Tool tab ================================================
 
@@ -410,19 +803,72 @@ class FIRE_HYDRANT_GENERATOR_PT_ToolPanel(bpy.types.Panel):
         r = box0.row(align=True)
         r.prop(context.scene, "add_geo_for_sharp_loops")
         r = box0.row(align=True)
+        r.prop(context.scene, "fh_sharp_loop_mode")
+        r = box0.row(align=True)
         r.prop(context.scene, "stylize")
         r = box0.row(align=True)
         r.prop(context.scene, "pole_bent_factor")
         r = box0.row(align=True)
         r.prop(context.scene, "dome_bent_factor")
+        r = box0.row(align=True)
+        r.prop(context.scene, "fh_data_only")
+        r = box0.row(align=True)
+        r.enabled = context.scene.fh_data_only
+        r.prop(context.scene, "fh_use_symmetry")
+        r = box0.row(align=True)
+        r.prop(context.scene, "fh_geometry_nodes")
         box0.operator("mesh.generate_fire_hydrant", icon='MESH_DATA')
+        r = box0.row(align=True)
+        r.prop(context.scene, "fh_live_preview")
+        r.operator("mesh.commit_fire_hydrant_preview", icon='CHECKMARK')
+        r = box0.row(align=True)
+        r.prop(context.scene, "fh_num_lods")
+        r.operator("mesh.generate_fire_hydrant_lod_chain", icon='MOD_DECIM')
+        
+        r = box0.row(align=True)
+        r.operator("mesh.bake_fire_hydrant_evaluated_meshes", icon='MOD_SUBSURF')
+        r.operator("mesh.restore_fire_hydrant_modifiers", icon='MODIFIER')
         
         box1 = col0.box()
         box1.label(text="Presets")
+        r = box1.row(align=True)
+        r.prop(context.scene, "fh_num_workers")
         box1.operator("mesh.generate_fire_hydrant_with_presets", icon='MESH_DATA')
 
+        box3 = col0.box()
+        box3.label(text="Scatter")
+        for prop in ("fh_scatter_kind", "fh_scatter_guide", "fh_scatter_csv_filepath", "fh_scatter_pool_size", \
+            "fh_scatter_seed", "fh_scatter_scale_jitter", "fh_scatter_bake"):
+            r = box3.row(align=True)
+            r.prop(context.scene, prop)
+        box3.operator("mesh.scatter_fire_hydrant_variants", icon='OUTLINER_OB_POINTCLOUD')
+
+        box2 = col0.box()
+        box2.label(text="Stage Timings")
+        r = box2.row(align=True)
+        r.prop(context.scene, "fh_stage_timing")
+        last_run = stage_timing.get_last_stage_run()
+        if last_run is not None:
+            box2.label(text=f"Last run ({last_run['label']}): {last_run['seconds']*1000:.1f} ms")
+            if stage_timing.format_speedup(last_run):
+                box2.label(text=stage_timing.format_speedup(last_run))
+            for stage in last_run["stages"]:
+                box2.label(text=stage_timing.format_stage(stage))
+        r = box2.row(align=True)
+        r.prop(context.scene, "fh_stage_timing_filepath")
+        r = box2.row(align=True)
+        r.operator("mesh.export_fire_hydrant_stage_timings", icon='EXPORT')
+        r.operator("mesh.reset_fire_hydrant_stage_timings", icon='X')
+
 classes = [GenerateFireHydrantOperator,
            GenerateFireHydrantsWithPresetsOperator,
+           CommitFireHydrantPreviewOperator,
+           GenerateFireHydrantLODChainOperator,
+           ExportFireHydrantStageTimingsOperator,
+           ResetFireHydrantStageTimingsOperator,
+           ScatterFireHydrantVariantsOperator,
+           BakeFireHydrantEvaluatedMeshesOperator,
+           RestoreFireHydrantModifiersOperator,
            FIRE_HYDRANT_GENERATOR_PT_ToolPanel]
 
 def register():
@@ -431,6 +877,8 @@ def register():
     init_scene_vars()
 
 def unregister():
+    cancel_fh_preview_update()
+    evaluated_cache.clear_evaluated_mesh_cache()
     for c in classes:
         bpy.utils.unregister_class(c)
     del_scene_vars()
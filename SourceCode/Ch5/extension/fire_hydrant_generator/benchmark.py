@@ -0,0 +1,257 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+import bpy
+import itertools
+import json
+import numpy as np
+import time
+
+# Parameter space benchmark of the hydrant generator: sample the params (a grid over a few of them, or a Latin
+# hypercube over all of them), generate each sample, and record wall time, the number of bpy.ops/bmesh.ops calls,
+# the vert/face counts of the mesh and of the evaluated (post subsurf) mesh with an estimate of its memory. Scaling
+# is fitted as a power law, time ~ prod(param^exponent), by least squares on the logs of all samples, and every
+# exponent above 1 + superlinear_tolerance is flagged. Results are plain JSON, so a run can be stored as a baseline
+# and later runs with the same samples compared against it.
+#
+# (type, min, max) of every param, matching the limits of the Fire Hydrant panel.
+benchmark_param_space = {
+    "num_cir_segments": ('INT', 8, 64),
+    "pole_radius": ('FLOAT', 1.0, 50.0),
+    "num_pole_levels": ('INT', 1, 20),
+    "num_dome_levels": ('INT', 1, 20),
+    "subsurf_level": ('INT', 1, 4),
+    "pole_bent_factor": ('FLOAT', 1.0, 10.0),
+    "dome_bent_factor": ('FLOAT', 1.0, 10.0),
+    "stylize": ('BOOL', False, True),
+    "add_geo_for_sharp_loops": ('BOOL', False, True),
+}
+# The params the geometry size depends on, swept by default in grid mode (the others stay at their defaults).
+benchmark_grid_params = ("num_cir_segments", "num_pole_levels", "num_dome_levels", "subsurf_level")
+superlinear_tolerance = 0.15
+
+#========= Sampling ========================================================
+def get_param_value(param, t):
+    param_type, min_value, max_value = benchmark_param_space[param]
+    if param_type == 'BOOL':
+        return bool(t >= 0.5)
+    value = min_value + t*(max_value - min_value)
+    return int(round(value)) if param_type == 'INT' else float(value)
+
+def get_grid_samples(params=benchmark_grid_params, num_levels=4):
+    axes = []
+    for param in params:
+        ts = (0.0, 1.0) if benchmark_param_space[param][0] == 'BOOL' else np.linspace(0, 1, num_levels)
+        axes.append(sorted(set(get_param_value(param, t) for t in ts)))
+    return [dict(zip(params, values)) for values in itertools.product(*axes)]
+
+# One sample per stratum of every param, the strata matched up by a random permutation per param.
+def get_latin_hypercube_samples(num_samples, params=tuple(benchmark_param_space), seed=0):
+    rng = np.random.default_rng(seed)
+    samples = [{} for _ in range(num_samples)]
+    for param in params:
+        ts = (rng.permutation(num_samples) + rng.random(num_samples))/num_samples
+        for sample, t in zip(samples, ts):
+            sample[param] = get_param_value(param, t)
+    return samples
+
+def get_sample_key(sample):
+    return json.dumps(sample, sort_keys=True)
+
+#========= Op Counting ========================================================
+# Stand-in for the bpy/bmesh module in the generator modules while a sample runs: everything passes through, but
+# every call of a bpy.ops.<submodule>.<op> or bmesh.ops.<op> is counted. op_depth is the number of attribute
+# lookups left down to the op (None for the module itself).
+class OpCountingModule:
+    def __init__(self, module, op_counts, path, op_depth=None):
+        self._module = module
+        self._op_counts = op_counts
+        self._path = path
+        self._op_depth = op_depth
+
+    def __getattr__(self, name):
+        value = getattr(self._module, name)
+        path = self._path + "." + name
+        if self._op_depth is None:
+            if name != "ops":
+                return value
+            return OpCountingModule(value, self._op_counts, path, 2 if self._path == "bpy" else 1)
+        if self._op_depth > 1:
+            return OpCountingModule(value, self._op_counts, path, self._op_depth - 1)
+
+        def counted_op(*args, **kwargs):
+            self._op_counts[path] = self._op_counts.get(path, 0) + 1
+            return value(*args, **kwargs)
+        return counted_op
+
+def set_op_counting(modules, op_counts):
+    for module in modules:
+        for name in ("bpy", "bmesh"):
+            if name in vars(module):
+                setattr(module, name, OpCountingModule(vars(module)[name], op_counts, name))
+
+def unset_op_counting(modules):
+    for module in modules:
+        for name in ("bpy", "bmesh"):
+            if isinstance(vars(module).get(name), OpCountingModule):
+                setattr(module, name, vars(module)[name]._module)
+
+#========= Running Samples ========================================================
+def get_mesh_counts(mesh):
+    return {"verts": len(mesh.vertices), "edges": len(mesh.edges), "faces": len(mesh.polygons), "loops": len(mesh.loops)}
+
+# Rough size of the core mesh arrays: positions (3 floats per vert), edge verts (2 ints), corner vert + edge (2 ints)
+# and face offsets (1 int).
+def get_mesh_memory_estimate(counts):
+    return 12*counts["verts"] + 8*counts["edges"] + 8*counts["loops"] + 4*counts["faces"]
+
+def remove_obj_and_data(obj):
+    mesh = obj.data
+    bpy.data.objects.remove(obj)
+    if mesh is not None and mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+
+# generate(context, name, **sample) makes one hydrant and returns its object; counted_modules are the modules
+# whose bpy/bmesh calls are counted. Time is the best of num_repeats runs.
+def run_sample(context, generate, sample, counted_modules=(), num_repeats=1):
+    seconds = []
+    for _ in range(num_repeats):
+        op_counts = {}
+        set_op_counting(counted_modules, op_counts)
+        try:
+            start = time.perf_counter()
+            obj = generate(context, "fh_benchmark", **sample)
+            seconds.append(time.perf_counter() - start)
+        finally:
+            unset_op_counting(counted_modules)
+        counts = get_mesh_counts(obj.data)
+        evaluated_counts = get_mesh_counts(obj.evaluated_get(context.evaluated_depsgraph_get()).data)
+        remove_obj_and_data(obj)
+    return {"params": sample, "seconds": min(seconds), "num_ops": sum(op_counts.values()), "op_counts": op_counts, \
+        "counts": counts, "evaluated_counts": evaluated_counts, \
+        "evaluated_memory": get_mesh_memory_estimate(evaluated_counts)}
+
+#========= Scaling Fits ========================================================
+# Least squares fit of log(value) = c + sum(exponent_p*log(p)) over the numeric params that vary, plus a factor
+# per bool param (value multiplied by exp(c_p) when on). Exponents above 1 + superlinear_tolerance are flagged.
+def fit_scaling(results, value_fn):
+    params = results[0]["params"]
+    numeric = [p for p in params if benchmark_param_space[p][0] != 'BOOL' and len({r["params"][p] for r in results}) > 1]
+    bools = [p for p in params if benchmark_param_space[p][0] == 'BOOL' and len({r["params"][p] for r in results}) > 1]
+    columns = [np.ones(len(results))]
+    columns += [np.log([float(r["params"][p]) for r in results]) for p in numeric]
+    columns += [np.array([float(r["params"][p]) for r in results]) for p in bools]
+    y = np.log(np.maximum([value_fn(r) for r in results], 1e-9))
+    coefs, _, _, _ = np.linalg.lstsq(np.stack(columns, axis=1), y, rcond=None)
+    exponents = {p: float(c) for p, c in zip(numeric, coefs[1:1+len(numeric)])}
+    factors = {p: float(np.exp(c)) for p, c in zip(bools, coefs[1+len(numeric):])}
+    return {"exponents": exponents, "bool_factors": factors, \
+        "superlinear": sorted(p for p, e in exponents.items() if e > 1 + superlinear_tolerance)}
+
+# Time against the size of the mesh it produced: an exponent above 1 means time per face grows with the mesh.
+def fit_time_per_face(results):
+    faces = np.log([max(r["counts"]["faces"], 1) for r in results])
+    seconds = np.log(np.maximum([r["seconds"] for r in results], 1e-9))
+    if len(set(faces)) < 2:
+        return None
+    exponent = float(np.polyfit(faces, seconds, 1)[0])
+    return {"exponent": exponent, "superlinear": exponent > 1 + superlinear_tolerance}
+
+def get_scaling_fits(results):
+    return {
+        "seconds": fit_scaling(results, lambda r: r["seconds"]),
+        "num_ops": fit_scaling(results, lambda r: max(r["num_ops"], 1)),
+        "faces": fit_scaling(results, lambda r: r["counts"]["faces"]),
+        "evaluated_memory": fit_scaling(results, lambda r: r["evaluated_memory"]),
+        "seconds_per_face": fit_time_per_face(results),
+    }
+
+def run_benchmark(context, generate, samples, counted_modules=(), num_repeats=1, label=""):
+    start = time.perf_counter()
+    results = [run_sample(context, generate, sample, counted_modules, num_repeats) for sample in samples]
+    return {"label": label, "blender_version": bpy.app.version_string, "num_samples": len(samples), \
+        "total_seconds": time.perf_counter() - start, "results": results, "fits": get_scaling_fits(results)}
+
+#========= Baselines ========================================================
+def save_benchmark(benchmark, filepath):
+    with open(filepath, 'w') as f:
+        json.dump(benchmark, f, indent=2)
+
+def load_benchmark(filepath):
+    with open(filepath) as f:
+        return json.load(f)
+
+# Samples are matched by their params. Geometry changes (different counts) are always flagged; a sample is flagged
+# slower when it took more than slowdown_tolerance longer, and a fit when its exponent grew by more than
+# exponent_tolerance.
+def compare_benchmarks(baseline, benchmark, slowdown_tolerance=0.25, exponent_tolerance=0.2):
+    baseline_results = {get_sample_key(r["params"]): r for r in baseline["results"]}
+    ratios, slower, changed_counts = [], [], []
+    for r in benchmark["results"]:
+        base = baseline_results.get(get_sample_key(r["params"]))
+        if base is None:
+            continue
+        ratio = r["seconds"]/max(base["seconds"], 1e-9)
+        ratios.append(ratio)
+        if ratio > 1 + slowdown_tolerance:
+            slower.append({"params": r["params"], "ratio": ratio})
+        if r["counts"] != base["counts"] or r["num_ops"] != base["num_ops"]:
+            changed_counts.append({"params": r["params"], "baseline": [base["counts"], base["num_ops"]], \
+                "current": [r["counts"], r["num_ops"]]})
+    exponent_changes = {}
+    for fit_name, fit in benchmark["fits"].items():
+        base_fit = baseline["fits"].get(fit_name)
+        if not fit or not base_fit or "exponents" not in fit:
+            continue
+        for p, e in fit["exponents"].items():
+            if p in base_fit["exponents"] and e - base_fit["exponents"][p] > exponent_tolerance:
+                exponent_changes[fit_name + "/" + p] = [base_fit["exponents"][p], e]
+    return {"num_matched": len(ratios), "median_ratio": float(np.median(ratios)) if ratios else None, \
+        "slower": slower, "changed_counts": changed_counts, "exponent_changes": exponent_changes}
+
+def is_comparison_clean(comparison):
+    return not comparison["slower"] and not comparison["changed_counts"] and not comparison["exponent_changes"]
+
+def format_benchmark(benchmark):
+    lines = [f"{benchmark['num_samples']} samples in {benchmark['total_seconds']:.1f}s"]
+    for fit_name, fit in benchmark["fits"].items():
+        if fit is None:
+            continue
+        if "exponents" in fit:
+            exponents = ", ".join(f"{p} {e:.2f}" for p, e in fit["exponents"].items())
+            lines.append(f"    {fit_name}: {exponents}" + (f"  SUPERLINEAR: {', '.join(fit['superlinear'])}" if fit["superlinear"] else ""))
+        else:
+            lines.append(f"    {fit_name}: {fit['exponent']:.2f}" + ("  SUPERLINEAR" if fit["superlinear"] else ""))
+    return "\n".join(lines)
+
+def format_comparison(comparison):
+    if comparison["median_ratio"] is None:
+        return "No samples in common with the baseline."
+    lines = [f"{comparison['num_matched']} samples compared, median time ratio {comparison['median_ratio']:.2f}"]
+    for s in comparison["slower"]:
+        lines.append(f"    slower x{s['ratio']:.2f}: {get_sample_key(s['params'])}")
+    for c in comparison["changed_counts"]:
+        lines.append(f"    counts changed: {get_sample_key(c['params'])}")
+    for name, (before, after) in comparison["exponent_changes"].items():
+        lines.append(f"    exponent {name}: {before:.2f} -> {after:.2f}")
+    return "\n".join(lines)
@@ -0,0 +1,71 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# Worker process of parallel_catalog.py, which starts it as:
+#
+#   blender -b --factory-startup --python-exit-code 1 --python catalog_worker.py -- --jobs jobs_0.json --out <dir>
+#
+# Each job is {"index": i, "params": generation params}. The mesh of every job is saved to <dir>/<index>.npz right
+# after it's built (written under a temporary name first, so the main process never sees a half written file).
+
+import bpy
+import argparse
+import importlib
+import json
+import numpy as np
+import os, sys
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Build fire hydrant meshes and save them as arrays.")
+    parser.add_argument("--jobs", required=True, help="Path of the JSON file listing the jobs.")
+    parser.add_argument("--out", required=True, help="Directory to save the .npz files in.")
+    return parser.parse_args(argv)
+
+# The mesh params are read by name and passed on explicitly (as gen_fire_hydrant_data_only does), so any other
+# generator kwargs a preset may carry (data_only, geometry_nodes, location, ...) are ignored instead of reaching
+# get_fire_hydrant_profile.
+def get_job_arrays(fire_hydrant_data, params):
+    profile = fire_hydrant_data.get_fire_hydrant_profile(params.get("pole_radius", 3), params.get("num_pole_levels", 3), \
+        params.get("num_dome_levels", 3), params.get("stylize", False), params.get("pole_bent_factor", 1), \
+        params.get("dome_bent_factor", 1))
+    return fire_hydrant_data.get_fire_hydrant_mesh_arrays(profile, params.get("num_cir_segments", 16), \
+        params.get("add_geo_for_sharp_loops", True), params.get("sharp_loop_mode", 'BEVEL'), params.get("use_symmetry", False))
+
+def import_fire_hydrant_generator():
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_dir) not in sys.path:
+        sys.path.append(os.path.dirname(package_dir))
+    return importlib.import_module(os.path.basename(package_dir))
+
+if __name__ == "__main__":
+    args = parse_args()
+    fhg = import_fire_hydrant_generator()
+    with open(args.jobs) as f:
+        jobs = json.load(f)
+    for job in jobs:
+        coords, face_sizes, face_verts, crease_vert_pairs = get_job_arrays(fhg.fire_hydrant_data, job["params"])
+        tmp_filepath = os.path.join(args.out, str(job["index"]) + ".tmp.npz")
+        np.savez(tmp_filepath, coords=coords, face_sizes=face_sizes, face_verts=face_verts, \
+            crease_vert_pairs=crease_vert_pairs)
+        os.replace(tmp_filepath, os.path.join(args.out, str(job["index"]) + ".npz"))
@@ -24,6 +24,7 @@ import bpy
 import bmesh
 from mathutils import Vector
 from math import cos, pi, radians, sin
+import numpy as np
 
 def add_cone_once(context, location=(0, 0, 0), vertices=8, radius1=2.0, depth=3.0):
     if context.scene.objects.find("Cone") < 0: 
@@ -74,6 +75,33 @@ def get_placeholder_mesh_obj_and_bm(context, name, location=Vector((0, 0, 0))):
     bm = bmesh.from_edit_mesh(mesh_placeholder)
     return bm, obj_placeholder
     
+# Fill a mesh in one go from flat arrays: vertex coordinates, the number of corners of each face, and the vertex
+# index of each face corner (all faces back to back). Edges are derived from the faces.
+def fill_mesh_from_arrays(mesh, coords, face_sizes, face_verts):
+    coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+    face_sizes = np.asarray(face_sizes, dtype=np.int32)
+    face_verts = np.asarray(face_verts, dtype=np.int32)
+    loop_starts = np.zeros(len(face_sizes), dtype=np.int32)
+    np.cumsum(face_sizes[:-1], out=loop_starts[1:])
+
+    mesh.clear_geometry()
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.loops.add(len(face_verts))
+    mesh.loops.foreach_set("vertex_index", face_verts)
+    mesh.polygons.add(len(face_sizes))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    mesh.update(calc_edges=True)
+    return mesh
+
+def get_mesh_obj_from_arrays(context, name, location, coords, face_sizes, face_verts):
+    mesh = bpy.data.meshes.new(name=name)
+    fill_mesh_from_arrays(mesh, coords, face_sizes, face_verts)
+    obj = bpy.data.objects.new(name=name, object_data=mesh)
+    obj.location = location
+    context.collection.objects.link(obj)
+    return obj
+
 def bmesh_from_scratch():
     bm, obj_scratch = get_placeholder_mesh_obj_and_bm(bpy.context, "from_scratch", Vector((0, 0, 0)))
     bpy.ops.mesh.primitive_monkey_add(location=(0, -5, -5), rotation=(0, 0, 0), size=2.5)
@@ -0,0 +1,155 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+
+import bpy
+import hashlib
+import json
+
+from .mesh_fingerprint import get_object_fingerprint
+
+# Baked evaluated meshes: instead of having the depsgraph re-run subsurf (and whatever else is on the modifier
+# stack) for every hydrant on every scene change and again on export, the stack is evaluated once with
+# new_from_object and the result is swapped in as the object's mesh, its modifiers switched off. The base mesh is
+# kept (with a fake user) so the object can be switched back to the live modifiers at any time. Baked meshes are
+# cached on the base mesh fingerprint + the modifier settings, so identical hydrants (e.g. from the presets or a
+# scatter) share one baked mesh and only the first one pays for the evaluation.
+evaluated_mesh_cache = {}
+
+modifier_ui_props = {"name", "show_expanded", "is_active", "show_in_editmode", "show_on_cage", "is_override_data_editable", \
+    "use_pin_to_last"}
+
+# Every editable setting of every modifier in the stack (UI-only flags skipped), in stack order.
+def get_modifier_settings(obj):
+    settings = []
+    for mod in obj.modifiers:
+        values = [mod.type]
+        for prop in mod.bl_rna.properties:
+            if prop.is_readonly or prop.identifier in modifier_ui_props or prop.type == 'COLLECTION':
+                continue
+            value = getattr(mod, prop.identifier)
+            if prop.type == 'POINTER':
+                value = value.name if value is not None else None
+            elif getattr(prop, "is_array", False):
+                value = list(value)
+            values.append((prop.identifier, value))
+        settings.append(values)
+    return settings
+
+def get_evaluated_mesh_key(obj):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(get_object_fingerprint(obj).encode())
+    h.update(json.dumps(get_modifier_settings(obj), default=str).encode())
+    return h.hexdigest()
+
+def is_evaluated_mesh_baked(obj):
+    return "fh_base_mesh" in obj
+
+def get_cached_evaluated_mesh(key):
+    mesh = bpy.data.meshes.get(evaluated_mesh_cache.get(key, ""))
+    return mesh if mesh is not None and mesh.get("fh_evaluated_key") == key else None
+
+def clear_evaluated_mesh_cache():
+    for mesh_name in evaluated_mesh_cache.values():
+        mesh = bpy.data.meshes.get(mesh_name)
+        if mesh is not None and mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    evaluated_mesh_cache.clear()
+
+# Returns True when the baked mesh came from the cache.
+def bake_evaluated_mesh(context, obj):
+    if obj.type != 'MESH' or is_evaluated_mesh_baked(obj) or not any(mod.show_viewport for mod in obj.modifiers):
+        return False
+    key = get_evaluated_mesh_key(obj)
+    evaluated_mesh = get_cached_evaluated_mesh(key)
+    cache_hit = evaluated_mesh is not None
+    if not cache_hit:
+        depsgraph = context.evaluated_depsgraph_get()
+        evaluated_mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph), preserve_all_data_layers=True, \
+            depsgraph=depsgraph)
+        evaluated_mesh.name = obj.data.name + "_evaluated"
+        evaluated_mesh["fh_evaluated_key"] = key
+        evaluated_mesh_cache[key] = evaluated_mesh.name
+
+    base_mesh = obj.data
+    base_mesh.use_fake_user = True
+    obj["fh_base_mesh"] = base_mesh.name
+    # The modifiers are already in the baked mesh, so they get switched off (remembering which ones were on).
+    live_modifiers = [mod for mod in obj.modifiers if mod.show_viewport]
+    obj["fh_live_modifiers"] = json.dumps([[mod.name, mod.show_render] for mod in live_modifiers])
+    for mod in live_modifiers:
+        mod.show_viewport = False
+        mod.show_render = False
+    obj.data = evaluated_mesh
+    return cache_hit
+
+def get_baked_base_mesh_names():
+    return {obj["fh_base_mesh"] for obj in bpy.data.objects if is_evaluated_mesh_baked(obj)}
+
+# Linked duplicates and scatter instances share one base mesh, which keeps its fake user as long as any object baked
+# from it is still baked (they only point to it by name). Restoring many objects can leave that to the caller
+# (update_fake_user=False), to look through the objects only once.
+def restore_live_modifiers(obj, update_fake_user=True):
+    if not is_evaluated_mesh_baked(obj):
+        return False
+    base_mesh = bpy.data.meshes.get(obj["fh_base_mesh"])
+    if base_mesh is None:
+        return False
+    obj.data = base_mesh
+    for mod_name, show_render in json.loads(obj["fh_live_modifiers"]):
+        mod = obj.modifiers.get(mod_name)
+        if mod is not None:
+            mod.show_viewport = True
+            mod.show_render = show_render
+    del obj["fh_base_mesh"]
+    del obj["fh_live_modifiers"]
+    if update_fake_user:
+        base_mesh.use_fake_user = base_mesh.name in get_baked_base_mesh_names()
+    return True
+
+# Bakes (or with baked=False restores) every object in objs, returns how many were changed and how many of the
+# baked ones were cache hits.
+def set_evaluated_meshes_baked(context, objs, baked=True):
+    num_changed = num_cache_hits = 0
+    restored_meshes = []
+    for obj in objs:
+        if baked:
+            was_baked = is_evaluated_mesh_baked(obj)
+            num_cache_hits += bake_evaluated_mesh(context, obj)
+            num_changed += not was_baked and is_evaluated_mesh_baked(obj)
+        elif restore_live_modifiers(obj, update_fake_user=False):
+            num_changed += 1
+            restored_meshes.append(obj.data)
+    if restored_meshes:
+        baked_base_mesh_names = get_baked_base_mesh_names()
+        for mesh in restored_meshes:
+            mesh.use_fake_user = mesh.name in baked_base_mesh_names
+    return num_changed, num_cache_hits
+
+#========= Test Evaluated Mesh Cache ===================================================
+def test_evaluated_mesh_cache(context, gen_fn, num_hydrants=8):
+    objs = [gen_fn(context, f"fh_baked_{i}", location=(i*14, 28, 0), subsurf=True, subsurf_level=3) for i in range(num_hydrants)]
+    num_baked, num_cache_hits = set_evaluated_meshes_baked(context, objs)
+    print(f"Baked {num_baked} hydrants, {num_cache_hits} from the cache, {len(evaluated_mesh_cache)} baked meshes.")
+    num_restored, _ = set_evaluated_meshes_baked(context, objs[::2], baked=False)
+    print(f"Restored the live modifiers of {num_restored} hydrants.")
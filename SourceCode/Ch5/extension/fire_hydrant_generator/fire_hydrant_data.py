@@ -0,0 +1,520 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+import bpy
+import bmesh
+import hashlib
+import numpy as np
+from math import asin, cos
+
+from .creating_and_editing_mesh_objs import fill_mesh_from_arrays
+from .lathe import get_lathe_arrays, get_lathe_coords
+from .mesh_editing_ops import bevel_loops_bmesh, get_edge_crease_vert_pairs, get_loop_edges_bmesh, \
+    inset_batched_bmesh, set_edge_creases
+from .mesh_diff import get_mesh_diff
+from .mesh_fingerprint import get_mesh_coords, get_mesh_topology_arrays
+from .stage_timing import end_stage_run, format_speedup, get_last_stage_run, mark_stage, reset_stage_timings, \
+    set_stage_timing_enabled, start_stage_run
+
+# Data-only fire hydrant generation: the same shape as gen_stylized_fire_hydrant, but without a single bpy.ops call,
+# so it doesn't need a 3D Viewport (runs under blender -b) and doesn't rescan the mesh after every level.
+#
+# Every edge loop of the hydrant is an ellipse around a vertical axis, so the whole ring stack (base, pole levels,
+# dome levels, cap) is a table with one row per ring: [center x, center y, z, x radius, y radius]. Consecutive rings
+# are bridged with quads, the bottom ring is filled with an n-gon, and the top ring is collapsed into an apex.
+ring_cx, ring_cy, ring_z, ring_ax, ring_ay = range(5)
+# How sharp loops are kept sharp under subsurf: 2 extra bevel loops each, or an edge crease of 1 (no extra geometry).
+sharp_loop_modes = ('BEVEL', 'CREASE')
+# Inset thickness of the every-other-quad insets on the pole bottom and dome bands.
+band_inset_thickness = 0.1
+
+def get_fire_hydrant_profile(pole_radius=3, num_pole_levels=3, num_dome_levels=3, stylize=False, pole_bent_factor=1, \
+    dome_bent_factor=1):
+    ratio_base_to_pole = 1.5
+    base_radius = pole_radius*ratio_base_to_pole
+    base_height = pole_radius*0.5
+    rings = []
+
+    def add_ring(ring):
+        rings.append(ring)
+        return len(rings) - 1
+
+    # Base: a tube with two loop cuts, whose middle band is extruded outwards by 5% into a ridge.
+    base_bottom = add_ring((0, 0, -base_height/2, base_radius, base_radius))
+    add_ring((0, 0, -base_height/6, base_radius, base_radius))
+    ridge_bottom = add_ring((0, 0, -base_height/6, base_radius*1.05, base_radius*1.05))
+    ridge_top = add_ring((0, 0, base_height/6, base_radius*1.05, base_radius*1.05))
+    add_ring((0, 0, base_height/6, base_radius, base_radius))
+    base_top = add_ring((0, 0, base_height/2, base_radius, base_radius))
+
+    # Pole: each level is a copy of the previous loop, moved (and skewed if stylized) then scaled about its center.
+    # The extra level at the end is the cap base, matching the base in height.
+    pole_level_height = pole_radius*1.5
+    cx, cy, z, ax, ay = 0.0, 0.0, base_height/2, pole_radius, pole_radius
+    pole_rings = [(cx, cy, z, ax, ay)]
+    for i in range(num_pole_levels+1):
+        z_offset = pole_level_height if i < num_pole_levels else base_height
+        if stylize:
+            skew = pole_radius*0.5*pole_bent_factor*(1 if i%2 == 0 else -1)
+            scale = (0.85, 1) if i%2 == 0 else (1, 0.85)
+        else:
+            skew = 0
+            scale = (1, 1)
+        cx, cy, z, ax, ay = cx + skew, cy + skew, z + z_offset, ax*scale[0], ay*scale[1]
+        pole_rings.append((cx, cy, z, ax, ay))
+
+    pole_bottom = add_ring(pole_rings[0])
+    for ring in pole_rings[1:-1]:
+        pole_top = add_ring(ring)
+    # The cap base band is extruded out to the base radius (scaled by 1.5 about the band's median).
+    mx = (pole_rings[-2][ring_cx] + pole_rings[-1][ring_cx])/2
+    my = (pole_rings[-2][ring_cy] + pole_rings[-1][ring_cy])/2
+    for ring in pole_rings[-2:]:
+        ridge = add_ring((mx + ratio_base_to_pole*(ring[ring_cx] - mx), my + ratio_base_to_pole*(ring[ring_cy] - my), \
+            ring[ring_z], ring[ring_ax]*ratio_base_to_pole, ring[ring_ay]*ratio_base_to_pole))
+    cap_base_ridge_band = ridge - 1
+    cap_base_top = add_ring(pole_rings[-1])
+
+    # Dome: levels follow 75% of a quarter circle of the pole radius.
+    dome_radius = pole_radius
+    dome_level_height = pole_level_height/num_dome_levels
+    pcrt_of_sphere_for_dome = 0.75
+    r_prev_level = pole_radius
+    dome_bands = []
+    for i in range(num_dome_levels):
+        dome_bands.append(len(rings) - 1)
+        z_offset = (dome_radius/num_dome_levels)*(i+1)*pcrt_of_sphere_for_dome
+        r_at_level = pole_radius*cos(asin(z_offset/pole_radius))
+        level_scale_factor = r_at_level/r_prev_level
+        r_prev_level = r_at_level
+        skew = dome_radius*0.2*dome_bent_factor*(1 if i%2 == 0 else -1) if stylize else 0
+        cx, cy, z, ax, ay = cx + skew, cy + skew, z + dome_level_height, ax*level_scale_factor, ay*level_scale_factor
+        add_ring((cx, cy, z, ax, ay))
+
+    # Cap: 4 straight bands, the upper 3 extruded in/out/in, and the top loop collapsed into a single vertex.
+    cap_band_height = pole_radius*0.2
+    dome_cap_scale_factors = {1: 0.8, 2: 1.3, 3: 0.3}
+    cap_band_ring_pairs = []
+    for band in range(4):
+        z_next = z + cap_band_height
+        if band in dome_cap_scale_factors:
+            s = dome_cap_scale_factors[band]
+            band_bottom = add_ring((cx, cy, z, ax*s, ay*s))
+            band_top = add_ring((cx, cy, z_next, ax*s, ay*s))
+            cap_band_ring_pairs.append((band_bottom, band_top))
+        if band < 3:
+            add_ring((cx, cy, z_next, ax, ay))
+        z = z_next
+
+    return {
+        "rings": np.array(rings, dtype=np.float64),
+        "apex": np.array((cx, cy, z), dtype=np.float64),
+        "ridge_rings": [ridge_bottom, ridge_top],
+        "sharp_rings": [base_bottom, base_top, pole_bottom, pole_top, cap_base_top],
+        "cap_band_ring_pairs": cap_band_ring_pairs,
+        "pole_bottom_band": pole_bottom,
+        "cap_base_ridge_band": cap_base_ridge_band,
+        "dome_bands": dome_bands,
+    }
+
+# Ring verts start at +Y and go around like bmesh.ops.create_cone's. Returns (coords, face_sizes, face_verts), with
+# the quads of band k (between ring k and k+1) at face indices k*num_cir_segments .. (k+1)*num_cir_segments - 1.
+# x = cx + ax*sin(phi), y = cy + ay*cos(phi): a clockwise lathe sweep starting at +y, with the x radius as the
+# profile radius and the y radius as a y scale of it (x radii are never 0).
+def get_ring_coords(rings, num_cir_segments):
+    return get_lathe_coords(rings[:, [ring_ax, ring_z]], num_cir_segments, offsets=rings[:, [ring_cx, ring_cy]], \
+        scales=get_ring_scales(rings), start_angle=np.pi/2, clockwise=True)
+
+def get_ring_scales(rings):
+    return np.stack([np.ones(len(rings)), rings[:, ring_ay]/rings[:, ring_ax]], axis=-1)
+
+def get_fire_hydrant_arrays(profile, num_cir_segments):
+    rings = profile["rings"]
+    arrays = get_lathe_arrays(rings[:, [ring_ax, ring_z]], num_cir_segments, offsets=rings[:, [ring_cx, ring_cy]], \
+        scales=get_ring_scales(rings), cap_bottom='NGON', cap_top='FAN', apex_top=profile["apex"], uvs=False, \
+        start_angle=np.pi/2, clockwise=True)
+    return arrays["coords"], arrays["face_sizes"], arrays["face_verts"]
+
+# The insets and sharp-loop bevels on the ring stack in bm. ring_verts(k) gives the verts of ring k and
+# band_faces(k, step) every step-th quad of band k, both grabbed before any op changes the indices. Returns the
+# sharp vert loops (only still intact when not beveled), for creasing.
+def add_fire_hydrant_details_bmesh(bm, profile, ring_verts, band_faces, bevel_sharp_loops, run=None):
+    inset_groups = [(band_faces(profile["cap_base_ridge_band"]), 0.3, 0.1, False),
+                    (band_faces(profile["pole_bottom_band"], 2), band_inset_thickness, -0.15, True),
+                    ([f for k in profile["dome_bands"] for f in band_faces(k, 2)], band_inset_thickness, -0.15, False)]
+    ridge_loops = [ring_verts(k) for k in profile["ridge_rings"]]
+    sharp_loops = [ring_verts(k) for k in profile["sharp_rings"]]
+    cap_band_loops = [[ring_verts(a), ring_verts(b)] for a, b in profile["cap_band_ring_pairs"]]
+
+    if bevel_sharp_loops:
+        bevel_loops_bmesh(bm, ridge_loops, offset=0.1, segments=2)
+        mark_stage(run, "base ridge bevel", bm)
+    inset_batched_bmesh(bm, inset_groups)
+    mark_stage(run, "insets", bm)
+
+    # Add extra geometry to keep certain edge loops sharp (i.e. not rounded by subsurf).
+    if bevel_sharp_loops:
+        bevel_loops_bmesh(bm, sharp_loops, offset=0.1, segments=2)
+        for loops in cap_band_loops:
+            bevel_loops_bmesh(bm, loops, offset=0.1, segments=2)
+        mark_stage(run, "sharp-loop bevels", bm)
+    return ridge_loops + sharp_loops + [loop for loops in cap_band_loops for loop in loops]
+
+# Stage runs of the full and the sector build are keyed by what they build, so the sector speedup is only taken
+# against full builds of the same profile, segment count and sharp loop mode.
+def get_fire_hydrant_build_key(profile, num_cir_segments, add_geo_for_sharp_loops, sharp_loop_mode):
+    profile_digest = hashlib.blake2b(profile["rings"].tobytes() + profile["apex"].tobytes(), digest_size=4).hexdigest()
+    sharp_loops = sharp_loop_mode if add_geo_for_sharp_loops else "no sharp loops"
+    return f"{num_cir_segments} segments, {sharp_loops}, profile {profile_digest}"
+
+def build_fire_hydrant_mesh(mesh, profile, num_cir_segments=16, add_geo_for_sharp_loops=True, sharp_loop_mode='BEVEL', \
+    use_symmetry=False):
+    n = num_cir_segments
+    if use_symmetry and can_build_fire_hydrant_by_sectors(profile, n):
+        return build_fire_hydrant_mesh_by_sectors(mesh, profile, n, add_geo_for_sharp_loops, sharp_loop_mode)
+    bevel_sharp_loops = add_geo_for_sharp_loops and sharp_loop_mode == 'BEVEL'
+    crease_sharp_loops = add_geo_for_sharp_loops and sharp_loop_mode == 'CREASE'
+    run = start_stage_run("data_only", params_key=get_fire_hydrant_build_key(profile, n, add_geo_for_sharp_loops, \
+        sharp_loop_mode))
+    fill_mesh_from_arrays(mesh, *get_fire_hydrant_arrays(profile, n))
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    mark_stage(run, "ring stack", bm)
+    bm.verts.ensure_lookup_table()
+    bm.faces.ensure_lookup_table()
+    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+
+    def ring_verts(k):
+        return [bm.verts[k*n + j] for j in range(n)]
+
+    def band_faces(k, step=1):
+        return [bm.faces[k*n + j] for j in range(0, n, step)]
+
+    crease_loops = add_fire_hydrant_details_bmesh(bm, profile, ring_verts, band_faces, bevel_sharp_loops, run)
+
+    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+    mark_stage(run, "normals", bm)
+    # The ring verts are all still there (only the bevels would replace them), so their loops can be creased as is.
+    if crease_sharp_loops:
+        bm.verts.index_update()
+        crease_vert_pairs = [(e.verts[0].index, e.verts[1].index) for e in get_loop_edges_bmesh(bm, crease_loops)]
+    bm.to_mesh(mesh)
+    bm.free()
+    if crease_sharp_loops:
+        set_edge_creases(mesh, crease_vert_pairs)
+        mark_stage(run, "sharp-loop creases")
+    mesh.update()
+    mark_stage(run, "write mesh")
+    end_stage_run(run)
+    return mesh
+
+#========= Sector Builds ========================================================
+# Without stylize every ring is a circle around the Z axis, and the every-other-quad insets repeat every 2 segments,
+# so the finished hydrant is made of num_cir_segments/2 identical sectors. Then only one sector is built (ring
+# stack, insets, bevels, creases), with sector_margin segments of extra ring stack on both sides so the ops near the
+# sector's sides see the same neighbours as in the whole ring, and the margins are cut off again. The sector's slice
+# of the bottom n-gon is a triangle fan, so the bottom loop is beveled like the others. The sector's arrays are then
+# rotated into the other sectors in numpy, the verts on the seams are matched up by index, and the fans are merged
+# back into the n-gon. The result is the same mesh as the full build up to vertex order (see
+# test_fire_hydrant_sectors). Stylized hydrants (skewed, elliptic rings), odd segment counts and band quads too
+# narrow for their insets (which turn inside out and end up outside the sector) are always built whole, and so are
+# hydrants with fewer than sector_min_segments segments, where the sector's fixed costs outweigh the ops it saves.
+sector_segments = 2
+sector_min_segments = 32
+sector_margin = 2
+sector_weld_distance = 1e-4
+
+def can_build_fire_hydrant_by_sectors(profile, num_cir_segments):
+    rings = profile["rings"]
+    inset_rings = [k + i for k in [profile["pole_bottom_band"]] + profile["dome_bands"] for i in range(2)]
+    min_inset_quad_width = 2*rings[inset_rings, ring_ax].min()*np.sin(np.pi/num_cir_segments)
+    return num_cir_segments%sector_segments == 0 and num_cir_segments >= sector_min_segments and \
+        not rings[:, [ring_cx, ring_cy]].any() and np.array_equal(rings[:, ring_ax], rings[:, ring_ay]) and \
+        not profile["apex"][:2].any() and min_inset_quad_width > 2*band_inset_thickness
+
+# The ring stack between segments first .. first + num_segments (wrapping around), with a triangle fan around the
+# bottom center (the last vert) for the bottom n-gon. The quads of band k are at face indices
+# k*num_segments .. (k+1)*num_segments - 1, all faces wound to face outwards.
+def get_fire_hydrant_sector_arrays(profile, num_cir_segments, first, num_segments):
+    rings = profile["rings"]
+    columns = (first + np.arange(num_segments + 1))%num_cir_segments
+    ring_coords = get_ring_coords(rings, num_cir_segments).reshape(len(rings), num_cir_segments, 3)[:, columns]
+    bottom_center = rings[0, [ring_cx, ring_cy, ring_z]]
+    coords = np.concatenate([ring_coords.reshape(-1, 3), profile["apex"][None, :], bottom_center[None, :]])
+    w = num_segments + 1
+    i = np.arange(num_segments)
+    base = (np.arange(len(rings) - 1)*w)[:, None]
+    quads = np.stack([base + i, base + w + i, base + w + i + 1, base + i + 1], axis=-1).reshape(-1)
+    top = (len(rings) - 1)*w
+    apex_tris = np.stack([top + i + 1, top + i, np.full(num_segments, len(rings)*w)], axis=-1).ravel()
+    bottom_tris = np.stack([i, i + 1, np.full(num_segments, len(rings)*w + 1)], axis=-1).ravel()
+    face_sizes = np.concatenate([np.full((len(rings) - 1)*num_segments, 4), np.full(2*num_segments, 3)]).astype(np.int32)
+    return coords, face_sizes, np.concatenate([quads, apex_tris, bottom_tris]).astype(np.int32)
+
+# Segment position of a point going clockwise from +Y like the ring verts (0 at vert 0, 1 at vert 1, ...).
+def get_segment_position(co, num_cir_segments):
+    return ((np.pi/2 - np.arctan2(co[1], co[0]))%(2*np.pi))*num_cir_segments/(2*np.pi)
+
+def rotate_z(coords, angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.stack([c*coords[:, 0] - s*coords[:, 1], s*coords[:, 0] + c*coords[:, 1], coords[:, 2]], axis=-1)
+
+# Verts on edges used by only one face.
+def get_boundary_verts(face_sizes, face_verts):
+    loop_starts = np.cumsum(face_sizes) - face_sizes
+    next_loops = np.arange(len(face_verts)) + 1
+    next_loops[loop_starts + face_sizes - 1] = loop_starts
+    edges = np.sort(np.stack([face_verts, face_verts[next_loops]], axis=-1), axis=1)
+    edges, counts = np.unique(edges, axis=0, return_counts=True)
+    return np.unique(edges[counts == 1])
+
+# Copies of one sector's arrays rotated clockwise into all num_sectors sectors. A boundary vert of the sector that,
+# rotated one sector on, lands on another boundary vert is merged into that vert of the next sector (the seams
+# aren't straight where the bevels and insets meet them), and the verts on the axis are shared by all sectors.
+def get_spun_sector_arrays(coords, face_sizes, face_verts, vert_pairs, num_sectors):
+    angle = 2*np.pi/num_sectors
+    num_verts = len(coords)
+    on_axis = np.hypot(coords[:, 0], coords[:, 1]) < sector_weld_distance
+    boundary = get_boundary_verts(face_sizes, face_verts)
+    boundary = boundary[~on_axis[boundary]]
+    dists = np.linalg.norm(rotate_z(coords[boundary], angle)[:, None] - coords[boundary][None], axis=-1)
+    welded = dists.min(axis=1) < sector_weld_distance
+    ends, end_starts = boundary[welded], boundary[dists.argmin(axis=1)[welded]]
+
+    sector_offsets = np.arange(num_sectors)[:, None]*num_verts
+    vert_map = (sector_offsets + np.arange(num_verts)).reshape(num_sectors, num_verts)
+    vert_map[:, on_axis] = np.flatnonzero(on_axis)
+    vert_map[:, ends] = np.roll(sector_offsets, -1, axis=0) + end_starts
+    # A vert merged into the next sector may itself be merged into the one after.
+    vert_map = vert_map.ravel()
+    for _ in range(num_sectors):
+        vert_map = vert_map[vert_map]
+    used, vert_map = np.unique(vert_map, return_inverse=True)
+    all_coords = np.concatenate([rotate_z(coords, -k*angle) for k in range(num_sectors)])[used]
+    all_face_verts = vert_map[(sector_offsets + face_verts).ravel()]
+    all_vert_pairs = vert_map[(sector_offsets[:, :, None] + vert_pairs).reshape(-1, 2)]
+    return all_coords, np.tile(face_sizes, num_sectors), all_face_verts, all_vert_pairs
+
+# The faces around center_vert (a fan, possibly beveled) merged into one n-gon, and center_vert removed.
+def merge_fan_into_ngon(coords, face_sizes, face_verts, vert_pairs, center_vert):
+    loop_starts = np.cumsum(face_sizes) - face_sizes
+    loop_faces = np.repeat(np.arange(len(face_sizes)), face_sizes)
+    fan_faces = loop_faces[face_verts == center_vert]
+    # Each fan face runs center, v1 .. vk, and the next one around starts at vk.
+    fan_verts = {}
+    for f in fan_faces:
+        verts = face_verts[loop_starts[f]:loop_starts[f] + face_sizes[f]]
+        verts = np.roll(verts, -np.flatnonzero(verts == center_vert)[0])[1:]
+        fan_verts[verts[0]] = verts
+    ngon = []
+    v = first = next(iter(fan_verts))
+    while True:
+        ngon.extend(fan_verts[v][:-1])
+        v = fan_verts[v][-1]
+        if v == first:
+            break
+
+    keep_faces = np.ones(len(face_sizes), dtype=bool)
+    keep_faces[fan_faces] = False
+    face_sizes = np.append(face_sizes[keep_faces], len(ngon)).astype(np.int32)
+    face_verts = np.concatenate([face_verts[keep_faces[loop_faces]], ngon])
+    face_verts -= face_verts > center_vert
+    vert_pairs = vert_pairs - (vert_pairs > center_vert)
+    return np.delete(coords, center_vert, axis=0), face_sizes, face_verts, vert_pairs
+
+def build_fire_hydrant_mesh_by_sectors(mesh, profile, num_cir_segments=16, add_geo_for_sharp_loops=True, \
+    sharp_loop_mode='BEVEL'):
+    n = num_cir_segments
+    w = sector_segments + 2*sector_margin
+    bevel_sharp_loops = add_geo_for_sharp_loops and sharp_loop_mode == 'BEVEL'
+    run = start_stage_run("data_only_sector", baseline_label="data_only", params_key=get_fire_hydrant_build_key(profile, n, \
+        add_geo_for_sharp_loops, sharp_loop_mode))
+    fill_mesh_from_arrays(mesh, *get_fire_hydrant_sector_arrays(profile, n, -sector_margin, w))
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    mark_stage(run, "ring stack", bm)
+    bm.verts.ensure_lookup_table()
+    bm.faces.ensure_lookup_table()
+
+    def ring_verts(k):
+        return [bm.verts[k*(w + 1) + i] for i in range(w + 1)]
+
+    # The margin has an even number of segments, so every other quad lines up with the whole ring's.
+    def band_faces(k, step=1):
+        return [bm.faces[k*w + i] for i in range(0, w, step)]
+
+    crease_loops = add_fire_hydrant_details_bmesh(bm, profile, ring_verts, band_faces, bevel_sharp_loops, run)
+    # Creases go on the edges themselves here, so they are copied along with the sector.
+    if add_geo_for_sharp_loops and sharp_loop_mode == 'CREASE':
+        crease_layer = bm.edges.layers.float.get("crease_edge") or bm.edges.layers.float.new("crease_edge")
+        for e in get_loop_edges_bmesh(bm, crease_loops):
+            e[crease_layer] = 1.0
+    mark_stage(run, "sector details", bm)
+
+    margin_faces = [f for f in bm.faces if not 0 <= get_segment_position(f.calc_center_median(), n) < sector_segments]
+    bmesh.ops.delete(bm, geom=margin_faces, context='FACES')
+    bm.to_mesh(mesh)
+    bm.free()
+    mark_stage(run, "cut margins")
+
+    face_sizes, face_verts = get_mesh_topology_arrays(mesh)
+    arrays = get_spun_sector_arrays(get_mesh_coords(mesh).astype(np.float64), face_sizes, face_verts, \
+        get_edge_crease_vert_pairs(mesh), n//sector_segments)
+    bottom_center = profile["rings"][0, [ring_cx, ring_cy, ring_z]]
+    center_vert = np.linalg.norm(arrays[0] - bottom_center, axis=1).argmin()
+    coords, face_sizes, face_verts, crease_vert_pairs = merge_fan_into_ngon(*arrays, center_vert)
+    mark_stage(run, "spin + weld")
+    fill_mesh_from_arrays(mesh, coords, face_sizes, face_verts)
+    if len(crease_vert_pairs):
+        set_edge_creases(mesh, crease_vert_pairs)
+    mesh.update()
+    mark_stage(run, "write mesh")
+    end_stage_run(run)
+    return mesh
+
+# The finished mesh as (coords, face_sizes, face_verts, crease_vert_pairs), built in a temporary mesh datablock that's
+# removed again.
+def get_fire_hydrant_mesh_arrays(profile, num_cir_segments=16, add_geo_for_sharp_loops=True, sharp_loop_mode='BEVEL', \
+    use_symmetry=False):
+    mesh = bpy.data.meshes.new(name="fh_arrays")
+    build_fire_hydrant_mesh(mesh, profile, num_cir_segments, add_geo_for_sharp_loops, sharp_loop_mode, use_symmetry)
+    face_sizes, face_verts = get_mesh_topology_arrays(mesh)
+    coords = get_mesh_coords(mesh)
+    crease_vert_pairs = get_edge_crease_vert_pairs(mesh)
+    bpy.data.meshes.remove(mesh)
+    return coords, face_sizes, face_verts, crease_vert_pairs
+
+def gen_fire_hydrant_data_only(context, name, location=(0, 0, 0), num_cir_segments=16, pole_radius=3, num_pole_levels=3, \
+    num_dome_levels=3, stylize=False, pole_bent_factor=1, dome_bent_factor=1, subsurf=False, subsurf_level=2, \
+    add_geo_for_sharp_loops=True, sharp_loop_mode='BEVEL', use_symmetry=False):
+    profile = get_fire_hydrant_profile(pole_radius, num_pole_levels, num_dome_levels, stylize, pole_bent_factor, dome_bent_factor)
+    mesh = bpy.data.meshes.new(name=name)
+    build_fire_hydrant_mesh(mesh, profile, num_cir_segments, add_geo_for_sharp_loops, sharp_loop_mode, use_symmetry)
+
+    fh_obj = bpy.data.objects.new(name=name, object_data=mesh)
+    fh_obj.location = location
+    context.collection.objects.link(fh_obj)
+    set_fire_hydrant_subsurf(fh_obj, subsurf, subsurf_level)
+    return fh_obj
+
+def set_fire_hydrant_subsurf(fh_obj, subsurf, subsurf_level):
+    fh_subsurf_mod = fh_obj.modifiers.get("subsurf_mod")
+    if not subsurf:
+        if fh_subsurf_mod is not None:
+            fh_obj.modifiers.remove(fh_subsurf_mod)
+        return
+    if fh_subsurf_mod is None:
+        fh_subsurf_mod = fh_obj.modifiers.new("subsurf_mod", 'SUBSURF')
+    fh_subsurf_mod.levels = subsurf_level
+    fh_subsurf_mod.subdivision_type = 'CATMULL_CLARK'
+
+#========= In-place Updates ========================================================
+# For the live preview: one object is rebuilt over and over while a float param (pole_radius, stylize, the bent
+# factors) is dragged. This is not a topology template; every update runs the full bmesh build. What it saves is the
+# mesh refill: the topology only depends on the integer/bool params, so a mesh keeps the topology key it was built
+# with, and while that matches only its vert coords are rewritten (one foreach_set), keeping the mesh and everything
+# on it.
+#
+# The coords can't be evaluated from a cached template either. The insets and bevels have absolute widths that get
+# clamped by the faces around them, and around some radii inset verts move across their quad, so anchoring the verts
+# to the ring stack (or interpolating between builds at nearby radii) doesn't reproduce them.
+
+# The last entry is 0 without sharp loops, else 1 + the index of the sharp loop mode.
+def get_fire_hydrant_topology_key(num_cir_segments, num_pole_levels, num_dome_levels, add_geo_for_sharp_loops, \
+    sharp_loop_mode='BEVEL'):
+    sharp_loops = sharp_loop_modes.index(sharp_loop_mode) + 1 if add_geo_for_sharp_loops else 0
+    return (num_cir_segments, num_pole_levels, num_dome_levels, sharp_loops)
+
+# Same params as gen_fire_hydrant_data_only. With fh_obj given, its mesh is rebuilt in place: if it already has the
+# same topology only the vert coords are written, otherwise it's refilled.
+def update_fire_hydrant_mesh(context, name, location=(0, 0, 0), num_cir_segments=16, pole_radius=3, num_pole_levels=3, \
+    num_dome_levels=3, stylize=False, pole_bent_factor=1, dome_bent_factor=1, subsurf=False, subsurf_level=2, \
+    add_geo_for_sharp_loops=True, sharp_loop_mode='BEVEL', fh_obj=None):
+    key = get_fire_hydrant_topology_key(num_cir_segments, num_pole_levels, num_dome_levels, add_geo_for_sharp_loops, \
+        sharp_loop_mode)
+    profile = get_fire_hydrant_profile(pole_radius, num_pole_levels, num_dome_levels, stylize, pole_bent_factor, dome_bent_factor)
+    coords, face_sizes, face_verts, crease_vert_pairs = get_fire_hydrant_mesh_arrays(profile, num_cir_segments, \
+        add_geo_for_sharp_loops, sharp_loop_mode)
+    if fh_obj is None:
+        fh_obj = bpy.data.objects.new(name=name, object_data=bpy.data.meshes.new(name=name))
+        context.collection.objects.link(fh_obj)
+    fh_obj.location = location
+
+    mesh = fh_obj.data
+    if tuple(mesh.get("fh_topology_key", ())) == key:
+        mesh.vertices.foreach_set("co", coords.astype(np.float32).ravel())
+        mesh.update()
+    else:
+        fill_mesh_from_arrays(mesh, coords, face_sizes, face_verts)
+        if len(crease_vert_pairs):
+            set_edge_creases(mesh, crease_vert_pairs)
+        mesh["fh_topology_key"] = key
+    set_fire_hydrant_subsurf(fh_obj, subsurf, subsurf_level)
+    return fh_obj
+
+#========= Test In-place Updates ========================================================
+# A pole_radius slider drag on one object, plain and then stylized, each step diffed against a separate
+# gen_fire_hydrant_data_only object (topology, creases and positions).
+def test_fire_hydrant_in_place_updates(context, sharp_loop_mode='BEVEL', num_steps=20):
+    fh_obj = None
+    for stylize in (False, True):
+        max_pos_error = 0.0
+        num_changed = 0
+        for pole_radius in np.linspace(2, 6, num_steps):
+            fh_obj = update_fire_hydrant_mesh(context, "fh_in_place", location=(0, 30, 0), pole_radius=pole_radius, \
+                stylize=stylize, sharp_loop_mode=sharp_loop_mode, fh_obj=fh_obj)
+            ref_obj = gen_fire_hydrant_data_only(context, "fh_in_place_ref", pole_radius=pole_radius, stylize=stylize, \
+                sharp_loop_mode=sharp_loop_mode)
+            diff = get_mesh_diff(ref_obj.data, fh_obj.data, match='INDEX')
+            ref_creases, creases = (np.unique(np.sort(get_edge_crease_vert_pairs(obj.data), axis=1), axis=0) \
+                for obj in (ref_obj, fh_obj))
+            same_creases = np.array_equal(ref_creases, creases)
+            if not (diff["same_topology"] and diff["vert_count_delta"] == 0 and same_creases):
+                num_changed += 1
+            max_pos_error = max(max_pos_error, diff["max_pos_error"])
+            ref_mesh = ref_obj.data
+            bpy.data.objects.remove(ref_obj)
+            bpy.data.meshes.remove(ref_mesh)
+        print(f"in-place drag (stylize={stylize}, {sharp_loop_mode}): {num_changed} of {num_steps} steps with different " \
+            f"topology or creases, max position error vs data-only build {max_pos_error:.2e}")
+
+#========= Test Sector Builds ========================================================
+def test_fire_hydrant_sectors(context, num_cir_segments=32, num_repeats=5):
+    set_stage_timing_enabled(True)
+    profile = get_fire_hydrant_profile(pole_radius=3, num_pole_levels=6, num_dome_levels=4)
+    for sharp_loop_mode in sharp_loop_modes:
+        reset_stage_timings()
+        meshes = [bpy.data.meshes.new(name="fh_sector_test_" + str(i)) for i in range(2)]
+        for _ in range(num_repeats):
+            build_fire_hydrant_mesh(meshes[0], profile, num_cir_segments, sharp_loop_mode=sharp_loop_mode)
+            build_fire_hydrant_mesh(meshes[1], profile, num_cir_segments, sharp_loop_mode=sharp_loop_mode, use_symmetry=True)
+        # The sector build numbers its verts differently, so verts are matched by position and the (order dependent)
+        # topology fingerprints are left out.
+        diff = get_mesh_diff(meshes[0], meshes[1], match='NEAREST')
+        same = diff["vert_count_delta"] == diff["edge_count_delta"] == diff["face_count_delta"] == 0 and \
+            not diff["face_size_changes"] and diff["max_pos_error"] <= 1e-4
+        print(f"sector build ({sharp_loop_mode}): " + ("same up to vertex order" if same else "CHANGED") + \
+            f", max position error {diff['max_pos_error']:.2e}")
+        print(format_speedup(get_last_stage_run()))
+        for mesh in meshes:
+            bpy.data.meshes.remove(mesh)
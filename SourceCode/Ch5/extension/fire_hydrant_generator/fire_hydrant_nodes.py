@@ -0,0 +1,275 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+import bpy
+from math import pi
+
+from .fire_hydrant_data import set_fire_hydrant_subsurf
+
+# Geometry Nodes backend: one node group, built once per file and shared by the "fh_nodes" modifier of every hydrant
+# made with it, so param changes and copies are evaluated natively instead of by Python.
+#
+# The group rebuilds the ring table of fire_hydrant_data.get_fire_hydrant_profile in closed form from each vert's
+# ring index (Curve to Mesh of a Segments sided circle along a line with one point per ring gives the verts ring by
+# ring), then collapses the top ring into the apex with Merge by Distance. There are no bevel/inset nodes, so:
+# - the sharp loops get an edge crease (crease_edge) of 1 instead of extra bevel loops, for the subsurf modifier,
+# - the pole bottom and dome panels are individually extruded inwards and scaled down, and the cap base ridge
+#   keeps its shape without the extra inset.
+fh_node_group_name = "FH_FireHydrant"
+fh_node_group_version = 1
+
+# (socket name, socket type, default, min, max, gen_stylized_fire_hydrant param)
+fh_node_group_inputs = [
+    ("Segments", 'NodeSocketInt', 16, 8, 64, "num_cir_segments"),
+    ("Pole Radius", 'NodeSocketFloat', 3.0, 1.0, 50.0, "pole_radius"),
+    ("Pole Levels", 'NodeSocketInt', 3, 1, 20, "num_pole_levels"),
+    ("Dome Levels", 'NodeSocketInt', 3, 1, 20, "num_dome_levels"),
+    ("Stylize", 'NodeSocketBool', False, None, None, "stylize"),
+    ("Pole Bent Factor", 'NodeSocketFloat', 1.0, 1.0, 10.0, "pole_bent_factor"),
+    ("Dome Bent Factor", 'NodeSocketFloat', 1.0, 1.0, 10.0, "dome_bent_factor"),
+    ("Sharp Loops", 'NodeSocketBool', True, None, None, "add_geo_for_sharp_loops"),
+]
+
+#========= Node Building Helpers ========================================================
+def connect(node_tree, value, socket):
+    if isinstance(value, bpy.types.NodeSocket):
+        node_tree.links.new(value, socket)
+    else:
+        socket.default_value = value
+
+# inputs maps socket names (or indices) to sockets or constant values.
+def add_node(node_tree, bl_idname, inputs={}, **props):
+    num_nodes = len(node_tree.nodes)
+    node = node_tree.nodes.new(bl_idname)
+    node.location = (200*(num_nodes//25), -160*(num_nodes%25))
+    for prop, value in props.items():
+        setattr(node, prop, value)
+    for key, value in inputs.items():
+        connect(node_tree, value, node.inputs[key])
+    return node
+
+def add_math(node_tree, operation, *values):
+    node = add_node(node_tree, 'ShaderNodeMath', dict(enumerate(values)), operation=operation)
+    return node.outputs[0]
+
+# Range masks for integer valued fields, as 0/1 floats.
+def at_least(node_tree, value, lower):
+    return add_math(node_tree, 'GREATER_THAN', value, add_math(node_tree, 'SUBTRACT', lower, 0.5))
+
+def in_range(node_tree, value, lower, upper):
+    return add_math(node_tree, 'MULTIPLY', at_least(node_tree, value, lower), \
+        add_math(node_tree, 'LESS_THAN', value, add_math(node_tree, 'ADD', upper, 0.5)))
+
+def equals(node_tree, value, other):
+    return add_math(node_tree, 'COMPARE', value, other, 0.5)
+
+#========= Ring Table ========================================================
+# (center, z, x radius, y radius) of ring r, the center being (center, center) in xy like in the profile table.
+def add_ring_fields(node_tree, group_in, r):
+    def m(operation, *values):
+        return add_math(node_tree, operation, *values)
+    R = group_in.outputs["Pole Radius"]
+    P = group_in.outputs["Pole Levels"]
+    D = group_in.outputs["Dome Levels"]
+    stylize = group_in.outputs["Stylize"]
+    base_height = m('MULTIPLY', R, 0.5)
+    base_radius = m('MULTIPLY', R, 1.5)
+    skew_factor = m('MULTIPLY', m('MULTIPLY', R, 0.5), m('MULTIPLY', group_in.outputs["Pole Bent Factor"], stylize))
+    dome_skew_factor = m('MULTIPLY', m('MULTIPLY', R, 0.2), m('MULTIPLY', group_in.outputs["Dome Bent Factor"], stylize))
+    level_scale = m('SUBTRACT', 1, m('MULTIPLY', stylize, 0.15))
+
+    # Base, rings 0-5: bottom, 2 loop cuts, the ridge pushed out 5% between them, top.
+    base_z = m('MULTIPLY', base_height, m('ADD', -0.5, m('MULTIPLY', 1/3, m('ADD', m('ADD', at_least(node_tree, r, 1), \
+        at_least(node_tree, r, 3)), at_least(node_tree, r, 5)))))
+    base_a = m('MULTIPLY', base_radius, m('ADD', 1, m('MULTIPLY', 0.05, in_range(node_tree, r, 2, 3))))
+
+    # Pole ring k: skew alternates (+, -, ...), x and y scale alternate too, the last level is the cap base.
+    def pole_ring(k):
+        c = m('MULTIPLY', skew_factor, m('FLOORED_MODULO', k, 2))
+        z = m('ADD', m('ADD', m('MULTIPLY', base_height, 0.5), m('MULTIPLY', m('MULTIPLY', R, 1.5), m('MINIMUM', k, P))), \
+            m('MULTIPLY', base_height, m('GREATER_THAN', k, P)))
+        ax = m('MULTIPLY', R, m('POWER', level_scale, m('CEIL', m('MULTIPLY', k, 0.5))))
+        ay = m('MULTIPLY', R, m('POWER', level_scale, m('FLOOR', m('MULTIPLY', k, 0.5))))
+        return c, z, ax, ay
+
+    # Pole, rings 6 .. 9+P: P_0..P_P, the cap base ridge (P_P and P_P+1 scaled by 1.5 about their median), P_P+1.
+    ridge_start = m('ADD', P, 7)
+    k = m('SUBTRACT', m('SUBTRACT', m('SUBTRACT', r, 6), at_least(node_tree, r, ridge_start)), \
+        at_least(node_tree, r, m('ADD', P, 9)))
+    pole_c, pole_z, pole_ax, pole_ay = pole_ring(k)
+    ridge = in_range(node_tree, r, ridge_start, m('ADD', P, 8))
+    pole_c = m('ADD', pole_c, m('MULTIPLY', ridge, m('SUBTRACT', m('MULTIPLY', pole_c, 0.5), m('MULTIPLY', skew_factor, 0.25))))
+    ridge_scale = m('ADD', 1, m('MULTIPLY', ridge, 0.5))
+    pole_ax = m('MULTIPLY', pole_ax, ridge_scale)
+    pole_ay = m('MULTIPLY', pole_ay, ridge_scale)
+
+    # Dome, rings 10+P .. 9+P+D: levels follow 75% of a quarter circle, with their own alternating skew.
+    top_c, top_z, top_ax, top_ay = pole_ring(m('ADD', P, 1))
+    dome_start = m('ADD', P, 10)
+    i = m('MINIMUM', m('MAXIMUM', m('SUBTRACT', r, dome_start), 0), m('SUBTRACT', D, 1))
+    level = m('ADD', i, 1)
+    dome_scale = m('SQRT', m('SUBTRACT', 1, m('POWER', m('DIVIDE', m('MULTIPLY', level, 0.75), D), 2)))
+    dome_c = m('ADD', top_c, m('MULTIPLY', dome_skew_factor, m('FLOORED_MODULO', level, 2)))
+    dome_z = m('ADD', top_z, m('MULTIPLY', m('DIVIDE', m('MULTIPLY', R, 1.5), D), level))
+    dome_ax = m('MULTIPLY', top_ax, dome_scale)
+    dome_ay = m('MULTIPLY', top_ay, dome_scale)
+
+    # Cap, rings 10+P+D and up: 4 bands of 0.2R, the upper 3 extruded in/out/in (0.8, 1.3, 0.3), then the apex.
+    cap_start = m('ADD', dome_start, D)
+    cap_c = m('ADD', top_c, m('MULTIPLY', dome_skew_factor, m('FLOORED_MODULO', D, 2)))
+    last_dome_scale = (1 - 0.75**2)**0.5
+    j = m('MAXIMUM', m('SUBTRACT', r, cap_start), 0)
+    cap_z = m('ADD', m('ADD', top_z, m('MULTIPLY', R, 1.5)), \
+        m('MULTIPLY', m('MULTIPLY', R, 0.2), m('ADD', m('FLOOR', m('DIVIDE', m('ADD', j, 1), 3)), 1)))
+    cap_scale = m('ADD', m('ADD', m('SUBTRACT', 1, m('MULTIPLY', 0.2, in_range(node_tree, j, 1, 2))), \
+        m('MULTIPLY', 0.3, in_range(node_tree, j, 4, 5))), \
+        m('ADD', m('MULTIPLY', -0.7, in_range(node_tree, j, 7, 8)), m('MULTIPLY', -1, at_least(node_tree, j, 9))))
+    cap_ax = m('MULTIPLY', m('MULTIPLY', top_ax, last_dome_scale), cap_scale)
+    cap_ay = m('MULTIPLY', m('MULTIPLY', top_ay, last_dome_scale), cap_scale)
+
+    masks = [m('LESS_THAN', r, 5.5), in_range(node_tree, r, 6, m('ADD', P, 9)), \
+        in_range(node_tree, r, dome_start, m('SUBTRACT', cap_start, 1)), at_least(node_tree, r, cap_start)]
+    sections = [(0, base_z, base_a, base_a), (pole_c, pole_z, pole_ax, pole_ay), (dome_c, dome_z, dome_ax, dome_ay), \
+        (cap_c, cap_z, cap_ax, cap_ay)]
+    fields = []
+    for f in range(4):
+        value = 0
+        for mask, section in zip(masks, sections):
+            value = m('ADD', value, m('MULTIPLY', mask, section[f]))
+        fields.append(value)
+    return fields
+
+def get_num_rings(node_tree, group_in):
+    return add_math(node_tree, 'ADD', add_math(node_tree, 'ADD', group_in.outputs["Pole Levels"], \
+        group_in.outputs["Dome Levels"]), 20)
+
+#========= Node Group ========================================================
+def build_fire_hydrant_node_group(node_tree):
+    def m(operation, *values):
+        return add_math(node_tree, operation, *values)
+    node_tree.nodes.clear()
+    node_tree.interface.clear()
+    node_tree.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    for name, socket_type, default, min_value, max_value, _ in fh_node_group_inputs:
+        socket = node_tree.interface.new_socket(name=name, in_out='INPUT', socket_type=socket_type)
+        socket.default_value = default
+        if min_value is not None:
+            socket.min_value = min_value
+            socket.max_value = max_value
+    group_in = add_node(node_tree, 'NodeGroupInput')
+    segments = group_in.outputs["Segments"]
+    P = group_in.outputs["Pole Levels"]
+    D = group_in.outputs["Dome Levels"]
+
+    # One ring of Segments verts per point of the line, verts numbered ring by ring, bottom n-gon (and top one, which
+    # disappears when the apex ring is merged).
+    line = add_node(node_tree, 'GeometryNodeMeshLine', {"Count": get_num_rings(node_tree, group_in)})
+    path = add_node(node_tree, 'GeometryNodeMeshToCurve', {"Mesh": line.outputs["Mesh"]})
+    profile = add_node(node_tree, 'GeometryNodeCurvePrimitiveCircle', {"Resolution": segments, "Radius": 1.0})
+    sweep = add_node(node_tree, 'GeometryNodeCurveToMesh', {"Curve": path.outputs["Curve"], \
+        "Profile Curve": profile.outputs["Curve"], "Fill Caps": True})
+
+    # Vert positions: ring verts start at +Y and go around like the ones of bmesh.ops.create_cone.
+    index = add_node(node_tree, 'GeometryNodeInputIndex').outputs["Index"]
+    ring = m('FLOOR', m('DIVIDE', index, segments))
+    phi = m('MULTIPLY', m('DIVIDE', m('FLOORED_MODULO', index, segments), segments), 2*pi)
+    c, z, ax, ay = add_ring_fields(node_tree, group_in, ring)
+    position = add_node(node_tree, 'ShaderNodeCombineXYZ', {"X": m('ADD', c, m('MULTIPLY', ax, m('SINE', phi))), \
+        "Y": m('ADD', c, m('MULTIPLY', ay, m('COSINE', phi))), "Z": z})
+    set_position = add_node(node_tree, 'GeometryNodeSetPosition', {"Geometry": sweep.outputs["Mesh"], \
+        "Position": position.outputs["Vector"]})
+
+    # Sharp loops: ring edges of the base, pole bottom/top, cap base, base ridge and cap bands.
+    edge_verts = add_node(node_tree, 'GeometryNodeInputMeshEdgeVertices')
+    ring_1 = m('FLOOR', m('DIVIDE', edge_verts.outputs["Vertex Index 1"], segments))
+    ring_2 = m('FLOOR', m('DIVIDE', edge_verts.outputs["Vertex Index 2"], segments))
+    cap_start = m('ADD', m('ADD', P, D), 10)
+    sharp_rings = [0, 2, 3, 5, 6, m('ADD', P, 6), m('ADD', P, 9)] + [m('ADD', cap_start, j) for j in (1, 2, 4, 5, 7, 8)]
+    is_sharp = 0
+    for sharp_ring in sharp_rings:
+        is_sharp = m('ADD', is_sharp, equals(node_tree, ring_1, sharp_ring))
+    crease = m('MULTIPLY', m('MULTIPLY', equals(node_tree, ring_1, ring_2), m('MINIMUM', is_sharp, 1)), \
+        group_in.outputs["Sharp Loops"])
+    store_crease = add_node(node_tree, 'GeometryNodeStoreNamedAttribute', {"Geometry": set_position.outputs["Geometry"], \
+        "Name": "crease_edge", "Value": crease}, data_type='FLOAT', domain='EDGE')
+
+    # Panels: every other face of the pole bottom band and the dome bands, pushed in radially and scaled down.
+    band = m('FLOOR', m('DIVIDE', index, segments))
+    even = equals(node_tree, m('FLOORED_MODULO', m('FLOORED_MODULO', index, segments), 2), 0)
+    panel_bands = m('ADD', equals(node_tree, band, 6), in_range(node_tree, band, m('ADD', P, 9), m('ADD', m('ADD', P, D), 8)))
+    band_c, _, _, _ = add_ring_fields(node_tree, group_in, band)
+    face_center = add_node(node_tree, 'GeometryNodeInputPosition').outputs["Position"]
+    center_xyz = add_node(node_tree, 'ShaderNodeSeparateXYZ', {"Vector": face_center})
+    radial = add_node(node_tree, 'ShaderNodeCombineXYZ', {"X": m('SUBTRACT', center_xyz.outputs["X"], band_c), \
+        "Y": m('SUBTRACT', center_xyz.outputs["Y"], band_c), "Z": 0.0})
+    radial = add_node(node_tree, 'ShaderNodeVectorMath', {0: radial.outputs["Vector"]}, operation='NORMALIZE')
+    extrude = add_node(node_tree, 'GeometryNodeExtrudeMesh', {"Mesh": store_crease.outputs["Geometry"], \
+        "Selection": m('MULTIPLY', even, panel_bands), "Offset": radial.outputs["Vector"], "Offset Scale": -0.15, \
+        "Individual": True}, mode='FACES')
+    scale = add_node(node_tree, 'GeometryNodeScaleElements', {"Geometry": extrude.outputs["Mesh"], \
+        "Selection": extrude.outputs["Top"], "Scale": 0.8}, domain='FACE', scale_mode='UNIFORM')
+
+    merge = add_node(node_tree, 'GeometryNodeMergeByDistance', {"Geometry": scale.outputs["Geometry"], \
+        "Distance": 1e-4}, mode='ALL')
+    group_out = add_node(node_tree, 'NodeGroupOutput')
+    node_tree.links.new(merge.outputs["Geometry"], group_out.inputs["Geometry"])
+    node_tree["fh_node_group_version"] = fh_node_group_version
+    return node_tree
+
+def get_fire_hydrant_node_group():
+    node_tree = bpy.data.node_groups.get(fh_node_group_name)
+    if node_tree is None:
+        node_tree = bpy.data.node_groups.new(fh_node_group_name, 'GeometryNodeTree')
+    if node_tree.get("fh_node_group_version") != fh_node_group_version:
+        build_fire_hydrant_node_group(node_tree)
+    return node_tree
+
+def set_fire_hydrant_node_inputs(fh_nodes_mod, **params):
+    node_tree = fh_nodes_mod.node_group
+    for name, socket_type, _, _, _, param in fh_node_group_inputs:
+        if param in params:
+            socket = node_tree.interface.items_tree[name]
+            value = params[param]
+            fh_nodes_mod[socket.identifier] = bool(value) if socket_type == 'NodeSocketBool' else \
+                int(value) if socket_type == 'NodeSocketInt' else float(value)
+
+def gen_fire_hydrant_geometry_nodes(context, name, location=(0, 0, 0), num_cir_segments=16, pole_radius=3, num_pole_levels=3, \
+    num_dome_levels=3, stylize=False, pole_bent_factor=1, dome_bent_factor=1, subsurf=False, subsurf_level=2, \
+    add_geo_for_sharp_loops=True):
+    fh_obj = bpy.data.objects.new(name=name, object_data=bpy.data.meshes.new(name=name))
+    fh_obj.location = location
+    context.collection.objects.link(fh_obj)
+    fh_nodes_mod = fh_obj.modifiers.new("fh_nodes", 'NODES')
+    fh_nodes_mod.node_group = get_fire_hydrant_node_group()
+    set_fire_hydrant_node_inputs(fh_nodes_mod, num_cir_segments=num_cir_segments, pole_radius=pole_radius, \
+        num_pole_levels=num_pole_levels, num_dome_levels=num_dome_levels, stylize=stylize, \
+        pole_bent_factor=pole_bent_factor, dome_bent_factor=dome_bent_factor, add_geo_for_sharp_loops=add_geo_for_sharp_loops)
+    set_fire_hydrant_subsurf(fh_obj, subsurf, subsurf_level)
+    return fh_obj
+
+#========= Test Geometry Nodes Backend ========================================================
+# A grid of hydrants sharing the one node group.
+def test_fire_hydrant_geometry_nodes(context, num_rows=10, num_cols=10, spacing=15):
+    for i in range(num_rows*num_cols):
+        gen_fire_hydrant_geometry_nodes(context, "fh_nodes_" + str(i), location=((i%num_cols)*spacing, 60 + (i//num_cols)*spacing, 0), \
+            pole_radius=2 + (i%5)*0.5, num_pole_levels=1 + i%4, stylize=i%2 == 1, subsurf=True)
@@ -0,0 +1,163 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+
+import bpy
+import numpy as np
+
+from .creating_and_editing_mesh_objs import fill_mesh_from_arrays
+from .mesh_editing_ops import get_loop_stack_faces, set_edge_creases, set_edge_seams
+
+# Lathe (surface of revolution) engine: a 2D profile of (radius, z) rows, bottom to top, is revolved around Z into
+# rings of num_segments verts, all in one array pass. Per ring, offsets move the ring center in x/y and scales
+# stretch its radius in x/y (making it an ellipse), and twist rotates it. Consecutive rings are bridged with quads
+# (same layout as get_loop_stack_faces), each end is left open ('NONE'), filled with an n-gon ('NGON') or fanned
+# into an apex vert ('FAN'). Quads face outwards for the default counterclockwise sweep; clockwise sweeps need a
+# normals recalc.
+#
+# UVs: the sides are unrolled into the bottom half of the UV square (u around, v along the profile's arc length),
+# with a seam down the first column of verts, and the caps are disks in the top half. crease_rings lists the rings
+# whose edge loops get a crease of 1.
+lathe_cap_types = ('NONE', 'NGON', 'FAN')
+lathe_cap_uv_centers = {"bottom": (0.25, 0.75), "top": (0.75, 0.75)}
+lathe_cap_uv_radius = 0.24
+
+def get_lathe_angles(num_segments, start_angle=0.0, clockwise=False):
+    theta = 2*np.pi*np.arange(num_segments)/num_segments
+    return start_angle - theta if clockwise else start_angle + theta
+
+def get_lathe_coords(profile, num_segments, offsets=None, scales=None, twist=None, start_angle=0.0, clockwise=False):
+    profile = np.asarray(profile, dtype=np.float64).reshape(-1, 2)
+    num_rings = len(profile)
+    offsets = np.zeros((num_rings, 2)) if offsets is None else np.broadcast_to(np.asarray(offsets, dtype=np.float64), (num_rings, 2))
+    scales = np.ones((num_rings, 2)) if scales is None else np.broadcast_to(np.asarray(scales, dtype=np.float64), (num_rings, 2))
+    twist = np.zeros(num_rings) if twist is None else np.broadcast_to(np.asarray(twist, dtype=np.float64), (num_rings,))
+
+    angles = get_lathe_angles(num_segments, start_angle, clockwise)[None, :] + twist[:, None]
+    coords = np.empty((num_rings, num_segments, 3))
+    coords[:, :, 0] = offsets[:, 0, None] + (profile[:, 0]*scales[:, 0])[:, None]*np.cos(angles)
+    coords[:, :, 1] = offsets[:, 1, None] + (profile[:, 0]*scales[:, 1])[:, None]*np.sin(angles)
+    coords[:, :, 2] = profile[:, 1, None]
+    return coords.reshape(-1, 3)
+
+# Apex verts come after all the ring verts, the bottom one first.
+def get_lathe_faces(num_rings, num_segments, cap_bottom='NONE', cap_top='NONE'):
+    face_sizes, face_verts = get_loop_stack_faces(num_rings, num_segments)
+    face_sizes, face_verts = [face_sizes], [face_verts]
+    j = np.arange(num_segments)
+    j_next = (j + 1) % num_segments
+    apex = num_rings*num_segments
+    for cap, ring_start, reverse in ((cap_bottom, 0, True), (cap_top, (num_rings - 1)*num_segments, False)):
+        if cap == 'NGON':
+            face_sizes.append(np.array([num_segments], dtype=np.int32))
+            face_verts.append(ring_start + (j[::-1] if reverse else j))
+        elif cap == 'FAN':
+            a, b = (j_next, j) if reverse else (j, j_next)
+            face_sizes.append(np.full(num_segments, 3, dtype=np.int32))
+            face_verts.append(np.stack([ring_start + a, ring_start + b, np.full(num_segments, apex)], axis=-1).ravel())
+            apex += 1
+    return np.concatenate(face_sizes), np.concatenate(face_verts).astype(np.int32)
+
+def get_lathe_uvs(profile, num_segments, cap_bottom='NONE', cap_top='NONE', start_angle=0.0, clockwise=False):
+    profile = np.asarray(profile, dtype=np.float64).reshape(-1, 2)
+    arc_lengths = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(profile, axis=0), axis=1))])
+    v_rings = 0.5*arc_lengths/max(arc_lengths[-1], 1e-12)
+    j = np.arange(num_segments)
+    k = np.arange(len(profile) - 1)
+    # Corners j, j + 1, j + 1, j of ring k, k, k + 1, k + 1; the last column runs up to u = 1 (the seam).
+    u = np.broadcast_to(np.stack([j, j + 1, j + 1, j], axis=-1)/num_segments, (len(k), num_segments, 4))
+    v = np.broadcast_to(np.stack([v_rings[k], v_rings[k], v_rings[k + 1], v_rings[k + 1]], axis=-1)[:, None, :], \
+        (len(k), num_segments, 4))
+    uvs = [np.stack([u, v], axis=-1).reshape(-1, 2)]
+
+    angles = get_lathe_angles(num_segments, start_angle, clockwise)
+    ring_uvs = np.stack([np.cos(angles), np.sin(angles)], axis=-1)*lathe_cap_uv_radius
+    j_next = (j + 1) % num_segments
+    for cap, side, reverse in ((cap_bottom, "bottom", True), (cap_top, "top", False)):
+        center = np.array(lathe_cap_uv_centers[side])
+        if cap == 'NGON':
+            uvs.append(center + ring_uvs[j[::-1] if reverse else j])
+        elif cap == 'FAN':
+            a, b = (j_next, j) if reverse else (j, j_next)
+            fan = np.stack([center + ring_uvs[a], center + ring_uvs[b], np.broadcast_to(center, (num_segments, 2))], axis=1)
+            uvs.append(fan.reshape(-1, 2))
+    return np.concatenate(uvs)
+
+def get_lathe_seam_vert_pairs(num_rings, num_segments):
+    k = np.arange(num_rings - 1)
+    return np.stack([k*num_segments, (k + 1)*num_segments], axis=-1)
+
+def get_lathe_ring_vert_pairs(rings, num_segments):
+    j = np.arange(num_segments)
+    ring_starts = np.asarray(rings, dtype=np.int64).reshape(-1, 1)*num_segments
+    return np.stack([ring_starts + j, ring_starts + (j + 1) % num_segments], axis=-1).reshape(-1, 2)
+
+# A FAN cap's apex defaults to the center of the end ring.
+def get_lathe_arrays(profile, num_segments, offsets=None, scales=None, twist=None, cap_bottom='NONE', cap_top='NONE', \
+    apex_bottom=None, apex_top=None, crease_rings=(), uvs=True, start_angle=0.0, clockwise=False):
+    profile = np.asarray(profile, dtype=np.float64).reshape(-1, 2)
+    num_rings = len(profile)
+    coords = [get_lathe_coords(profile, num_segments, offsets, scales, twist, start_angle, clockwise)]
+    ring_centers = np.zeros((num_rings, 3))
+    if offsets is not None:
+        ring_centers[:, :2] = offsets
+    ring_centers[:, 2] = profile[:, 1]
+    for cap, apex, ring in ((cap_bottom, apex_bottom, 0), (cap_top, apex_top, num_rings - 1)):
+        if cap == 'FAN':
+            coords.append(np.asarray(ring_centers[ring] if apex is None else apex, dtype=np.float64).reshape(1, 3))
+    face_sizes, face_verts = get_lathe_faces(num_rings, num_segments, cap_bottom, cap_top)
+    return {
+        "coords": np.concatenate(coords),
+        "face_sizes": face_sizes,
+        "face_verts": face_verts,
+        "uvs": get_lathe_uvs(profile, num_segments, cap_bottom, cap_top, start_angle, clockwise) if uvs else None,
+        "seam_vert_pairs": get_lathe_seam_vert_pairs(num_rings, num_segments) if uvs else None,
+        "crease_vert_pairs": get_lathe_ring_vert_pairs(crease_rings, num_segments),
+    }
+
+def build_lathe_mesh(mesh, arrays):
+    fill_mesh_from_arrays(mesh, arrays["coords"], arrays["face_sizes"], arrays["face_verts"])
+    if arrays["uvs"] is not None:
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        uv_layer.data.foreach_set("uv", np.asarray(arrays["uvs"], dtype=np.float32).ravel())
+        set_edge_seams(mesh, arrays["seam_vert_pairs"])
+    if len(arrays["crease_vert_pairs"]):
+        set_edge_creases(mesh, arrays["crease_vert_pairs"])
+    return mesh
+
+def create_lathe_obj(context, name, location, profile, num_segments, **kwargs):
+    mesh = build_lathe_mesh(bpy.data.meshes.new(name=name), get_lathe_arrays(profile, num_segments, **kwargs))
+    obj = bpy.data.objects.new(name=name, object_data=mesh)
+    obj.location = location
+    context.collection.objects.link(obj)
+    return obj
+
+#========= Test Lathe ========================================================
+def test_lathe(context, num_segments=64, num_rings=200):
+    t = np.linspace(0, 1, num_rings)
+    profile = np.stack([1 + 0.3*np.sin(6*np.pi*t), 8*t], axis=-1)
+    scales = np.stack([np.ones(num_rings), 1 - 0.3*t], axis=-1)
+    offsets = np.stack([0.5*np.sin(2*np.pi*t), np.zeros(num_rings)], axis=-1)
+    obj = create_lathe_obj(context, "lathe_vase", (0, 40, 0), profile, num_segments, offsets=offsets, scales=scales, \
+        twist=np.pi*t, cap_bottom='NGON', cap_top='FAN', crease_rings=(0, num_rings - 1))
+    print(f"{obj.name}: {len(obj.data.vertices)} verts, {len(obj.data.polygons)} faces")
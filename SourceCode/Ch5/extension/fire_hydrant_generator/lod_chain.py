@@ -0,0 +1,122 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+import bpy
+import numpy as np
+
+from .fire_hydrant_data import build_fire_hydrant_mesh, get_fire_hydrant_profile, set_fire_hydrant_subsurf
+from .lathe import create_lathe_obj
+
+# LOD chains for game export: LOD0..LODn of one asset built in one call, named <name>_LOD<i> and parented to an
+# empty named <name>. The ring profile is computed once and only rebuilt at fewer segments per LOD (halving each
+# time), LODs past the first num_bevel_lods skip the sharp loop bevels (creased sharp loops add no geometry, so
+# they're kept on every LOD), and the subsurf level drops by one per LOD.
+min_lod_segments = 6
+
+def get_lod_segments(num_segments, lod):
+    segments = max(min_lod_segments, num_segments >> lod)
+    return segments + segments%2
+
+def create_lod_parent(context, name, location):
+    lod_parent = bpy.data.objects.new(name=name, object_data=None)
+    lod_parent.location = location
+    context.collection.objects.link(lod_parent)
+    return lod_parent
+
+def add_lod(context, lod_parent, lod_obj, lod):
+    if lod_obj.name not in context.collection.objects:
+        context.collection.objects.link(lod_obj)
+    lod_obj.parent = lod_parent
+    lod_obj.location = (0, 0, 0)
+    # Only LOD0 is shown, the others sit in the same spot.
+    lod_obj.hide_set(lod > 0)
+
+def get_triangle_count(mesh):
+    face_sizes = np.zeros(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", face_sizes)
+    return int((face_sizes - 2).sum())
+
+# Triangle counts of the LOD meshes, and of the meshes with their modifiers (i.e. subsurf) applied.
+def get_lod_report(context, lod_objs):
+    depsgraph = context.evaluated_depsgraph_get()
+    report = []
+    for lod, lod_obj in enumerate(lod_objs):
+        report.append({"lod": lod, "name": lod_obj.name, "tris": get_triangle_count(lod_obj.data), \
+            "evaluated_tris": get_triangle_count(lod_obj.evaluated_get(depsgraph).data)})
+    return report
+
+def format_lod_report(report):
+    return ", ".join(f"{lod['name']}: {lod['evaluated_tris']} tris" for lod in report)
+
+def gen_fire_hydrant_lod_chain(context, name, location=(0, 0, 0), num_lods=3, num_bevel_lods=1, num_cir_segments=16, \
+    pole_radius=3, num_pole_levels=3, num_dome_levels=3, stylize=False, pole_bent_factor=1, dome_bent_factor=1, \
+    subsurf=False, subsurf_level=2, add_geo_for_sharp_loops=True, sharp_loop_mode='BEVEL'):
+    profile = get_fire_hydrant_profile(pole_radius, num_pole_levels, num_dome_levels, stylize, pole_bent_factor, dome_bent_factor)
+    lod_parent = create_lod_parent(context, name, location)
+    lod_objs = []
+    for lod in range(num_lods):
+        lod_name = name + "_LOD" + str(lod)
+        mesh = bpy.data.meshes.new(name=lod_name)
+        build_fire_hydrant_mesh(mesh, profile, get_lod_segments(num_cir_segments, lod), \
+            add_geo_for_sharp_loops and (lod < num_bevel_lods or sharp_loop_mode == 'CREASE'), sharp_loop_mode)
+        lod_obj = bpy.data.objects.new(name=lod_name, object_data=mesh)
+        add_lod(context, lod_parent, lod_obj, lod)
+        set_fire_hydrant_subsurf(lod_obj, subsurf and subsurf_level - lod > 0, subsurf_level - lod)
+        lod_objs.append(lod_obj)
+    return lod_parent, get_lod_report(context, lod_objs)
+
+# generate_barrel bridges 3 rings and smooths them with one subdivide. Here the same barrel shape is a parabolic
+# profile through the end/mid radii, sampled at num_rings rings, with 2*num_segments segments at LOD0 (what the
+# subdivide leaves).
+def get_barrel_profile(radius_end, radius_mid, height, num_rings=5):
+    z = np.linspace(-height/2, height/2, num_rings)
+    radii = radius_mid + (radius_end - radius_mid)*(2*z/height)**2
+    return radii, z
+
+def get_barrel_lathe_profile(radius_end, radius_mid, height, num_rings=5):
+    return np.stack(get_barrel_profile(radius_end, radius_mid, height, num_rings), axis=-1)
+
+# Same barrel as generate_barrel, built by the lathe engine (with UVs), without bpy.ops or Edit Mode.
+def gen_barrel_data_only(context, name, radius_end, radius_mid, height, num_segments, center=(0, 0, 0), num_rings=5):
+    return create_lathe_obj(context, name, center, get_barrel_lathe_profile(radius_end, radius_mid, height, num_rings), \
+        2*num_segments, cap_bottom='NGON', cap_top='NGON')
+
+def gen_barrel_lod_chain(context, name, radius_end, radius_mid, height, num_segments, center=(0, 0, 0), num_lods=3, \
+    num_rings=5):
+    profile = get_barrel_lathe_profile(radius_end, radius_mid, height, num_rings)
+    lod_parent = create_lod_parent(context, name, center)
+    lod_objs = []
+    for lod in range(num_lods):
+        lod_obj = create_lathe_obj(context, name + "_LOD" + str(lod), (0, 0, 0), profile, \
+            get_lod_segments(2*num_segments, lod), cap_bottom='NGON', cap_top='NGON')
+        add_lod(context, lod_parent, lod_obj, lod)
+        lod_objs.append(lod_obj)
+    return lod_parent, get_lod_report(context, lod_objs)
+
+#========= Test LOD Chains ========================================================
+def test_lod_chains(context):
+    _, report = gen_fire_hydrant_lod_chain(context, "fh_lods", location=(0, -60, 0), num_lods=4, num_cir_segments=32, \
+        stylize=True, subsurf=True)
+    print(format_lod_report(report))
+    _, report = gen_barrel_lod_chain(context, "barrel_lods", 1, 1.25, 3, 16, center=(15, -60, 0), num_lods=3)
+    print(format_lod_report(report))
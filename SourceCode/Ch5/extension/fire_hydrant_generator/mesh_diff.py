@@ -0,0 +1,212 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+import bpy
+import json
+import numpy as np
+from mathutils.kdtree import KDTree
+
+from .mesh_fingerprint import get_mesh_coords, get_mesh_fingerprint, get_mesh_topology_arrays, get_mesh_uvs
+
+# Compare two meshes, typically a golden copy against a freshly generated one. Vertices are matched by index when
+# both meshes have the same vertex count (match='AUTO'/'INDEX'), otherwise each vertex is matched to the nearest
+# vertex of the other mesh in both directions (match='NEAREST'), which gives a symmetric (Hausdorff style) max error.
+golden_mesh_prefix = "golden_"
+
+# Squared distance from every vert of coords_from to the nearest vert of coords_to in the 3x3x3 grid cells around
+# its own (inf if there's none), all in numpy: coords_to is sorted by cell id, and the 3 cells of a column along z
+# have consecutive ids, so each of the 9 columns is one run of the sorted verts. Both sets have to lie within the grid
+# from lo, which has one empty cell of padding on each side so neighbour ids don't wrap.
+def get_grid_nearest_sq_dists(coords_from, coords_to, lo, cell_size, dims):
+    strides = np.array([dims[1]*dims[2], dims[2], 1])
+    cell_ids_to = (np.floor((coords_to - lo)/cell_size).astype(np.int64) + 1) @ strides
+    order = np.argsort(cell_ids_to, kind='stable')
+    sorted_ids = cell_ids_to[order]
+    cell_ids_from = (np.floor((coords_from - lo)/cell_size).astype(np.int64) + 1) @ strides
+
+    best = np.full(len(coords_from), np.inf)
+    for offset in np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1]), axis=-1).reshape(-1, 2) @ strides[:2]:
+        starts = np.searchsorted(sorted_ids, cell_ids_from + offset - 1, side='left')
+        counts = np.searchsorted(sorted_ids, cell_ids_from + offset + 1, side='right') - starts
+        num_pairs = counts.sum()
+        if num_pairs == 0:
+            continue
+        pair_starts = np.cumsum(counts) - counts
+        candidates = order[np.repeat(starts - pair_starts, counts) + np.arange(num_pairs)]
+        sq_dists = np.sum((np.repeat(coords_from, counts, axis=0) - coords_to[candidates])**2, axis=1)
+        has_pairs = counts > 0
+        best[has_pairs] = np.minimum(best[has_pairs], np.minimum.reduceat(sq_dists, pair_starts[has_pairs]))
+    return best
+
+# A nearest vert found within one cell size is the true nearest one (everything that close is in the 3x3x3 cells).
+# The cells start at about a quarter vert per cell of coords_to (meshes are surfaces, so that's from half the bounding
+# box area), and the verts without a match that close get a second try with cells twice as large. Larger cells hold
+# too many verts to pay off, so whatever is still unmatched (verts far off the other mesh) is looked up in a KDTree,
+# one find per vert since mathutils has no batch query.
+def get_nearest_distances(coords_from, coords_to, num_grid_passes=2):
+    lo = np.minimum(coords_from.min(axis=0), coords_to.min(axis=0))
+    extent = np.maximum(coords_from.max(axis=0), coords_to.max(axis=0)) - lo
+    to_extent = np.ptp(coords_to, axis=0)
+    half_area = to_extent[0]*to_extent[1] + to_extent[1]*to_extent[2] + to_extent[2]*to_extent[0]
+    cell_size = max(0.5*np.sqrt(half_area/len(coords_to)), to_extent.max()/len(coords_to), 1e-9)
+    sq_dists = np.full(len(coords_from), np.inf)
+    todo = np.arange(len(coords_from))
+    for _ in range(num_grid_passes):
+        dims = np.floor(extent/cell_size).astype(np.int64) + 3
+        sq_dists[todo] = get_grid_nearest_sq_dists(coords_from[todo], coords_to, lo, cell_size, dims)
+        if cell_size >= extent.max():
+            return np.sqrt(sq_dists)
+        todo = todo[sq_dists[todo] > cell_size**2]
+        if len(todo) == 0:
+            return np.sqrt(sq_dists)
+        cell_size *= 2
+
+    kd = KDTree(len(coords_to))
+    for i, co in enumerate(coords_to):
+        kd.insert(co, i)
+    kd.balance()
+    nearest = np.array([kd.find(co)[1] for co in coords_from[todo]], dtype=np.int64)
+    sq_dists[todo] = np.sum((coords_from[todo] - coords_to[nearest])**2, axis=1)
+    return np.sqrt(sq_dists)
+
+def get_face_size_histogram_changes(face_sizes_a, face_sizes_b):
+    num_bins = max(face_sizes_a.max(initial=0), face_sizes_b.max(initial=0)) + 1
+    hist_a = np.bincount(face_sizes_a, minlength=num_bins)
+    hist_b = np.bincount(face_sizes_b, minlength=num_bins)
+    changed = np.flatnonzero(hist_a != hist_b)
+    return {int(size): (int(hist_a[size]), int(hist_b[size])) for size in changed}
+
+def get_mesh_diff(mesh_a, mesh_b, match='AUTO'):
+    coords_a = get_mesh_coords(mesh_a).astype(np.float64)
+    coords_b = get_mesh_coords(mesh_b).astype(np.float64)
+    face_sizes_a, face_verts_a = get_mesh_topology_arrays(mesh_a)
+    face_sizes_b, face_verts_b = get_mesh_topology_arrays(mesh_b)
+
+    diff = {
+        "vert_count_delta": len(coords_b) - len(coords_a),
+        "edge_count_delta": len(mesh_b.edges) - len(mesh_a.edges),
+        "face_count_delta": len(face_sizes_b) - len(face_sizes_a),
+        "same_topology": get_mesh_fingerprint(mesh_a, 'TOPOLOGY') == get_mesh_fingerprint(mesh_b, 'TOPOLOGY'),
+        "face_size_changes": get_face_size_histogram_changes(face_sizes_a, face_sizes_b),
+        "match": None,
+        "max_pos_error": None,
+        "rms_pos_error": None,
+        "max_uv_error": None,
+        "rms_uv_error": None,
+    }
+    if len(coords_a) == 0 or len(coords_b) == 0:
+        return diff
+
+    if match == 'INDEX' or (match == 'AUTO' and len(coords_a) == len(coords_b)):
+        num_common = min(len(coords_a), len(coords_b))
+        errors = np.linalg.norm(coords_a[:num_common] - coords_b[:num_common], axis=1)
+        diff["match"] = 'INDEX'
+    else:
+        errors = np.concatenate([get_nearest_distances(coords_a, coords_b), get_nearest_distances(coords_b, coords_a)])
+        diff["match"] = 'NEAREST'
+    diff["max_pos_error"] = float(errors.max())
+    diff["rms_pos_error"] = float(np.sqrt(np.mean(errors**2)))
+
+    # UVs are per face corner, so they are only comparable corner by corner when the topology is the same.
+    uvs_a = get_mesh_uvs(mesh_a)
+    uvs_b = get_mesh_uvs(mesh_b)
+    if uvs_a is not None and uvs_b is not None and diff["same_topology"]:
+        uv_errors = np.linalg.norm(uvs_a.astype(np.float64) - uvs_b.astype(np.float64), axis=1)
+        diff["max_uv_error"] = float(uv_errors.max(initial=0))
+        diff["rms_uv_error"] = float(np.sqrt(np.mean(uv_errors**2))) if len(uv_errors) else 0.0
+    return diff
+
+def is_mesh_diff_clean(diff, tolerance=1e-4):
+    return diff["same_topology"] and diff["vert_count_delta"] == 0 and diff["face_count_delta"] == 0 and \
+        (diff["max_pos_error"] or 0) <= tolerance and (diff["max_uv_error"] or 0) <= tolerance
+
+def format_mesh_diff(name, diff, tolerance=1e-4):
+    if is_mesh_diff_clean(diff, tolerance):
+        return f"{name}: OK"
+    lines = [f"{name}: CHANGED"]
+    lines.append(f"    verts {diff['vert_count_delta']:+d}, edges {diff['edge_count_delta']:+d}, faces {diff['face_count_delta']:+d}, " + \
+        ("same topology" if diff["same_topology"] else "topology changed"))
+    if diff["max_pos_error"] is not None:
+        lines.append(f"    positions ({diff['match']} match): max {diff['max_pos_error']:.6f}, rms {diff['rms_pos_error']:.6f}")
+    if diff["max_uv_error"] is not None:
+        lines.append(f"    uvs: max {diff['max_uv_error']:.6f}, rms {diff['rms_uv_error']:.6f}")
+    for size, (count_a, count_b) in diff["face_size_changes"].items():
+        lines.append(f"    {size}-sided faces: {count_a} -> {count_b}")
+    return "\n".join(lines)
+
+#========= Golden Meshes ===========================================================
+# Golden meshes are plain mesh data-blocks written to a .blend library, named golden_<preset name>.
+def write_golden_meshes(filepath, meshes_by_name):
+    golden_meshes = set()
+    for name, mesh in meshes_by_name.items():
+        golden = mesh.copy()
+        golden.name = golden_mesh_prefix + name
+        golden_meshes.add(golden)
+    bpy.data.libraries.write(filepath, golden_meshes, fake_user=True)
+    for golden in golden_meshes:
+        bpy.data.meshes.remove(golden)
+
+def load_golden_meshes(filepath, names):
+    wanted = [golden_mesh_prefix + n for n in names]
+    with bpy.data.libraries.load(filepath, link=False) as (data_from, data_to):
+        names_to_load = [n for n in wanted if n in data_from.meshes]
+        data_to.meshes = names_to_load
+    # Loaded meshes may get renamed (.001) if the name is already taken, so map them by position, not by name.
+    return {n[len(golden_mesh_prefix):]: m for n, m in zip(names_to_load, data_to.meshes) if m is not None}
+
+#========= Catalog Regression Diff =================================================
+# generate(context, name, **kwargs) must return the generated object. Every preset is generated, diffed against its
+# golden mesh (or stored as the new golden mesh with update_golden=True), then removed again.
+def diff_catalog(context, presets, generate, golden_filepath, update_golden=False, tolerance=1e-4, report_filepath=None):
+    generated = {}
+    for name, location, kwargs in presets:
+        obj = generate(context, name, location=location, **kwargs)
+        generated[name] = obj
+
+    reports = {}
+    if update_golden:
+        write_golden_meshes(golden_filepath, {name: obj.data for name, obj in generated.items()})
+        print(f"Golden meshes written to {golden_filepath} for {len(generated)} presets.")
+    else:
+        golden = load_golden_meshes(golden_filepath, list(generated.keys()))
+        for name, obj in generated.items():
+            if name not in golden:
+                print(f"{name}: no golden mesh")
+                reports[name] = None
+                continue
+            diff = get_mesh_diff(golden[name], obj.data)
+            reports[name] = diff
+            print(format_mesh_diff(name, diff, tolerance))
+        for mesh in golden.values():
+            bpy.data.meshes.remove(mesh)
+
+    for obj in generated.values():
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+    if report_filepath:
+        with open(report_filepath, "w") as f:
+            json.dump(reports, f, indent=2)
+    num_changed = sum(1 for d in reports.values() if d is None or not is_mesh_diff_clean(d, tolerance))
+    return reports, num_changed
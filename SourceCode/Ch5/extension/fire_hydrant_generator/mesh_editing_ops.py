@@ -22,22 +22,76 @@
 
 import bpy
 import bmesh
-from mathutils import Vector
+from mathutils import Matrix, Vector
+import numpy as np
+
+from .creating_and_editing_mesh_objs import get_mesh_obj_from_arrays, get_placeholder_mesh_obj_and_bm
 
 # ========== Utility Methods ====================================================        
 def create_loop_stack(context, name="loop_stack_bmesh", location=(0, 0, 0), radius=1, num_loops=2, loop_segments=16, level_height=1):
     bm, obj = get_placeholder_mesh_obj_and_bm(context, name, location)
     
     for i in range(num_loops):
-        bmesh.ops.create_circle(bm, cap_ends=False, segments=loop_segments, radius=radius)
+        circle = bmesh.ops.create_circle(bm, cap_ends=False, segments=loop_segments, radius=radius)
+        if i > 0:
+            bmesh.ops.translate(bm, vec=(0, 0, level_height*i), verts=circle['verts'])
     bm.verts.ensure_lookup_table()
-    for i in range(1, num_loops, 1):
-        for v in bm.verts[loop_segments*i:loop_segments*(i+1)]:
-            v.co[2] += level_height*i
     bm.edges.ensure_lookup_table()
     
     return bm, obj
 
+# Per-level arrays (one entry per ring, bottom to top) -> vertex coordinates of all rings, ring after ring.
+# twist is in radians, scale is either one uniform factor per level or an (x, y) pair per level.
+def get_loop_stack_coords(radii, z, segments, twist=None, scale=None):
+    radii = np.asarray(radii, dtype=np.float64)
+    num_levels = len(radii)
+    z = np.broadcast_to(np.asarray(z, dtype=np.float64), (num_levels,))
+    twist = np.zeros(num_levels) if twist is None else np.broadcast_to(np.asarray(twist, dtype=np.float64), (num_levels,))
+    scale = np.ones((num_levels, 2)) if scale is None else np.asarray(scale, dtype=np.float64)
+    if scale.ndim < 2:
+        scale = np.repeat(np.broadcast_to(scale, (num_levels,))[:, None], 2, axis=1)
+
+    theta = 2*np.pi*np.arange(segments)/segments
+    angles = theta[None, :] + twist[:, None]
+    coords = np.empty((num_levels, segments, 3))
+    coords[:, :, 0] = (radii*scale[:, 0])[:, None]*np.cos(angles)
+    coords[:, :, 1] = (radii*scale[:, 1])[:, None]*np.sin(angles)
+    coords[:, :, 2] = z[:, None]
+    return coords.reshape(-1, 3)
+
+# Quads bridging every pair of consecutive rings, plus optional n-gon caps, as (face_sizes, face_verts).
+def get_loop_stack_faces(num_levels, segments, cap_bottom=False, cap_top=False):
+    j = np.arange(segments)
+    j_next = (j + 1) % segments
+    base = (np.arange(num_levels - 1)*segments)[:, None]
+    quads = np.stack([base + j, base + j_next, base + segments + j_next, base + segments + j], axis=-1).reshape(-1)
+    face_sizes = [np.full((num_levels - 1)*segments, 4, dtype=np.int32)]
+    face_verts = [quads]
+    if cap_bottom:
+        face_sizes.append(np.array([segments], dtype=np.int32))
+        face_verts.append(j[::-1])
+    if cap_top:
+        face_sizes.append(np.array([segments], dtype=np.int32))
+        face_verts.append((num_levels - 1)*segments + j)
+    return np.concatenate(face_sizes), np.concatenate(face_verts).astype(np.int32)
+
+# Mask of the edges that run around a ring (as opposed to the bridging edges between rings).
+def get_loop_stack_ring_edge_mask(mesh, segments):
+    edge_verts = np.zeros(len(mesh.edges)*2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    edge_verts = edge_verts.reshape(-1, 2)
+    return (edge_verts[:, 0] // segments) == (edge_verts[:, 1] // segments)
+
+# Builds all rings and the bridging quads in one array based pass, no per-ring bmesh calls and no loop selection.
+def create_loop_stack_from_arrays(context, name="loop_stack_arrays", location=(0, 0, 0), radii=(1, 1), z=(0, 1), segments=16, \
+    twist=None, scale=None, cap_bottom=False, cap_top=False, ring_edges_set=None):
+    coords = get_loop_stack_coords(radii, z, segments, twist, scale)
+    face_sizes, face_verts = get_loop_stack_faces(len(radii), segments, cap_bottom, cap_top)
+    obj = get_mesh_obj_from_arrays(context, name, location, coords, face_sizes, face_verts)
+    if ring_edges_set:
+        set_selection_set(obj.data, ring_edges_set, get_loop_stack_ring_edge_mask(obj.data, segments), 'EDGE')
+    return obj
+
 def create_cylinder_bmesh(context, name="cylinder_bmesh", location=(0, 0, 0), radius1=1.5, radius2=1, segments=16, height=1):
     bm, obj = get_placeholder_mesh_obj_and_bm(context, name, location)
     bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False, segments=segments, radius1=radius1, radius2=radius2, depth=height)
@@ -109,6 +163,14 @@ def test_create_cylinder_by_extrusion_bmesh(context):
     _, obj, _ = create_cylinder_by_extrusion(context, name="cylinder_extruded_bmesh", location=(6, 6, 0), radius=3, segments=16, num_levels=2, level_height=2)
     bmesh.update_edit_mesh(obj.data)
 
+def test_create_loop_stack_from_arrays(context):
+    # A tapering, twisting column with a bulge, 200 levels, bridged and capped in one go.
+    num_levels = 200
+    t = np.linspace(0, 1, num_levels)
+    radii = 1.5 - 0.5*t + 0.3*np.sin(t*np.pi*6)
+    create_loop_stack_from_arrays(context, name="loop_stack_arrays", location=(-6, 6, 0), radii=radii, z=t*20, segments=32, \
+        twist=t*np.pi, scale=np.stack([np.ones(num_levels), 1 - 0.3*t], axis=-1), cap_bottom=True, cap_top=True, ring_edges_set="stack_loops")
+
 #========= Selecting Edge Loops =============================
 def get_edge_loops(bm, ref_edges, select_rings=False):
     loops = []
@@ -179,6 +241,190 @@ def test_bridge_loops_bpy(context):
     bridge_loops_bpy(bm, loop_ref_edges)
     bmesh.update_edit_mesh(stack_obj.data)
 
+#========= Named Selection Sets ==============================
+# A selection set is a boolean attribute on the mesh, one value per vertex, edge or face. Unlike the single .select flag,
+# any number of sets can be kept alive at once, and each is read/written in bulk with foreach_get/foreach_set.
+# The set based ops below run on the mesh data in Object Mode, since mesh attributes can't be accessed in Edit Mode.
+selection_set_domains = {'VERT': 'POINT', 'EDGE': 'EDGE', 'FACE': 'FACE'}
+
+def get_selection_set_size(mesh, domain):
+    if domain == 'VERT':
+        return len(mesh.vertices)
+    if domain == 'EDGE':
+        return len(mesh.edges)
+    return len(mesh.polygons)
+
+def get_selection_set(mesh, set_name, domain='EDGE'):
+    mask = np.zeros(get_selection_set_size(mesh, domain), dtype=bool)
+    attr = mesh.attributes.get(set_name)
+    if attr is not None and attr.domain == selection_set_domains[domain]:
+        attr.data.foreach_get("value", mask)
+    return mask
+
+def set_selection_set(mesh, set_name, mask, domain='EDGE'):
+    attr = mesh.attributes.get(set_name)
+    if attr is not None and (attr.domain != selection_set_domains[domain] or attr.data_type != 'BOOLEAN'):
+        mesh.attributes.remove(attr)
+        attr = None
+    if attr is None:
+        attr = mesh.attributes.new(name=set_name, type='BOOLEAN', domain=selection_set_domains[domain])
+    attr.data.foreach_set("value", np.asarray(mask, dtype=bool))
+    return attr
+
+def get_selection_set_indices(mesh, set_name, domain='EDGE'):
+    return np.flatnonzero(get_selection_set(mesh, set_name, domain))
+
+def set_selection_set_from_indices(mesh, set_name, indices, domain='EDGE'):
+    mask = np.zeros(get_selection_set_size(mesh, domain), dtype=bool)
+    mask[np.asarray(indices, dtype=np.int64)] = True
+    return set_selection_set(mesh, set_name, mask, domain)
+
+def remove_selection_set(mesh, set_name):
+    attr = mesh.attributes.get(set_name)
+    if attr is not None:
+        mesh.attributes.remove(attr)
+
+def selection_set_from_selection(mesh, set_name, domain='EDGE'):
+    elems = mesh.vertices if domain == 'VERT' else mesh.edges if domain == 'EDGE' else mesh.polygons
+    mask = np.zeros(len(elems), dtype=bool)
+    elems.foreach_get("select", mask)
+    return set_selection_set(mesh, set_name, mask, domain)
+
+def selection_set_to_selection(mesh, set_name, domain='EDGE'):
+    # Only for showing a set in the viewport or handing it to a bpy.ops operator.
+    elems = mesh.vertices if domain == 'VERT' else mesh.edges if domain == 'EDGE' else mesh.polygons
+    elems.foreach_set("select", get_selection_set(mesh, set_name, domain))
+    mesh.update()
+
+def get_bm_elems_in_set(bm, mesh, set_name, domain='EDGE'):
+    seq = bm.verts if domain == 'VERT' else bm.edges if domain == 'EDGE' else bm.faces
+    seq.ensure_lookup_table()
+    return [seq[i] for i in get_selection_set_indices(mesh, set_name, domain)]
+
+def write_bm_to_mesh_with_set(bm, mesh, out_set_name, out_elems, domain):
+    # The indices of the new elements are only known after the bmesh is written back, so index them first.
+    seq = bm.verts if domain == 'VERT' else bm.edges if domain == 'EDGE' else bm.faces
+    seq.index_update()
+    out_indices = [e.index for e in out_elems if e.is_valid]
+    bm.to_mesh(mesh)
+    bm.free()
+    set_selection_set_from_indices(mesh, out_set_name, out_indices, domain)
+    mesh.update()
+    return out_indices
+
+# Operator-free loop/ring walking, so that loops can be collected without touching the selection.
+def get_next_loop_edge(e, v):
+    if len(v.link_edges) == 2:
+        return v.link_edges[0] if v.link_edges[1] == e else v.link_edges[1]
+    if e.is_boundary:
+        for le in v.link_edges:
+            if le != e and le.is_boundary:
+                return le
+        return None
+    if len(v.link_edges) == 4:
+        e_faces = set(e.link_faces)
+        for le in v.link_edges:
+            if le != e and e_faces.isdisjoint(le.link_faces):
+                return le
+    return None
+
+def walk_edge_loop(seed_edge):
+    loop_edges = [seed_edge]
+    visited = {seed_edge}
+    for v_start in seed_edge.verts:
+        e = seed_edge
+        v = v_start
+        while True:
+            e = get_next_loop_edge(e, v)
+            if e is None or e in visited:
+                break
+            visited.add(e)
+            loop_edges.append(e)
+            v = e.other_vert(v)
+    return loop_edges
+
+def walk_edge_ring(seed_edge):
+    ring_edges = [seed_edge]
+    visited = {seed_edge}
+    for f_start in seed_edge.link_faces:
+        e = seed_edge
+        f = f_start
+        while f is not None and len(f.edges) == 4:
+            e = f.edges[(list(f.edges).index(e) + 2) % 4]
+            if e in visited:
+                break
+            visited.add(e)
+            ring_edges.append(e)
+            f = next((lf for lf in e.link_faces if lf != f), None)
+    return ring_edges
+
+#========= Ops on Named Selection Sets =======================
+def edge_loops_set(mesh, ref_set, out_set, select_rings=False):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    out_edges = set()
+    for re in get_bm_elems_in_set(bm, mesh, ref_set, 'EDGE'):
+        out_edges.update(walk_edge_ring(re) if select_rings else walk_edge_loop(re))
+    return write_bm_to_mesh_with_set(bm, mesh, out_set, out_edges, 'EDGE')
+
+def bridge_loops_set(mesh, loops_set, out_face_set):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    new_geom = bmesh.ops.bridge_loops(bm, edges=get_bm_elems_in_set(bm, mesh, loops_set, 'EDGE'))
+    return write_bm_to_mesh_with_set(bm, mesh, out_face_set, new_geom['faces'], 'FACE')
+
+def extrude_edge_loop_set(mesh, loop_set, out_loop_set, direction, scale_factor):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    loop_edges = get_bm_elems_in_set(bm, mesh, loop_set, 'EDGE')
+    new_geom = bmesh.ops.extrude_edge_only(bm, edges=loop_edges)['geom']
+    new_verts = [g for g in new_geom if isinstance(g, bmesh.types.BMVert)]
+    new_verts_set = set(new_verts)
+    new_edges = [g for g in new_geom if isinstance(g, bmesh.types.BMEdge) and g.verts[0] in new_verts_set and g.verts[1] in new_verts_set]
+    bmesh.ops.translate(bm, vec=direction, verts=new_verts)
+    center = sum((v.co for v in new_verts), Vector()) / max(len(new_verts), 1)
+    bmesh.ops.scale(bm, vec=scale_factor, space=Matrix.Translation(-center), verts=new_verts)
+    return write_bm_to_mesh_with_set(bm, mesh, out_loop_set, new_edges, 'EDGE')
+
+def inset_set(mesh, face_set, out_face_set, thickness, depth, individual=False):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    faces = get_bm_elems_in_set(bm, mesh, face_set, 'FACE')
+    if individual:
+        new_faces = bmesh.ops.inset_individual(bm, faces=faces, thickness=thickness, depth=depth)['faces']
+    else:
+        new_faces = bmesh.ops.inset_region(bm, faces=faces, thickness=thickness, depth=depth)['faces']
+    return write_bm_to_mesh_with_set(bm, mesh, out_face_set, new_faces, 'FACE')
+
+def bevel_set(mesh, edge_set, out_face_set, offset=0.1, segments=2, loop_slide=False):
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    edges = get_bm_elems_in_set(bm, mesh, edge_set, 'EDGE')
+    verts = list({v for e in edges for v in e.verts})
+    new_geom = bmesh.ops.bevel(bm, geom=verts+edges, offset=offset, offset_type='OFFSET', segments=segments, profile=0.5, \
+        affect='EDGES', loop_slide=loop_slide)
+    return write_bm_to_mesh_with_set(bm, mesh, out_face_set, new_geom['faces'], 'FACE')
+
+#========= Test Named Selection Sets =========================
+def test_selection_sets(context):
+    num_loops = 5
+    num_segments = 8
+    bm, stack_obj = create_loop_stack(context, name="test_selection_sets", location=(0, -8, 0), radius=1.5, num_loops=num_loops, loop_segments=num_segments, level_height=2)
+    bmesh.update_edit_mesh(stack_obj.data)
+    bpy.ops.object.mode_set(mode='OBJECT')
+    mesh = stack_obj.data
+
+    set_selection_set_from_indices(mesh, "loop_ref_edges", [i*num_segments for i in range(num_loops)], 'EDGE')
+    edge_loops_set(mesh, "loop_ref_edges", "stack_loops")
+    bridge_loops_set(mesh, "stack_loops", "stack_faces")
+
+    # Every other face of the bridged stack gets inset, the rest stay untouched in "stack_faces".
+    stack_faces = get_selection_set_indices(mesh, "stack_faces", 'FACE')
+    set_selection_set_from_indices(mesh, "panel_faces", stack_faces[::2], 'FACE')
+    inset_set(mesh, "panel_faces", "panel_rims", thickness=0.1, depth=-0.1, individual=True)
+    bevel_set(mesh, "stack_loops", "bevel_faces", offset=0.1, segments=2)
+    selection_set_to_selection(mesh, "panel_faces", 'FACE')
+
 #========= Extrusion =========================================
 def extrude_edge_loop_copy_move(bm, ref_edge, direction, scale_factor):
     select_edge_loops(bm, [ref_edge], select_rings=False)
@@ -397,6 +643,157 @@ def bevel_bpy(edge_list, offset=0.15, segments=2, loop_slide=True, vertex_only=F
         e.select = True
     bpy.ops.mesh.bevel(offset=offset, segments=segments, loop_slide=loop_slide, affect='VERTICES' if vertex_only else 'EDGES')
 
+# Edges of vertex loops, each given as its verts in loop order.
+def get_loop_edges_bmesh(bm, vert_loops):
+    edges = []
+    for loop in vert_loops:
+        for i in range(len(loop)):
+            e = bm.edges.get((loop[i], loop[(i+1) % len(loop)]))
+            if e is not None:
+                edges.append(e)
+    return edges
+
+# Bevel whole vertex loops in one bevel op.
+def bevel_loops_bmesh(bm, vert_loops, offset=0.1, segments=2, loop_slide=False):
+    edges = get_loop_edges_bmesh(bm, vert_loops)
+    verts = list({v for loop in vert_loops for v in loop})
+    return bmesh.ops.bevel(bm, geom=verts+edges, offset=offset, offset_type='OFFSET', segments=segments, profile=0.5, \
+        affect='EDGES', loop_slide=loop_slide)
+
+#========= Edge Creases ========================================================
+# Edge crease lives in the crease_edge attribute (read by the subsurf modifier). Edges are given by their vert index
+# pairs, so creases survive anything that renumbers edges but not verts (e.g. update(calc_edges=True)).
+def get_edge_vert_keys(mesh):
+    edge_verts = np.zeros(len(mesh.edges)*2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    edge_verts = np.sort(edge_verts.reshape(-1, 2), axis=1)
+    return edge_verts[:, 0]*len(mesh.vertices) + edge_verts[:, 1]
+
+def set_edge_creases(mesh, vert_pairs, value=1.0):
+    vert_pairs = np.sort(np.asarray(vert_pairs, dtype=np.int64).reshape(-1, 2), axis=1)
+    mask = np.isin(get_edge_vert_keys(mesh), vert_pairs[:, 0]*len(mesh.vertices) + vert_pairs[:, 1])
+    crease_attr = mesh.attributes.get("crease_edge")
+    if crease_attr is None:
+        crease_attr = mesh.attributes.new("crease_edge", 'FLOAT', 'EDGE')
+    creases = np.zeros(len(mesh.edges), dtype=np.float32)
+    crease_attr.data.foreach_get("value", creases)
+    creases[mask] = value
+    crease_attr.data.foreach_set("value", creases)
+    return int(mask.sum())
+
+def get_edge_crease_vert_pairs(mesh):
+    crease_attr = mesh.attributes.get("crease_edge")
+    if crease_attr is None:
+        return np.zeros((0, 2), dtype=np.int32)
+    creases = np.zeros(len(mesh.edges), dtype=np.float32)
+    crease_attr.data.foreach_get("value", creases)
+    edge_verts = np.zeros(len(mesh.edges)*2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    return edge_verts.reshape(-1, 2)[creases > 0]
+
+# Seams are flagged on the same vert index pairs as creases.
+def set_edge_seams(mesh, vert_pairs):
+    vert_pairs = np.sort(np.asarray(vert_pairs, dtype=np.int64).reshape(-1, 2), axis=1)
+    mask = np.isin(get_edge_vert_keys(mesh), vert_pairs[:, 0]*len(mesh.vertices) + vert_pairs[:, 1])
+    seams = np.zeros(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("use_seam", seams)
+    seams |= mask
+    mesh.edges.foreach_set("use_seam", seams)
+    return int(mask.sum())
+
+#========= Batched Insets ========================================================
+# face_groups is a list of (faces, thickness, depth, individual). Instead of one inset op per group, all individual
+# groups are inset in a single pass, and region groups are packed into as few passes as possible (groups sharing
+# verts can't go in the same pass, as inset_region would merge them into one region). Each pass insets with unit
+# thickness and no depth; since the inset offsets are linear in thickness/depth, the per-group values are then
+# applied to all inset verts at once. The depth goes along face normals taken before the op, since a unit inset turns
+# faces narrower than 2 inside out. Returns an array of new (rim) face indices per group.
+def get_inset_passes(face_groups):
+    individual_ids = [g for g, group in enumerate(face_groups) if group[3]]
+    region_passes = []
+    for g, (faces, _, _, individual) in enumerate(face_groups):
+        if individual:
+            continue
+        group_verts = {v for f in faces for v in f.verts}
+        for group_ids, used_verts in region_passes:
+            if used_verts.isdisjoint(group_verts):
+                group_ids.append(g)
+                used_verts.update(group_verts)
+                break
+        else:
+            region_passes.append(([g], group_verts))
+    passes = [(True, individual_ids)] if individual_ids else []
+    return passes + [(False, group_ids) for group_ids, _ in region_passes]
+
+def run_inset_pass(bm, face_groups, group_ids, individual):
+    faces = [f for g in group_ids for f in face_groups[g][0]]
+    # The normals are taken before the inset: at unit thickness a face narrower than 2 is inset past its center,
+    # which reverses its winding and flips its normal.
+    face_normals = {}
+    for f in faces:
+        f.normal_update()
+        face_normals[f] = f.normal.copy()
+    if individual:
+        rim_faces = bmesh.ops.inset_individual(bm, faces=faces, thickness=1.0, depth=0.0)['faces']
+    else:
+        rim_faces = bmesh.ops.inset_region(bm, faces=faces, thickness=1.0, depth=0.0)['faces']
+    rim_faces_set = set(rim_faces)
+
+    vert_groups = {}
+    vert_normals = {}
+    for g in group_ids:
+        for f in face_groups[g][0]:
+            for v in f.verts:
+                vert_groups[v] = g
+                vert_normals[v] = vert_normals.get(v, Vector((0, 0, 0))) + face_normals[f]
+    verts = list(vert_groups.keys())
+
+    # Each inset vert is joined to the vert on the outer side of the rim by a spoke edge lying between two rim faces
+    # (inset_individual keeps the old verts outside, inset_region inside, so it can be either). Verts inside a region
+    # have no spoke and only get the depth.
+    inset_verts = set(verts)
+    base_verts = []
+    for v in verts:
+        base = v
+        for e in v.link_edges:
+            other = e.other_vert(v)
+            if other not in inset_verts and all(lf in rim_faces_set for lf in e.link_faces):
+                base = other
+                break
+        base_verts.append(base)
+
+    coords = np.array([v.co for v in verts], dtype=np.float64)
+    base_coords = np.array([v.co for v in base_verts], dtype=np.float64)
+    normals = np.array([vert_normals[v] for v in verts], dtype=np.float64)
+    normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+    group_values = np.array([face_groups[g][1:3] for g in range(len(face_groups))], dtype=np.float64)
+    thickness, depth = group_values[[vert_groups[v] for v in verts]].T
+    new_coords = base_coords + thickness[:, None]*(coords - base_coords) + depth[:, None]*normals
+    # BMesh has no bulk setter for vert coords (translate/transform take one vector/matrix for all verts), so the
+    # precomputed coords are written back in this one loop.
+    for v, co in zip(verts, new_coords.tolist()):
+        v.co = co
+    # The normals the op left are those of the unit-thickness inset (flipped on narrow faces), and later ops such as
+    # bevel read them.
+    for f in {f for v in verts for f in v.link_faces}:
+        f.normal_update()
+    for v in verts:
+        v.normal_update()
+
+    rim_faces_by_group = {g: [] for g in group_ids}
+    for f in rim_faces:
+        g = next((vert_groups[v] for v in f.verts if v in vert_groups), group_ids[0])
+        rim_faces_by_group[g].append(f)
+    return rim_faces_by_group
+
+def inset_batched_bmesh(bm, face_groups):
+    rim_faces_by_group = {}
+    for individual, group_ids in get_inset_passes(face_groups):
+        rim_faces_by_group.update(run_inset_pass(bm, face_groups, group_ids, individual))
+    bm.faces.index_update()
+    bm.verts.index_update()
+    return [np.array([f.index for f in rim_faces_by_group.get(g, [])], dtype=np.int32) for g in range(len(face_groups))]
+
 #========= Test Insettting ========================================================
 def test_inset_bmesh_before(context):
     bm, obj = create_grid_bmesh(context, name="test_inset_before", location=(7, 0, 2), x_segments=10, y_segments=4, size=6)
@@ -419,9 +816,57 @@ def test_inset_bmesh(context):
     bmesh.ops.inset_region(bm, faces=faces_region_in, thickness=0.5, depth=-0.2)
     bmesh.update_edit_mesh(obj.data)
 
+def test_inset_batched_bmesh(context):
+    bm, obj = create_grid_bmesh(context, name="test_inset_batched", location=(-7, 0, 4), x_segments=10, y_segments=4, size=6)
+    context.tool_settings.mesh_select_mode = [False, False, True]
+
+    bm.faces.ensure_lookup_table()
+    face_groups = [(bm.faces[0:4], 0.3, 0.5, True),
+                   (bm.faces[6:10], 0.5, -0.2, True),
+                   (bm.faces[20:24], 0.3, 0.5, False),
+                   (bm.faces[26:30], 0.5, -0.2, False)]
+    new_faces_by_group = inset_batched_bmesh(bm, face_groups)
+    bm.faces.ensure_lookup_table()
+    for i in new_faces_by_group[3]:
+        bm.faces[i].select = True
+    bmesh.update_edit_mesh(obj.data)
+
+# Batched vs one bmesh.ops call per group, on quads narrower than 2 (as on the fire hydrant), which a unit inset
+# turns inside out. Matches verts by nearest position, since the two renumber differently.
+def test_inset_batched_vs_unbatched(context):
+    bm, obj = create_grid_bmesh(context, name="test_inset_batched_vs_unbatched", location=(-7, 0, 6), x_segments=10, \
+        y_segments=4, size=6)
+    bm.faces.ensure_lookup_table()
+    group_ranges = [(range(0, 10, 2), 0.1, -0.15, True), (range(11, 19), 0.3, 0.1, False),
+                    (range(20, 23), 0.1, -0.15, False), (range(26, 30), 0.3, 0.1, False)]
+    bm_unbatched = bm.copy()
+    bm_unbatched.faces.ensure_lookup_table()
+    for faces, thickness, depth, individual in [([bm_unbatched.faces[i] for i in face_ids], t, d, indv) \
+        for face_ids, t, d, indv in group_ranges]:
+        inset_op = bmesh.ops.inset_individual if individual else bmesh.ops.inset_region
+        inset_op(bm_unbatched, faces=faces, thickness=thickness, depth=depth)
+    inset_batched_bmesh(bm, [([bm.faces[i] for i in face_ids], t, d, indv) for face_ids, t, d, indv in group_ranges])
+
+    coords = np.array([v.co for v in bm.verts])
+    coords_unbatched = np.array([v.co for v in bm_unbatched.verts])
+    dists = np.linalg.norm(coords[:, None] - coords_unbatched[None], axis=2)
+    face_centers = np.array([f.calc_center_median() for f in bm.faces])
+    face_centers_unbatched = np.array([f.calc_center_median() for f in bm_unbatched.faces])
+    nearest = np.linalg.norm(face_centers[:, None] - face_centers_unbatched[None], axis=2).argmin(axis=1)
+    normals = np.array([f.normal for f in bm.faces])
+    normals_unbatched = np.array([f.normal for f in bm_unbatched.faces])[nearest]
+    max_pos_error = max(dists.min(axis=0).max(), dists.min(axis=1).max())
+    max_normal_error = np.linalg.norm(normals - normals_unbatched, axis=1).max()
+    print(f"batched inset: {len(bm.verts)} verts (unbatched {len(bm_unbatched.verts)}), max position error " \
+        f"{max_pos_error:.2e}, max face normal error {max_normal_error:.2e}")
+    bm_unbatched.free()
+    bmesh.update_edit_mesh(obj.data)
+
 def test_inset(context):
     test_inset_bmesh_before(context)
     test_inset_bmesh(context)
+    test_inset_batched_bmesh(context)
+    test_inset_batched_vs_unbatched(context)
 
 #=========== Test Beveling ===================================================
 def test_bevel_bpy_before(context):
@@ -0,0 +1,88 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+import bpy
+import bmesh
+import hashlib
+import numpy as np
+
+from .creating_and_editing_mesh_objs import get_placeholder_mesh_obj_and_bm
+
+# Two meshes get the same fingerprint when they have the same topology (face sizes and the vertex index of every
+# face corner) and, in 'GEOMETRY' mode, the same vertex coordinates and UVs after rounding to the given precision.
+# 'TOPOLOGY' mode skips the coordinates/UVs, so it's the cheaper check for "same structure, maybe moved verts".
+fingerprint_modes = ('TOPOLOGY', 'GEOMETRY')
+
+def get_mesh_topology_arrays(mesh):
+    face_sizes = np.zeros(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", face_sizes)
+    face_verts = np.zeros(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", face_verts)
+    return face_sizes, face_verts
+
+def get_mesh_coords(mesh):
+    coords = np.zeros(len(mesh.vertices)*3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+def get_mesh_uvs(mesh):
+    if mesh.uv_layers.active is None:
+        return None
+    uvs = np.zeros(len(mesh.loops)*2, dtype=np.float32)
+    mesh.uv_layers.active.data.foreach_get("uv", uvs)
+    return uvs.reshape(-1, 2)
+
+def quantize(values, precision):
+    # Rounding to integer steps makes -0.0 and 0.0 (and float noise well below precision) hash the same.
+    return np.round(np.asarray(values, dtype=np.float64)/precision).astype(np.int64)
+
+def get_mesh_fingerprint(mesh, mode='GEOMETRY', precision=1e-4, include_uvs=True):
+    face_sizes, face_verts = get_mesh_topology_arrays(mesh)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array([len(mesh.vertices), len(face_sizes), len(face_verts)], dtype=np.int64).tobytes())
+    h.update(face_sizes.tobytes())
+    h.update(face_verts.tobytes())
+    if mode == 'GEOMETRY':
+        h.update(quantize(get_mesh_coords(mesh), precision).tobytes())
+        uvs = get_mesh_uvs(mesh) if include_uvs else None
+        if uvs is not None:
+            h.update(quantize(uvs, precision).tobytes())
+    return h.hexdigest()
+
+def get_object_fingerprint(obj, mode='GEOMETRY', precision=1e-4, include_uvs=True):
+    # The mesh data of an object in Edit Mode is stale until the edit bmesh is written back.
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
+    return get_mesh_fingerprint(obj.data, mode, precision, include_uvs)
+
+#========= Test Mesh Fingerprints ===================================================
+def test_mesh_fingerprint(context):
+    fingerprints = {}
+    for name, location, segments in [("fp_cone_a", (0, 0, 0), 16), ("fp_cone_b", (4, 0, 0), 16), ("fp_cone_c", (8, 0, 0), 12)]:
+        bm, obj = get_placeholder_mesh_obj_and_bm(context, name, location)
+        bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False, segments=segments, radius1=1, radius2=0, depth=2)
+        bmesh.update_edit_mesh(obj.data)
+        bpy.ops.object.mode_set(mode='OBJECT')
+        fingerprints[name] = (get_object_fingerprint(obj, 'TOPOLOGY'), get_object_fingerprint(obj, 'GEOMETRY'))
+    for name, (fp_topology, fp_geometry) in fingerprints.items():
+        print(name, "topology:", fp_topology, "geometry:", fp_geometry)
@@ -0,0 +1,72 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+
+# Benchmark the fire hydrant generator over its param space and check it against a stored baseline, in one command:
+#
+#   blender -b --factory-startup --python run_benchmark.py -- --out fh_bench.json --update-baseline fh_baseline.json
+#   blender -b --factory-startup --python run_benchmark.py -- --out fh_bench.json --baseline fh_baseline.json
+#
+# --mode grid (default, --levels per param) or --mode lhs (--samples Latin hypercube samples, --seed). The fitted
+# scaling exponents are printed, superlinear ones flagged. Blender exits with status 1 when a baseline was given and
+# any sample got slower, produced different counts, or a scaling exponent grew.
+# The data-only generator is benchmarked; --operators uses the bpy.ops one instead (needs a window, so no -b).
+
+import bpy
+import argparse
+import importlib
+import os, sys
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark the fire hydrant generator over its param space.")
+    parser.add_argument("--mode", choices=("grid", "lhs"), default="grid", help="Grid or Latin hypercube sampling.")
+    parser.add_argument("--levels", type=int, default=4, help="Values per param in grid mode.")
+    parser.add_argument("--samples", type=int, default=32, help="Number of samples in lhs mode.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed in lhs mode.")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per sample (the fastest one is kept).")
+    parser.add_argument("--out", default=None, help="Optional path of a JSON file for the results.")
+    parser.add_argument("--baseline", default=None, help="JSON file of an earlier run to compare against.")
+    parser.add_argument("--update-baseline", default=None, help="Write the results as the baseline to this path.")
+    parser.add_argument("--operators", action="store_true", help="Generate with bpy.ops instead of the data-only path.")
+    return parser.parse_args(argv)
+
+def import_fire_hydrant_generator():
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_dir) not in sys.path:
+        sys.path.append(os.path.dirname(package_dir))
+    return importlib.import_module(os.path.basename(package_dir))
+
+if __name__ == "__main__":
+    args = parse_args()
+    fhg = import_fire_hydrant_generator()
+    baseline = fhg.benchmark.load_benchmark(args.baseline) if args.baseline else None
+    result, comparison = fhg.benchmark_fire_hydrant_params(bpy.context, mode=args.mode.upper(), num_levels=args.levels, \
+        num_samples=args.samples, seed=args.seed, num_repeats=args.repeats, data_only=not args.operators, baseline=baseline)
+    print(fhg.benchmark.format_benchmark(result))
+    for filepath in (args.out, args.update_baseline):
+        if filepath:
+            fhg.benchmark.save_benchmark(result, os.path.abspath(filepath))
+    if comparison is not None:
+        print(fhg.benchmark.format_comparison(comparison))
+    sys.exit(0 if comparison is None or fhg.benchmark.is_comparison_clean(comparison) else 1)
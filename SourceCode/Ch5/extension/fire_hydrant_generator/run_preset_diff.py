@@ -0,0 +1,61 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+# Regenerate the whole fire hydrant preset catalog and diff it against stored golden meshes, in one command:
+#
+#   blender -b --factory-startup --python run_preset_diff.py -- --golden fh_golden.blend --update     (store golden meshes)
+#   blender -b --factory-startup --python run_preset_diff.py -- --golden fh_golden.blend              (diff against them)
+#
+# Optional: --report diff.json to also write the per preset numbers, --tolerance to set the max allowed error.
+# The presets are built with the data-only generator; --operators uses the bpy.ops one instead (needs a window, so no -b).
+# Blender exits with status 1 when any preset changed, so the command can be used as a local regression check.
+
+import bpy
+import argparse
+import importlib
+import os, sys
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Diff the fire hydrant presets against golden meshes.")
+    parser.add_argument("--golden", required=True, help="Path of the .blend file holding the golden meshes.")
+    parser.add_argument("--update", action="store_true", help="Write the golden meshes instead of diffing.")
+    parser.add_argument("--report", default=None, help="Optional path of a JSON file for the diff numbers.")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max positional/UV error still reported as OK.")
+    parser.add_argument("--operators", action="store_true", help="Generate with bpy.ops instead of the data-only path.")
+    return parser.parse_args(argv)
+
+def import_fire_hydrant_generator():
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(package_dir) not in sys.path:
+        sys.path.append(os.path.dirname(package_dir))
+    return importlib.import_module(os.path.basename(package_dir))
+
+if __name__ == "__main__":
+    args = parse_args()
+    fhg = import_fire_hydrant_generator()
+    _, num_changed = fhg.diff_fire_hydrant_presets(bpy.context, os.path.abspath(args.golden), update_golden=args.update, \
+        tolerance=args.tolerance, report_filepath=args.report, data_only=not args.operators)
+    if not args.update:
+        print(f"{num_changed} of {len(fhg.fire_hydrant_presets)} presets changed.")
+    sys.exit(1 if num_changed else 0)
@@ -0,0 +1,128 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+
+import bpy
+import csv
+import numpy as np
+
+from .evaluated_cache import bake_evaluated_mesh
+from .variant_factory import get_variant_name, get_variant_params, variant_kinds
+
+# Mass scatter of generated props: only a pool of pool_size variants is generated (see variant_factory.py), and
+# every point of the point set gets a linked duplicate of one of them, sharing its mesh. With bake=True the pool's
+# subsurf is baked first (see evaluated_cache.py), so the instances share the subdivided mesh too instead of each
+# evaluating its own modifier. The instances go into a new collection, whose objects get their locations,
+# rotations and scales set in bulk with foreach_set. Memory and generation time only depend on the pool size.
+#
+# Point sets: the verts of a guide mesh (in world space), or a CSV file with x, y, z and optionally the z rotation
+# (degrees) and scale of every point, one point per row (a header row is skipped). A point whose rotation or scale
+# cell is empty gets the same random one as a point set without that column.
+csv_point_columns = 5
+def get_guide_mesh_points(guide_obj):
+    coords = np.zeros(len(guide_obj.data.vertices)*3, dtype=np.float64)
+    guide_obj.data.vertices.foreach_get("co", coords)
+    matrix_world = np.array(guide_obj.matrix_world)
+    return coords.reshape(-1, 3) @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+
+# Empty and missing cells are NaN. None for a row without a number for each of x, y and z, or with text where a
+# number should be.
+def parse_csv_point_row(row):
+    cells = [v.strip() for v in row[:csv_point_columns]]
+    cells += [""]*(csv_point_columns - len(cells))
+    try:
+        values = [float(v) if v else np.nan for v in cells]
+    except ValueError:
+        return None
+    return None if np.isnan(values[:3]).any() else values
+
+# Malformed rows are skipped, their line numbers are returned so they can be reported. Blank rows are ignored.
+def load_csv_points(filepath):
+    rows = []
+    skipped_lines = []
+    with open(filepath, newline='') as f:
+        reader = csv.reader(f)
+        is_first_row = True
+        for row in reader:
+            if not any(v.strip() for v in row):
+                continue
+            values = parse_csv_point_row(row)
+            if values is not None:
+                rows.append(values)
+            elif not is_first_row:
+                skipped_lines.append(reader.line_num)
+            is_first_row = False
+    table = np.array(rows, dtype=np.float64).reshape(-1, csv_point_columns)
+    rot_z = np.radians(table[:, 3]) if not np.isnan(table[:, 3]).all() else None
+    scales = table[:, 4] if not np.isnan(table[:, 4]).all() else None
+    return table[:, :3], rot_z, scales, skipped_lines
+
+def gen_variant_pool(context, kind, pool_size, seed=0, bake=False):
+    prefix, distributions, gen_variant = variant_kinds[kind]
+    pool = []
+    for index, params in enumerate(get_variant_params(distributions, pool_size, seed)):
+        pool_obj = gen_variant(context, get_variant_name(prefix, seed, index), params)
+        if bake:
+            bake_evaluated_mesh(context, pool_obj)
+        pool.append(pool_obj)
+    return pool
+
+# Random z rotations (when none are given) and scales between 1 - scale_jitter and 1 + scale_jitter. The random
+# ones also fill in the NaN entries of given rotations/scales.
+def get_instance_transforms(num_points, seed=0, rot_z=None, scales=None, random_rotation=True, scale_jitter=0.0):
+    rng = np.random.default_rng(seed)
+    random_rot_z = rng.uniform(0, 2*np.pi, num_points) if random_rotation else np.zeros(num_points)
+    random_scales = 1 + rng.uniform(-scale_jitter, scale_jitter, num_points)
+    rot_z = random_rot_z if rot_z is None else np.where(np.isnan(rot_z), random_rot_z, rot_z)
+    scales = random_scales if scales is None else np.where(np.isnan(scales), random_scales, scales)
+    rotations = np.zeros((num_points, 3))
+    rotations[:, 2] = rot_z
+    return rotations, np.repeat(np.asarray(scales, dtype=np.float64)[:, None], 3, axis=1)
+
+def scatter_variants(context, name, kind, points, pool_size=8, seed=0, rot_z=None, scales=None, random_rotation=True, \
+    scale_jitter=0.0, bake=False):
+    pool = gen_variant_pool(context, kind, pool_size, seed, bake)
+    rng = np.random.default_rng(seed + 1)
+    variant_indices = rng.integers(len(pool), size=len(points))
+
+    scatter_collection = bpy.data.collections.new(name)
+    context.scene.collection.children.link(scatter_collection)
+    for variant_index in variant_indices:
+        scatter_collection.objects.link(pool[variant_index].copy())
+    rotations, scales = get_instance_transforms(len(points), seed, rot_z, scales, random_rotation, scale_jitter)
+    scatter_collection.objects.foreach_set("location", np.asarray(points, dtype=np.float32).ravel())
+    scatter_collection.objects.foreach_set("rotation_euler", rotations.astype(np.float32).ravel())
+    scatter_collection.objects.foreach_set("scale", scales.astype(np.float32).ravel())
+
+    # The instances hold on to the pool meshes (and modifiers), the pool objects themselves aren't needed anymore.
+    for pool_obj in pool:
+        bpy.data.objects.remove(pool_obj)
+    return scatter_collection
+
+#========= Test Scatter ========================================================
+def test_scatter(context, num_points=2000, pool_size=12):
+    rng = np.random.default_rng(3)
+    points = np.zeros((num_points, 3))
+    points[:, :2] = rng.uniform(-200, 200, (num_points, 2))
+    scatter_variants(context, "fh_scatter", 'FIRE_HYDRANT', points, pool_size=pool_size, scale_jitter=0.1, bake=True)
+    scatter_variants(context, "barrel_scatter", 'BARREL', points + (2, 0, 0), pool_size=pool_size // 2)
@@ -0,0 +1,139 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+import json
+import os
+import time
+
+# Per-stage timers and element counters for the generators. Off by default; switched on from the panel, with
+# set_stage_timing_enabled, or by starting Blender with FH_STAGE_TIMING=1. A generator starts a run, marks the end of
+# each stage (the time since the previous mark, plus vert/edge/face counts of the bmesh at that point), then ends the
+# run. While disabled, start_stage_run returns None and marking is a no-op, so the generators can call them
+# unconditionally.
+#
+# Ended runs are aggregated per (run label, stage) across calls and kept until reset_stage_timings. A run can name a
+# baseline label (e.g. a faster path of the same generator names the full one) and a params key saying what it built.
+# Its speedup is then the mean run time of the baseline over its own, both taken over the runs with the same params
+# key only (a mean over different builds says nothing), reported with the run and in the exported timings.
+stage_timing_env_var = "FH_STAGE_TIMING"
+stage_timing = {"enabled": os.environ.get(stage_timing_env_var, "0") not in ("", "0"), "totals": {}, "num_runs": {}, \
+    "params_runs": {}, "baselines": {}, "last_run": None}
+
+def is_stage_timing_enabled():
+    return stage_timing["enabled"]
+
+def set_stage_timing_enabled(enabled):
+    stage_timing["enabled"] = enabled
+
+def start_stage_run(label, baseline_label=None, params_key=None):
+    if not stage_timing["enabled"]:
+        return None
+    now = time.perf_counter()
+    return {"label": label, "baseline": baseline_label, "params": params_key, "stages": [], "start": now, "last_mark": now}
+
+def mark_stage(run, stage_name, bm=None):
+    if run is None:
+        return
+    stage = {"stage": stage_name, "seconds": time.perf_counter() - run["last_mark"]}
+    if bm is not None:
+        stage.update(verts=len(bm.verts), edges=len(bm.edges), faces=len(bm.faces))
+    run["stages"].append(stage)
+    # Counting isn't part of any stage.
+    run["last_mark"] = time.perf_counter()
+
+def end_stage_run(run):
+    if run is None:
+        return
+    last_run = {"label": run["label"], "params": run["params"], "seconds": sum(stage["seconds"] for stage in run["stages"]), \
+        "stages": run["stages"]}
+    label_totals = stage_timing["totals"].setdefault(run["label"], {})
+    for stage in run["stages"]:
+        totals = label_totals.setdefault(stage["stage"], {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, \
+            "verts": 0, "edges": 0, "faces": 0})
+        totals["calls"] += 1
+        totals["seconds"] += stage["seconds"]
+        totals["max_seconds"] = max(totals["max_seconds"], stage["seconds"])
+        for count in ("verts", "edges", "faces"):
+            totals[count] += stage.get(count, 0)
+    stage_timing["num_runs"][run["label"]] = stage_timing["num_runs"].get(run["label"], 0) + 1
+    if run["params"] is not None:
+        label_runs = stage_timing["params_runs"].setdefault(run["label"], {})
+        num_runs, seconds = label_runs.get(run["params"], (0, 0.0))
+        label_runs[run["params"]] = (num_runs + 1, seconds + last_run["seconds"])
+    if run["baseline"] is not None:
+        stage_timing["baselines"][run["label"]] = run["baseline"]
+        last_run.update(baseline=run["baseline"], speedup=get_speedup(run["label"], run["params"]))
+    stage_timing["last_run"] = last_run
+
+def get_mean_run_seconds(label, params_key):
+    num_runs, seconds = stage_timing["params_runs"].get(label, {}).get(params_key, (0, 0.0))
+    return seconds/num_runs if num_runs else None
+
+# None until both the label and its baseline have runs with these params.
+def get_speedup(label, params_key):
+    if params_key is None:
+        return None
+    baseline_seconds = get_mean_run_seconds(stage_timing["baselines"].get(label), params_key)
+    seconds = get_mean_run_seconds(label, params_key)
+    if baseline_seconds is None or not seconds:
+        return None
+    return baseline_seconds/seconds
+
+def reset_stage_timings():
+    stage_timing["totals"] = {}
+    stage_timing["num_runs"] = {}
+    stage_timing["params_runs"] = {}
+    stage_timing["baselines"] = {}
+    stage_timing["last_run"] = None
+
+def get_last_stage_run():
+    return stage_timing["last_run"]
+
+# Totals per label and stage, with the mean time and mean element counts over the calls.
+def get_stage_timings():
+    totals = {}
+    for label, label_totals in stage_timing["totals"].items():
+        totals[label] = {}
+        for stage_name, stage_totals in label_totals.items():
+            calls = stage_totals["calls"]
+            totals[label][stage_name] = dict(stage_totals, mean_seconds=stage_totals["seconds"]/calls, \
+                mean_verts=stage_totals["verts"]/calls, mean_faces=stage_totals["faces"]/calls)
+    speedups = {label: {"baseline": baseline, "by_params": {params_key: get_speedup(label, params_key) \
+        for params_key in stage_timing["params_runs"].get(label, {})}} for label, baseline in stage_timing["baselines"].items()}
+    return {"num_runs": dict(stage_timing["num_runs"]), "totals": totals, "speedups": speedups, \
+        "last_run": stage_timing["last_run"]}
+
+def export_stage_timings(filepath):
+    with open(filepath, 'w') as f:
+        json.dump(get_stage_timings(), f, indent=2)
+
+def format_speedup(run):
+    if run.get("speedup") is None:
+        return None
+    return f"{run['speedup']:.2f}x faster than {run['baseline']} ({run['params']})"
+
+def format_stage(stage):
+    text = stage["stage"] + ": " + f"{stage['seconds']*1000:.1f} ms"
+    if "verts" in stage:
+        text += f", {stage['verts']} verts, {stage['faces']} faces"
+    return text
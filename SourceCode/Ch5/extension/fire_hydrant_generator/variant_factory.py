@@ -0,0 +1,176 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#    GNU GPLv3, 29 June 2007
+#
+#    Examples from Ch5 of the book "Blender Scripting with Python" by Isabel Lupiani.
+#    Copyright (C) 2024  Isabel Lupiani, Apress.
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+
+
+import bpy
+import json
+import numpy as np
+import os
+
+from .fire_hydrant_data import gen_fire_hydrant_data_only
+from .lod_chain import gen_barrel_data_only
+
+# Seeded variant factory for large prop catalogs: the generation params of every variant are drawn from per-param
+# distributions with one seeded generator, so (seed, index) always gives the same variant. Float params are rounded
+# to param_decimals, which makes "identical" well defined, and a param set already drawn is drawn again. Variants are
+# generated shard_size at a time with the data-only generators, each shard is written to its own file (a .blend
+# library or an .obj) and then removed from the file before the next one, so only one shard is in memory at a time
+# however big the catalog is. A manifest.jsonl next to the shards lists the params and shard of every variant.
+#
+# Distributions: ('UNIFORM', min, max), ('INT', min, max) (both inclusive), ('NORMAL', mean, std, min, max) (clipped),
+# ('CHOICE', values) or ('CHOICE', values, weights), ('CONST', value).
+fire_hydrant_distributions = {
+    "num_cir_segments": ('CHOICE', (8, 12, 16, 24, 32), (0.15, 0.2, 0.35, 0.15, 0.15)),
+    "pole_radius": ('NORMAL', 3.0, 0.75, 1.5, 6.0),
+    "num_pole_levels": ('INT', 1, 10),
+    "num_dome_levels": ('INT', 2, 6),
+    "stylize": ('CHOICE', (False, True)),
+    "pole_bent_factor": ('UNIFORM', 1.0, 3.0),
+    "dome_bent_factor": ('UNIFORM', 1.0, 3.0),
+    "subsurf": ('CONST', True),
+    "subsurf_level": ('INT', 1, 3),
+    "add_geo_for_sharp_loops": ('CHOICE', (False, True), (0.25, 0.75)),
+    "sharp_loop_mode": ('CHOICE', ('BEVEL', 'CREASE')),
+}
+barrel_distributions = {
+    "radius_end": ('UNIFORM', 0.8, 1.1),
+    "radius_mid": ('UNIFORM', 1.1, 1.5),
+    "height": ('NORMAL', 3.0, 0.5, 2.0, 4.5),
+    "num_segments": ('CHOICE', (8, 12, 16)),
+}
+param_decimals = 3
+shard_formats = ('BLEND', 'OBJ')
+manifest_filename = "manifest.jsonl"
+
+#========= Sampling Params ========================================================
+def sample_param(rng, distribution):
+    kind = distribution[0]
+    if kind == 'UNIFORM':
+        return round(float(rng.uniform(distribution[1], distribution[2])), param_decimals)
+    if kind == 'INT':
+        return int(rng.integers(distribution[1], distribution[2] + 1))
+    if kind == 'NORMAL':
+        _, mean, std, min_value, max_value = distribution
+        return round(float(np.clip(rng.normal(mean, std), min_value, max_value)), param_decimals)
+    if kind == 'CHOICE':
+        values = distribution[1]
+        weights = np.asarray(distribution[2], dtype=np.float64) if len(distribution) > 2 else None
+        value = values[rng.choice(len(values), p=None if weights is None else weights/weights.sum())]
+        return value.item() if isinstance(value, np.generic) else value
+    if kind == 'CONST':
+        return distribution[1]
+    raise ValueError("Unknown distribution: " + str(kind))
+
+# Yields num_variants distinct param sets (fewer if the distributions run out of distinct sets after max_draws draws).
+def get_variant_params(distributions, num_variants, seed=0, max_draws=None):
+    rng = np.random.default_rng(seed)
+    max_draws = max_draws or 20*num_variants
+    seen = set()
+    num_draws = 0
+    while len(seen) < num_variants and num_draws < max_draws:
+        num_draws += 1
+        params = {name: sample_param(rng, distribution) for name, distribution in distributions.items()}
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            yield params
+
+#========= Generating Variants ========================================================
+def gen_fire_hydrant_variant(context, name, params):
+    return gen_fire_hydrant_data_only(context, name, location=(0, 0, 0), **params)
+
+def gen_barrel_variant(context, name, params):
+    return gen_barrel_data_only(context, name, center=(0, 0, 0), **params)
+
+variant_kinds = {
+    "FIRE_HYDRANT": ("fire_hydrant", fire_hydrant_distributions, gen_fire_hydrant_variant),
+    "BARREL": ("barrel", barrel_distributions, gen_barrel_variant),
+}
+
+def get_variant_name(prefix, seed, index):
+    return f"{prefix}_s{seed}_{index:06d}"
+
+#========= Streaming Shards ========================================================
+def get_shard_filepath(out_dir, prefix, shard_index, file_format):
+    return os.path.join(out_dir, f"{prefix}_shard_{shard_index:04d}" + (".blend" if file_format == 'BLEND' else ".obj"))
+
+def write_shard(context, filepath, objs, file_format='BLEND'):
+    if file_format == 'BLEND':
+        bpy.data.libraries.write(filepath, set(objs), fake_user=True)
+    else:
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        for obj in objs:
+            obj.select_set(True)
+        bpy.ops.wm.obj_export(filepath=filepath, export_selected_objects=True, apply_modifiers=True, \
+            export_materials=False)
+
+def remove_shard(objs):
+    meshes = [obj.data for obj in objs]
+    for obj in objs:
+        bpy.data.objects.remove(obj)
+    for mesh in meshes:
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+
+def flush_shard(context, shard, out_dir, prefix, shard_index, file_format, manifest_filepath, seed):
+    filepath = get_shard_filepath(out_dir, prefix, shard_index, file_format)
+    objs = [obj for _, obj in shard]
+    write_shard(context, filepath, objs, file_format)
+    with open(manifest_filepath, 'a') as f:
+        for params, obj in shard:
+            f.write(json.dumps({"name": obj.name, "seed": seed, "shard": os.path.basename(filepath), \
+                "params": params}) + "\n")
+    remove_shard(objs)
+    return filepath
+
+# kind is a key of variant_kinds; distributions override the kind's default ones param by param.
+def gen_variant_catalog(context, kind, num_variants, out_dir, seed=0, shard_size=100, file_format='BLEND', \
+    distributions=None):
+    prefix, default_distributions, gen_variant = variant_kinds[kind]
+    distributions = dict(default_distributions, **(distributions or {}))
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_filepath = os.path.join(out_dir, manifest_filename)
+    open(manifest_filepath, 'w').close()
+
+    shard_filepaths = []
+    shard = []
+    num_generated = 0
+    for index, params in enumerate(get_variant_params(distributions, num_variants, seed)):
+        shard.append((params, gen_variant(context, get_variant_name(prefix, seed, index), params)))
+        num_generated += 1
+        if len(shard) == shard_size:
+            shard_filepaths.append(flush_shard(context, shard, out_dir, prefix, len(shard_filepaths), file_format, \
+                manifest_filepath, seed))
+            shard = []
+    if shard:
+        shard_filepaths.append(flush_shard(context, shard, out_dir, prefix, len(shard_filepaths), file_format, \
+            manifest_filepath, seed))
+    return {"num_variants": num_generated, "shards": shard_filepaths, "manifest": manifest_filepath}
+
+#========= Test Variant Factory ========================================================
+def test_variant_factory(context, out_dir, num_variants=250, seed=7):
+    for kind in variant_kinds:
+        result = gen_variant_catalog(context, kind, num_variants, os.path.join(out_dir, kind.lower()), seed=seed, \
+            shard_size=50)
+        print(f"{kind}: {result['num_variants']} variants in {len(result['shards'])} shards, see {result['manifest']}")
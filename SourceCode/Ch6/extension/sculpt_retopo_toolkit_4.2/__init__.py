@@ -30,8 +30,10 @@ import bpy
 from bpy.types import Operator
 from bpy.props import BoolProperty, FloatProperty, IntProperty
 from mathutils import Vector
+from mathutils.bvhtree import BVHTree
 import bmesh
-from math import floor
+import hashlib
+import numpy as np
 
 srtk_gp_obj_name = "Sculpt_Retopo_Toolkit_GP"
 
@@ -49,11 +51,29 @@ def init_scene_vars():
         description="Whether to cut thru the mesh to the other side with Carve and In/Outset.",
         default=False)
 
+    bpy.types.Scene.local_carve_checkbox = BoolProperty(
+        name="Local Carve",
+        description="Whether Carve runs only on the faces under the GP strokes, split off and welded back, instead of the whole mesh.",
+        default=False)
+
+    bpy.types.Scene.carve_depth = FloatProperty(
+        name="Carve Depth",
+        description="How far Batch Carve cuts in front of and behind the GP strokes when not cutting thru.",
+        default=0.1,
+        min=0.0)
+
     bpy.types.Scene.inoutset_amount = FloatProperty(
         name="In/Outset Amount",
         description="Amount to inset(+) or outset(-).",
         default=0.1)
 
+    bpy.types.Scene.simplify_tolerance = FloatProperty(
+        name="Simplify Tolerance",
+        description="Max distance GP stroke points may be off the simplified cutter outline with Carve and In/Outset (0 to keep every point).",
+        default=0.01,
+        min=0.0,
+        precision=4)
+
     bpy.types.Scene.num_grid_lines = IntProperty(
         name="Grid Lines",
         description="Number of horizontal grid lines to make from GP strokes.",
@@ -63,7 +83,10 @@ def init_scene_vars():
 def del_scene_vars():
     del bpy.types.Scene.select_mesh_dropdown
     del bpy.types.Scene.cut_thru_checkbox
+    del bpy.types.Scene.local_carve_checkbox
+    del bpy.types.Scene.carve_depth
     del bpy.types.Scene.inoutset_amount
+    del bpy.types.Scene.simplify_tolerance
     del bpy.types.Scene.num_grid_lines
     
 #################################################################################################
@@ -136,6 +159,56 @@ class BUTTON_OT_draw_with_GP(Operator):
         self.report({'INFO'}, 'Sculpt & Retopo Toolkit: Draw with GP.')
         return {'FINISHED'}
     
+def get_stroke_coords(stroke):
+    coords = np.zeros(len(stroke.points)*3, dtype=np.float32)
+    stroke.points.foreach_get("co", coords)
+    return coords.reshape(-1, 3)
+
+# Ramer-Douglas-Peucker: keeps the end points, and recursively the point farthest from the segment between the kept
+# points around it while that distance is above tolerance. The distances of a whole span are computed at once.
+def simplify_stroke_coords(coords, tolerance):
+    if tolerance <= 0 or len(coords) < 3:
+        return coords
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[[0, -1]] = True
+    spans = [(0, len(coords) - 1)]
+    while spans:
+        first, last = spans.pop()
+        if last - first < 2:
+            continue
+        seg = coords[last] - coords[first]
+        pts = coords[first+1:last] - coords[first]
+        seg_len_sq = seg @ seg
+        t = np.clip(pts @ seg/seg_len_sq, 0, 1) if seg_len_sq > 0 else np.zeros(len(pts))
+        dists = np.linalg.norm(pts - t[:, None]*seg, axis=1)
+        i = int(np.argmax(dists))
+        if dists[i] > tolerance:
+            keep[first + 1 + i] = True
+            spans += [(first, first + 1 + i), (first + 1 + i, last)]
+    return coords[keep]
+
+# GP strokes are used as closed loops, so the loop is split at the point farthest from the first one and both halves
+# are simplified (the first point isn't repeated at the end).
+def simplify_closed_stroke_coords(coords, tolerance):
+    if tolerance <= 0 or len(coords) < 4:
+        return coords
+    far = int(np.argmax(np.linalg.norm(coords - coords[0], axis=1)))
+    loop = np.concatenate([coords, coords[:1]])
+    first_half = simplify_stroke_coords(loop[:far+1], tolerance)
+    second_half = simplify_stroke_coords(loop[far:], tolerance)
+    return np.concatenate([first_half, second_half[1:-1]])
+
+# POLY spline through all the points in one foreach_set, with the homogeneous w (1) appended to every point and the
+# first point repeated at the end to make it a loop.
+def add_closed_poly_spline(curve_data, coords):
+    spline = curve_data.splines.new(type='POLY')
+    spline.points.add(len(coords)) # A new spline already has 1 point.
+    spline_coords = np.ones((len(coords) + 1, 4), dtype=np.float32)
+    spline_coords[:-1, :3] = coords
+    spline_coords[-1, :3] = coords[0]
+    spline.points.foreach_set("co", spline_coords.ravel())
+    return spline
+
 def gp_knife_project(context, mesh_obj_to_edit):    
     existing_gp_obj_index = context.collection.objects.find(srtk_gp_obj_name)
     gp_obj = context.collection.objects[existing_gp_obj_index]
@@ -145,28 +218,21 @@ def gp_knife_project(context, mesh_obj_to_edit):
     context.collection.objects.link(curve_obj)        
     
     num_pts = 0
+    num_pts_removed = 0
     layer = gp_obj.data.layers.active
     for f in layer.frames:
         for s in f.strokes:
-            s_spline_data = curve_obj.data.splines.new(type='POLY')
-            s_num_pts = len(s.points)
-            if s_num_pts < 1:
+            s_coords = get_stroke_coords(s)
+            if len(s_coords) < 1:
                 continue
-            
-            num_pts += s_num_pts
-            
-            s_spline_data.points.add(s_num_pts - 1)
-            for i in range(s_num_pts):
-                pi = s.points[i].co
-                s_spline_data.points[i].co = [pi[0], pi[1], pi[2], 1]
-            
-            # Append the first point to the end to make it a loop.
-            s_spline_data.points.add(1)
-            p0 = s.points[0].co
-            s_spline_data.points[-1].co = [p0[0], p0[1], p0[2], 1]
+            # Fewer cutter edges make for a faster knife project.
+            s_coords_simplified = simplify_closed_stroke_coords(s_coords, context.scene.simplify_tolerance)
+            num_pts += len(s_coords_simplified)
+            num_pts_removed += len(s_coords) - len(s_coords_simplified)
+            add_closed_poly_spline(curve_obj.data, s_coords_simplified)
             
     if num_pts < 3:
-        return False, None, num_pts
+        return False, None, num_pts, num_pts_removed
               
     for obj in context.view_layer.objects:
         obj.select_set(False)
@@ -183,7 +249,7 @@ def gp_knife_project(context, mesh_obj_to_edit):
         bpy.ops.mesh.knife_project(cut_through=context.scene.cut_thru_checkbox)
     
     reset_gp(context, clear_strokes=True)
-    return True, curve_obj, num_pts
+    return True, curve_obj, num_pts, num_pts_removed
 
 def gp_strokes_mesh_selection_check(self, context, mesh_obj_to_edit):
     if len(context.scene.grease_pencil.layers.active.frames[0].strokes) == 0:
@@ -196,6 +262,149 @@ def gp_strokes_mesh_selection_check(self, context, mesh_obj_to_edit):
     
     return True
 
+# Padding around the GP strokes' projected bounds, as a fraction of their size, so the knife never reaches the
+# border of the local carve patch.
+local_carve_margin = 0.1
+local_carve_weld_distance = 1e-5
+local_carve_seam_attr = "srtk_carve_seam"
+
+def get_gp_coords(context):
+    existing_gp_obj_index = context.collection.objects.find(srtk_gp_obj_name)
+    gp_obj = context.collection.objects[existing_gp_obj_index]
+    layer = gp_obj.data.layers.active
+    coords = [get_stroke_coords(s) for f in layer.frames for s in f.strokes]
+    return np.concatenate(coords) if coords else np.zeros((0, 3))
+
+# Normalized screen xy of world points as seen from the viewport knife project projects from, and whether each point
+# is in front of the view.
+def project_to_view(region_3d, world_coords):
+    clip_coords = np.c_[world_coords, np.ones(len(world_coords))] @ np.array(region_3d.perspective_matrix).T
+    in_front = clip_coords[:, 3] > 1e-6
+    return clip_coords[:, :2] / np.where(in_front, clip_coords[:, 3], 1.0)[:, None], in_front
+
+# Separates the faces of obj whose projected bounds overlap the (padded) projected bounds of the GP strokes into a
+# patch object, so knife project and the boolean only see the region being carved. The verts the patch shares with the
+# rest of the mesh are flagged in a boolean attribute for join_carve_patch to weld.
+def split_carve_patch(context, obj):
+    context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
+    region_3d = context_override['area'].spaces.active.region_3d
+    gp_coords_2d, gp_in_front = project_to_view(region_3d, get_gp_coords(context))
+    gp_coords_2d = gp_coords_2d[gp_in_front]
+    if len(gp_coords_2d) < 3:
+        return None
+    bounds_min, bounds_max = gp_coords_2d.min(axis=0), gp_coords_2d.max(axis=0)
+    margin = (bounds_max - bounds_min)*local_carve_margin + 1e-4
+    bounds_min, bounds_max = bounds_min - margin, bounds_max + margin
+
+    for o in context.view_layer.objects:
+        o.select_set(False)
+    context.view_layer.objects.active = obj
+    obj.select_set(True)
+    with bpy.context.temp_override(**context_override):
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    mesh = obj.data
+    if len(mesh.polygons) == 0:
+        return None
+    coords = np.empty(len(mesh.vertices)*3)
+    mesh.vertices.foreach_get("co", coords)
+    matrix_world = np.array(obj.matrix_world)
+    coords_2d, in_front = project_to_view(region_3d, coords.reshape(-1, 3) @ matrix_world[:3, :3].T + matrix_world[:3, 3])
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+
+    face_min = np.minimum.reduceat(coords_2d[loop_verts], loop_starts, axis=0)
+    face_max = np.maximum.reduceat(coords_2d[loop_verts], loop_starts, axis=0)
+    face_in_patch = np.logical_and.reduceat(in_front[loop_verts], loop_starts) & \
+        np.all(face_max >= bounds_min, axis=1) & np.all(face_min <= bounds_max, axis=1)
+    if not face_in_patch.any():
+        return None
+    loop_in_patch = np.repeat(face_in_patch, loop_totals)
+    vert_in_patch = np.zeros(len(mesh.vertices), dtype=bool)
+    vert_in_patch[loop_verts[loop_in_patch]] = True
+    vert_outside_patch = np.zeros(len(mesh.vertices), dtype=bool)
+    vert_outside_patch[loop_verts[~loop_in_patch]] = True
+    edge_in_patch = np.zeros(len(mesh.edges), dtype=bool)
+    edge_in_patch[loop_edges[loop_in_patch]] = True
+
+    seam_attr = mesh.attributes.new(local_carve_seam_attr, 'BOOLEAN', 'POINT')
+    seam_attr.data.foreach_set("value", vert_in_patch & vert_outside_patch)
+    mesh.vertices.foreach_set("select", vert_in_patch)
+    mesh.edges.foreach_set("select", edge_in_patch)
+    mesh.polygons.foreach_set("select", face_in_patch)
+    with bpy.context.temp_override(**context_override):
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.separate(type='SELECTED')
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    patch_obj = [o for o in context.selected_objects if o != obj][0]
+    patch_obj.name = obj.name + "_carve_patch"
+    return patch_obj
+
+# Joins the carved patch back into obj and merges the seam verts flagged by split_carve_patch with their copies.
+def join_carve_patch(context, obj, patch_obj):
+    context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
+    with bpy.context.temp_override(**context_override):
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for o in context.view_layer.objects:
+        o.select_set(False)
+    context.view_layer.objects.active = obj
+    obj.select_set(True)
+    patch_obj.select_set(True)
+    with bpy.context.temp_override(**context_override):
+        bpy.ops.object.join()
+
+    mesh = obj.data
+    seam = np.zeros(len(mesh.vertices), dtype=bool)
+    mesh.attributes[local_carve_seam_attr].data.foreach_get("value", seam)
+    mesh.attributes.remove(mesh.attributes[local_carve_seam_attr])
+    mesh.vertices.foreach_set("select", seam)
+    mesh.edges.foreach_set("select", np.zeros(len(mesh.edges), dtype=bool))
+    mesh.polygons.foreach_set("select", np.zeros(len(mesh.polygons), dtype=bool))
+    with bpy.context.temp_override(**context_override):
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.remove_doubles(threshold=local_carve_weld_distance)
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+def carve_with_gp(self, context, obj_to_be_carved, report_suffix=""):
+    knife_project_success, hole_template_obj, num_pts, num_pts_removed = gp_knife_project(context, obj_to_be_carved)
+    
+    if not knife_project_success:
+        if num_pts < 3:
+            self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Carve - GP stroke does not define a polygon.')
+        else:
+            self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Carve - Knife project from GP strokes failed.')
+        return
+    
+    try:
+        bpy.ops.mesh.separate(type='SELECTED')
+    except:
+        self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Carve - Draw a hole to carve with a closed loop.')
+        return
+
+    hole_template_obj.select_set(True)
+    if hole_template_obj != obj_to_be_carved and hole_template_obj.type == 'MESH':
+        boolean_mod = obj_to_be_carved.modifiers.new("boolean_mod", 'BOOLEAN')
+        boolean_mod.object = hole_template_obj
+        boolean_mod.operation = 'DIFFERENCE'
+        
+        context.scene.tool_settings.mesh_select_mode[1] = True
+        context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
+        with bpy.context.temp_override(**context_override):
+            bpy.ops.object.mode_set(mode='OBJECT')
+            bpy.ops.object.modifier_apply(modifier=boolean_mod.name)
+
+    bpy.data.objects.remove(hole_template_obj)
+    bpy.data.objects.remove(context.scene.objects[-1])
+            
+    self.report({'INFO'}, f'Sculpt & Retopo Toolkit: Carve (simplify removed {num_pts_removed} of {num_pts + num_pts_removed} GP points{report_suffix}).')
+
 class BUTTON_OT_carve(Operator):
     bl_idname = "button.carve"
     bl_label = "Carve"
@@ -208,38 +417,117 @@ class BUTTON_OT_carve(Operator):
         if not gp_strokes_mesh_selection_check(self, context, obj_to_be_carved):
             return {'FINISHED'}
         
-        knife_project_success, hole_template_obj, num_pts = gp_knife_project(context, obj_to_be_carved)
-        
-        if not knife_project_success:
-            if num_pts < 3:
-                self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Carve - GP stroke does not define a polygon.')
-            else:
-                self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Carve - Knife project from GP strokes failed.')
-            return {'FINISHED'}            
-        
-        try:
-            bpy.ops.mesh.separate(type='SELECTED')
-        except:
-            self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Carve - Draw a hole to carve with a closed loop.')
+        if context.scene.local_carve_checkbox:
+            num_faces = len(obj_to_be_carved.data.polygons)
+            patch_obj = split_carve_patch(context, obj_to_be_carved)
+            if not patch_obj:
+                self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Carve - GP strokes are not over the mesh.')
+                return {'FINISHED'}
+            report_suffix = f', local patch of {len(patch_obj.data.polygons)} of {num_faces} faces'
+            carve_with_gp(self, context, patch_obj, report_suffix)
+            join_carve_patch(context, obj_to_be_carved, patch_obj)
+        else:
+            carve_with_gp(self, context, obj_to_be_carved)
+
+        context.scene.select_mesh_dropdown = None
+        return {'FINISHED'}
+
+# Unit directions the viewport looks along thru each world point, i.e. the directions knife project would project
+# them along.
+def get_view_dirs(region_3d, world_coords):
+    if region_3d.is_perspective:
+        view_origin = np.array(region_3d.view_matrix.inverted().translation)
+        view_dirs = world_coords - view_origin
+        return view_dirs/np.linalg.norm(view_dirs, axis=1, keepdims=True)
+    view_dir = np.array(region_3d.view_rotation @ Vector((0, 0, -1)))
+    return np.broadcast_to(view_dir, world_coords.shape)
+
+# One closed prism per stroke, running from depth in front of the stroke to depth behind it along the view, all
+# in one mesh so that a single boolean cuts every hole.
+def get_cutter_prisms_arrays(strokes_coords, strokes_dirs, depth):
+    coords = []
+    faces = []
+    num_verts = 0
+    for s_coords, s_dirs in zip(strokes_coords, strokes_dirs):
+        n = len(s_coords)
+        coords += [s_coords - s_dirs*depth, s_coords + s_dirs*depth]
+        front = num_verts + np.arange(n)
+        back = front + n
+        faces += np.stack([front, np.roll(front, -1), np.roll(back, -1), back], axis=-1).tolist()
+        faces += [front.tolist(), back[::-1].tolist()]
+        num_verts += 2*n
+    return np.concatenate(coords), faces
+
+def create_cutter_obj(context, name, coords, faces):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(coords.tolist(), [], faces)
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    # Strokes drawn clockwise or counterclockwise give prisms wound either way; the boolean wants them facing out.
+    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+    bm.to_mesh(mesh)
+    bm.free()
+    cutter_obj = bpy.data.objects.new(name, mesh)
+    context.collection.objects.link(cutter_obj)
+    return cutter_obj
+
+class BUTTON_OT_batch_carve(Operator):
+    bl_idname = "button.batch_carve"
+    bl_label = "Batch Carve"
+    '''Carve a hole for every closed GP stroke with one cutter and one boolean'''
+
+    def execute(self, context):
+        reset_gp(context, clear_strokes=False)
+        obj_to_be_carved = context.scene.select_mesh_dropdown
+
+        if not gp_strokes_mesh_selection_check(self, context, obj_to_be_carved):
             return {'FINISHED'}
 
-        hole_template_obj.select_set(True)
-        if hole_template_obj != obj_to_be_carved and hole_template_obj.type == 'MESH':
-            boolean_mod = obj_to_be_carved.modifiers.new("boolean_mod", 'BOOLEAN')
-            boolean_mod.object = hole_template_obj
-            boolean_mod.operation = 'DIFFERENCE'
-            
-            context.scene.tool_settings.mesh_select_mode[1] = True
-            context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
-            with bpy.context.temp_override(**context_override):
-                bpy.ops.object.mode_set(mode='OBJECT')
-                bpy.ops.object.modifier_apply(modifier=boolean_mod.name)
-
-        bpy.data.objects.remove(hole_template_obj)
-        bpy.data.objects.remove(context.scene.objects[-1])
+        existing_gp_obj_index = context.collection.objects.find(srtk_gp_obj_name)
+        gp_obj = context.collection.objects[existing_gp_obj_index]
+        strokes_coords = []
+        num_strokes = 0
+        for f in gp_obj.data.layers.active.frames:
+            for s in f.strokes:
+                num_strokes += 1
+                s_coords = simplify_closed_stroke_coords(get_stroke_coords(s), context.scene.simplify_tolerance)
+                if len(s_coords) >= 3:
+                    strokes_coords.append(s_coords)
+        if len(strokes_coords) == 0:
+            self.report({'WARNING'}, 'Sculpt & Retopo Toolkit: Batch Carve - No GP stroke defines a polygon.')
+            return {'FINISHED'}
+
+        for obj in context.view_layer.objects:
+            obj.select_set(False)
+        context.view_layer.objects.active = obj_to_be_carved
+        obj_to_be_carved.select_set(True)
+        context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
+        with bpy.context.temp_override(**context_override):
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        if context.scene.cut_thru_checkbox:
+            # Far enough to reach every corner of the mesh's bounding box from any stroke point.
+            bound_box = np.array([obj_to_be_carved.matrix_world @ Vector(c) for c in obj_to_be_carved.bound_box])
+            gp_coords = np.concatenate(strokes_coords)
+            depth = np.linalg.norm(gp_coords[:, None] - bound_box[None], axis=-1).max()
+        else:
+            depth = context.scene.carve_depth
+        region_3d = context_override['area'].spaces.active.region_3d
+        strokes_dirs = [get_view_dirs(region_3d, s_coords) for s_coords in strokes_coords]
+        cutter_obj = create_cutter_obj(context, "srtk_batch_cutter", *get_cutter_prisms_arrays(strokes_coords, strokes_dirs, depth))
+
+        boolean_mod = obj_to_be_carved.modifiers.new("boolean_mod", 'BOOLEAN')
+        boolean_mod.object = cutter_obj
+        boolean_mod.operation = 'DIFFERENCE'
+        with bpy.context.temp_override(**context_override):
+            bpy.ops.object.modifier_apply(modifier=boolean_mod.name)
+
+        # The cutter and its mesh go in one pass rather than one removal per hole.
+        bpy.data.batch_remove([cutter_obj, cutter_obj.data])
+        reset_gp(context, clear_strokes=True)
         context.scene.select_mesh_dropdown = None
-                
-        self.report({'INFO'}, 'Sculpt & Retopo Toolkit: Carve.')
+
+        self.report({'INFO'}, f'Sculpt & Retopo Toolkit: Batch Carve ({len(strokes_coords)} of {num_strokes} GP strokes carved with one boolean).')
         return {'FINISHED'}
 
 class BUTTON_OT_inset(Operator):
@@ -253,7 +541,7 @@ class BUTTON_OT_inset(Operator):
         if not gp_strokes_mesh_selection_check(self, context, obj_to_inset):
             return {'FINISHED'}        
         
-        knife_project_success, hole_template_obj, _ = gp_knife_project(context, obj_to_inset)
+        knife_project_success, hole_template_obj, num_pts, num_pts_removed = gp_knife_project(context, obj_to_inset)
         if knife_project_success:
             bpy.ops.mesh.extrude_region_move(TRANSFORM_OT_translate={'value': Vector((0, 0, 0))})
             bpy.ops.transform.shrink_fatten(value=context.scene.inoutset_amount)
@@ -261,9 +549,76 @@ class BUTTON_OT_inset(Operator):
 
         context.scene.select_mesh_dropdown = None
 
-        self.report({'INFO'}, 'Sculpt & Retopo Toolkit: In/Outset.')
+        self.report({'INFO'}, f'Sculpt & Retopo Toolkit: In/Outset (simplify removed {num_pts_removed} of {num_pts + num_pts_removed} GP points).')
         return {'FINISHED'}
 
+# num_samples points evenly spaced along the stroke by arc length (the first and last point included), linearly
+# interpolated between the stroke points.
+def resample_stroke_coords(coords, num_samples):
+    seg_lens = np.linalg.norm(np.diff(coords, axis=0), axis=1)
+    # Repeated points would make the arc lengths non-increasing, which np.interp doesn't allow.
+    coords = coords[np.concatenate([[True], seg_lens > 0])]
+    seg_lens = seg_lens[seg_lens > 0]
+    arc_lens = np.concatenate([[0.0], np.cumsum(seg_lens)])
+    targets = np.linspace(0.0, arc_lens[-1], num_samples)
+    return np.stack([np.interp(targets, arc_lens, coords[:, axis]) for axis in range(3)], axis=-1)
+
+# Orders the (resampled) strokes so each one is followed by the stroke whose end points are nearest to its own, and
+# flips strokes drawn the other way, so that sample j of every stroke can be bridged to sample j of the next one.
+def match_strokes_by_end_points(strokes):
+    if len(strokes) < 2:
+        return strokes
+    strokes = np.asarray(strokes)
+    starts, ends = strokes[:, 0], strokes[:, -1]
+
+    def get_end_point_dists(stroke):
+        same_dir = np.linalg.norm(starts - stroke[0], axis=1) + np.linalg.norm(ends - stroke[-1], axis=1)
+        flipped = np.linalg.norm(ends - stroke[0], axis=1) + np.linalg.norm(starts - stroke[-1], axis=1)
+        return same_dir, flipped
+
+    # Start from an end of the set: the stroke farthest from the first one drawn. Starting in the middle, the chain
+    # would run to one side and then jump back across, bridging two strokes that aren't next to each other.
+    first = int(np.argmax(np.minimum(*get_end_point_dists(strokes[0]))))
+    ordered = [strokes[first]]
+    unused = np.ones(len(strokes), dtype=bool)
+    unused[first] = False
+    while unused.any():
+        same_dir, flipped = get_end_point_dists(ordered[-1])
+        dists = np.where(unused, np.minimum(same_dir, flipped), np.inf)
+        i = int(np.argmin(dists))
+        unused[i] = False
+        ordered.append(strokes[i][::-1] if flipped[i] < same_dir[i] else strokes[i])
+    return ordered
+
+# BVH trees of the (evaluated) meshes that grid verts get snapped to, in object space, by object name. A tree is
+# rebuilt only when the evaluated vert positions changed since it was built (e.g. after sculpting).
+srtk_bvh_cache = {}
+
+def get_evaluated_coords_key(obj_eval):
+    coords = np.zeros(len(obj_eval.data.vertices)*3, dtype=np.float32)
+    obj_eval.data.vertices.foreach_get("co", coords)
+    return len(obj_eval.data.polygons), hashlib.blake2b(coords.tobytes(), digest_size=16).hexdigest()
+
+def get_object_bvh_tree(context, obj):
+    depsgraph = context.evaluated_depsgraph_get()
+    key = get_evaluated_coords_key(obj.evaluated_get(depsgraph))
+    cached = srtk_bvh_cache.get(obj.name)
+    if cached is None or cached[0] != key:
+        cached = (key, BVHTree.FromObject(obj, depsgraph))
+        srtk_bvh_cache[obj.name] = cached
+    return cached[1]
+
+# World space points -> nearest points on the object's surface, in object space.
+def snap_to_surface(obj, bvh_tree, world_coords):
+    world_to_obj = np.array(obj.matrix_world.inverted(), dtype=np.float64)
+    local_coords = np.asarray(world_coords, dtype=np.float64) @ world_to_obj[:3, :3].T + world_to_obj[:3, 3]
+    snapped = local_coords.copy()
+    for i, co in enumerate(local_coords):
+        nearest, _, _, _ = bvh_tree.find_nearest(Vector(co))
+        if nearest is not None:
+            snapped[i] = nearest
+    return snapped
+
 class BUTTON_OT_draw_grid(Operator):
     bl_idname = "button.draw_grid"
     bl_label = "Draw Grid"
@@ -285,35 +640,28 @@ class BUTTON_OT_draw_grid(Operator):
         context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
         with bpy.context.temp_override(**context_override):
             bpy.ops.object.mode_set(mode = 'OBJECT')
+        # Built in Object Mode, so it sees the current mesh; grid verts are snapped in object space, which leaves the
+        # object's transform alone.
+        bvh_tree = get_object_bvh_tree(context, obj_to_add_grid)
 
         context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
         with bpy.context.temp_override(**context_override):
-            bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
             bpy.ops.object.mode_set(mode = 'EDIT')
 
         context_override = mesh_editing_ops.get_context_override(context, 'VIEW_3D', 'WINDOW')
         with bpy.context.temp_override(**context_override):
             bpy.ops.mesh.select_all(action='DESELECT')
 
-        context.scene.tool_settings.use_snap = True
-        context.scene.tool_settings.snap_elements = {'FACE'}
-        context.scene.tool_settings.snap_target = 'CLOSEST'
-        context.scene.tool_settings.use_snap_self = True
+        num_grid_lines = context.scene.num_grid_lines
+        gp_strokes = gp_obj.data.layers.active.frames[0].strokes
+        strokes = [resample_stroke_coords(get_stroke_coords(s), num_grid_lines) for s in gp_strokes if len(s.points) > 1]
         bm = bmesh.from_edit_mesh(obj_to_add_grid.data)
         verts_prev_stroke = []
-        for s in gp_obj.data.layers.active.frames[0].strokes:
-            num_pts = len(s.points)
-            if num_pts < context.scene.num_grid_lines:
-                continue
-            num_pts_per_cell = floor(num_pts/context.scene.num_grid_lines)
-
+        for stroke_coords in match_strokes_by_end_points(strokes):
             v_prev = None
             verts_cur_stroke = []
-            num_gls_left = context.scene.num_grid_lines
-            for i in range(0, num_pts, num_pts_per_cell):
-                if num_gls_left == 0:
-                    break
-                v = bm.verts.new(s.points[i].co - obj_to_add_grid.location)
+            for co in snap_to_surface(obj_to_add_grid, bvh_tree, stroke_coords):
+                v = bm.verts.new(co)
                 v.select = True
                 if v_prev:
                     e = bm.edges.new([v_prev, v])
@@ -321,13 +669,11 @@ class BUTTON_OT_draw_grid(Operator):
                 
                 v_prev = v
                 verts_cur_stroke.append(v)
-                num_gls_left -= 1
 
-            if len(verts_prev_stroke) > 0:
-                num_verts_to_bridge = min(len(verts_prev_stroke), len(verts_cur_stroke))
-                for j in range(num_verts_to_bridge):
-                    e = bm.edges.new([verts_prev_stroke[j], verts_cur_stroke[j]])
-                    e.select = True
+            # Every stroke has num_grid_lines verts, so they bridge one to one.
+            for v_a, v_b in zip(verts_prev_stroke, verts_cur_stroke):
+                e = bm.edges.new([v_a, v_b])
+                e.select = True
             verts_prev_stroke = verts_cur_stroke
         bpy.ops.mesh.edge_face_add()
         bmesh.update_edit_mesh(obj_to_add_grid.data)
@@ -356,8 +702,14 @@ class SCULPTRETOPO_PT_ToolShelfPanel(bpy.types.Panel):
         box0 = col0.box()
         box0.label(text="Sculpt Tools", icon='SCULPTMODE_HLT')
         box0_row0 = box0.row(align=True)
-        box0_row0.prop(context.scene, "cut_thru_checkbox")                 
+        box0_row0.prop(context.scene, "cut_thru_checkbox")
+        box0_row0.prop(context.scene, "local_carve_checkbox")                 
+        box0_row2 = box0.row(align=True)
+        box0_row2.prop(context.scene, "simplify_tolerance")
         box0.operator("button.carve")
+        box0_row3 = box0.row(align=True)
+        box0_row3.prop(context.scene, "carve_depth")
+        box0.operator("button.batch_carve")
         box0_row1 = box0.row(align=True)
         box0_row1.prop(context.scene, "inoutset_amount")    
         box0.operator("button.inset", text="In/Outset")
@@ -370,7 +722,7 @@ class SCULPTRETOPO_PT_ToolShelfPanel(bpy.types.Panel):
 
 ###########################################################################################
 
-classes = [BUTTON_OT_reset_gp, BUTTON_OT_draw_with_GP, BUTTON_OT_carve, BUTTON_OT_inset, \
+classes = [BUTTON_OT_reset_gp, BUTTON_OT_draw_with_GP, BUTTON_OT_carve, BUTTON_OT_batch_carve, BUTTON_OT_inset, \
     SCULPTRETOPO_PT_ToolShelfPanel, BUTTON_OT_draw_grid]
       
 def register():
@@ -379,6 +731,7 @@ def register():
     init_scene_vars()
 
 def unregister():
+    srtk_bvh_cache.clear()
     for c in classes:
         bpy.utils.unregister_class(c)
     del_scene_vars()